@@ -2,50 +2,83 @@
 """
 Script to generate breed headshots using DALL-E API
 Reads breeds from lib/models/breed.dart and generates images for each breed
+
+Breeds are generated concurrently under requests/min and images/min limits,
+with 429/Retry-After-aware backoff (see scripts/job_scheduler.py). Images come
+back inline as b64_json and are resized/encoded in a process pool while the
+next API calls are in flight (see scripts/image_pipeline.py).
+
+Batch mode: --batch-out FILE writes every pending prompt as OpenAI Batch
+JSONL instead of calling the API; --batch-in FILE later ingests the batch
+results file and decodes/resizes/saves everything in one parallel pass
+(see scripts/batch_jobs.py).
+
+Resumable / shared runs: --queue DIR enqueues every pending breed in a work
+queue directory and drains it, claiming one breed at a time under a lease.
+Run the same command in several processes or on several hosts (with DIR and
+the output directory on a shared mount) to split one run between them; after
+a crash, rerun it and only breeds not marked done are generated; a breed
+whose prompt or settings changed since it was done is queued again. Images are
+written to a temp file and renamed, so a killed run never leaves a
+half-written PNG behind (see scripts/work_queue.py).
+
+--near-dup [RADIUS] checks each new image against the perceptual-hash index
+of the existing art and reports near-duplicates as they land (see
+scripts/phash_index.py).
+
+--timing [PATH] logs per-stage timings (API call, download, decode, resize,
+encode, write) as JSONL and prints p50/p95/max per stage at the end; add
+--profile to cProfile the CPU stages (see scripts/stage_timing.py).
+
+Paths are relative to this file, so it runs from any directory. The OpenAI
+SDK is only imported (and OPENAI_API_KEY only required) for live generation.
+
+Usage:
+  python generate_breed_images.py [--workers N] [--rpm N] [--ipm N] [--output-dir DIR]
+  python generate_breed_images.py --queue build/queue/breeds [--lease-seconds 120]
+  python generate_breed_images.py --batch-out build/batch/breeds.jsonl
+  python generate_breed_images.py --batch-in build/batch/breeds_results.jsonl
+  python scripts/asset_cli.py breeds [...]
 """
 
-import re
+import argparse
+import base64
+import functools
 import os
-import requests
-import time
-from openai import OpenAI
-from PIL import Image
-import io
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
+import phash_index
+import stage_timing
+import work_queue
+from breed_parser import load_breeds
+from batch_jobs import image_request, ingest_results, write_requests
+from derivative_cache import DerivativeCache
+from image_pipeline import resize_image_bytes, run_pipeline
+from job_scheduler import (
+    DEFAULT_IMAGES_PER_MINUTE,
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_REQUESTS_PER_MINUTE,
+    JobScheduler,
+)
+from phash_index import PhashIndex
+from stage_timing import stage
+from work_queue import LeaseLost, WorkQueue
 
 # Configuration
-# API key should be set as environment variable: OPENAI_API_KEY
-API_KEY = os.getenv("OPENAI_API_KEY")
-if not API_KEY:
-    raise ValueError("OPENAI_API_KEY environment variable is required")
-BREED_FILE = "lib/models/breed.dart"
-OUTPUT_DIR = "assets/Cartoon2"
-DELAY_BETWEEN_REQUESTS = 2  # seconds (DALL-E 3 has rate limits)
+# API key should be set as environment variable: OPENAI_API_KEY (checked when the API is used)
+BREED_FILE = PROJECT_ROOT / "lib" / "models" / "breed.dart"
+OUTPUT_DIR = PROJECT_ROOT / "assets" / "Cartoon2"
 TARGET_SIZE = (512, 512)  # Target image size
+DALLE_MODEL = "dall-e-3"
+DALLE_SIZE = "1024x1024"
+DALLE_QUALITY = "standard"
 
 def extract_breeds_from_dart(file_path):
-    """Extract breed names and pictureHeadShotNames from breed.dart"""
-    breeds = []
-    
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Pattern to match Breed constructor: Breed(id, name, sortOrder, htmlUrl, pictureHeadShotName, ...)
-    # We need to capture the name (2nd param) and pictureHeadShotName (5th param)
-    pattern = r"Breed\(\s*(\d+),\s*'([^']+)',\s*[^,]+,\s*[^,]+,\s*'([^']+)',"
-    
-    matches = re.finditer(pattern, content)
-    for match in matches:
-        breed_id = int(match.group(1))
-        name = match.group(2)
-        picture_headshot_name = match.group(3)
-        
-        breeds.append({
-            'id': breed_id,
-            'name': name,
-            'pictureHeadShotName': picture_headshot_name
-        })
-    
-    return breeds
+    """Extract breeds (name, pictureHeadShotName, ...) from breed.dart via the shared parser"""
+    return load_breeds(file_path)
 
 def generate_prompt(breed_name):
     """Generate a detailed prompt for DALL-E with solid, realistic style"""
@@ -60,114 +93,212 @@ Solid white or neutral background.
 The cat should be definitively recognizable as a {breed_name} breed with realistic breed characteristics. 
 High quality, 512x512 pixels, PNG format."""
 
-def generate_image_with_dalle(client, prompt):
-    """Call DALL-E 3 API to generate image"""
-    try:
-        print(f"    Calling DALL-E API...")
+def generate_image_with_dalle(client, prompt, item=None):
+    """Call DALL-E 3 API and return the image bytes (inline b64_json, no download hop).
+    Raises on API errors so the scheduler can retry. `item` labels the timing event."""
+    with stage("api", item) as ev:
         response = client.images.generate(
-            model="dall-e-3",
+            model=DALLE_MODEL,
             prompt=prompt,
-            size="1024x1024",  # DALL-E 3 outputs 1024x1024, we'll resize
-            quality="standard",
+            size=DALLE_SIZE,  # DALL-E 3 outputs 1024x1024, we'll resize
+            quality=DALLE_QUALITY,
             n=1,
+            response_format="b64_json",
         )
-        return response.data[0].url
-    except Exception as e:
-        print(f"    Error generating image: {e}")
-        return None
+        b64 = response.data[0].b64_json
+        data = base64.b64decode(b64) if b64 else None
+        ev["bytes"] = len(data) if data else 0
+    return data
 
 def download_and_resize_image(url, filepath, target_size=(512, 512)):
     """Download image from URL, resize to target size, and save as PNG"""
+    import requests
+
     try:
         # Download image
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        
-        # Open image with PIL
-        img = Image.open(io.BytesIO(response.content))
-        
-        # Convert to RGB if necessary (for PNG with transparency)
-        if img.mode in ('RGBA', 'LA', 'P'):
-            # Keep transparency if present
-            img = img.convert('RGBA')
-        else:
-            img = img.convert('RGB')
-        
-        # Resize to target size (512x512)
-        img_resized = img.resize(target_size, Image.Resampling.LANCZOS)
-        
-        # Save as PNG
-        img_resized.save(filepath, 'PNG', optimize=True)
+        with stage("download", os.path.basename(filepath)) as ev:
+            response = requests.get(url, timeout=30)
+            response.raise_for_status()
+            ev["bytes"] = len(response.content)
+        # Resize (keeping transparency if present) and save as optimized PNG
+        resize_image_bytes((response.content, filepath), target_size, optimize=True)
         return True
     except Exception as e:
         print(f"    Error downloading/resizing image: {e}")
         return False
 
 def main():
-    # Initialize OpenAI client
-    print("Initializing OpenAI client...")
-    client = OpenAI(api_key=API_KEY)
-    
+    parser = argparse.ArgumentParser(description="Generate breed headshots with DALL-E 3.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS, help="Concurrent generations")
+    parser.add_argument("--rpm", type=float, default=DEFAULT_REQUESTS_PER_MINUTE, help="API requests per minute")
+    parser.add_argument("--ipm", type=float, default=DEFAULT_IMAGES_PER_MINUTE, help="Images per minute")
+    parser.add_argument("--output-dir", type=Path, default=OUTPUT_DIR, help="Where to write the PNGs")
+    batch = parser.add_mutually_exclusive_group()
+    batch.add_argument("--batch-out", metavar="FILE", help="Write pending prompts as batch JSONL and exit")
+    batch.add_argument("--batch-in", metavar="FILE", help="Ingest a batch results JSONL file")
+    work_queue.add_arguments(parser)
+    phash_index.add_arguments(parser)
+    stage_timing.add_arguments(parser)
+    args = parser.parse_args()
+    if args.queue and (args.batch_out or args.batch_in):
+        parser.error("--queue cannot be combined with --batch-out/--batch-in")
+    if args.rpm <= 0 or args.ipm <= 0:
+        parser.error("--rpm and --ipm must be positive")
+    stage_timing.configure_from_args(args, "breeds")
+
     # Verify output directory exists
-    if not os.path.exists(OUTPUT_DIR):
-        print(f"Creating output directory: {OUTPUT_DIR}")
-        os.makedirs(OUTPUT_DIR, exist_ok=True)
+    output_dir = args.output_dir
+    if not os.path.exists(output_dir):
+        print(f"Creating output directory: {output_dir}")
+        os.makedirs(output_dir, exist_ok=True)
     else:
-        print(f"Output directory: {OUTPUT_DIR}")
+        print(f"Output directory: {output_dir}")
     
     # Extract breeds
     print(f"\nExtracting breeds from {BREED_FILE}...")
     breeds = extract_breeds_from_dart(BREED_FILE)
     print(f"Found {len(breeds)} breeds\n")
     
+    # Each output is keyed on model + final prompt + size, so editing the prompt
+    # template regenerates the affected breeds. Existing images that predate the
+    # cache are adopted rather than paid for again
+    cache = DerivativeCache()
+    cache_params = {
+        "transform": "breed_headshot",
+        "model": DALLE_MODEL,
+        "size": DALLE_SIZE,
+        "quality": DALLE_QUALITY,
+        "target_size": TARGET_SIZE,
+    }
+    cache_keys = {}
+
     # Track statistics
     successful = 0
     failed = 0
     skipped = 0
     
-    # Process each breed
+    # Work out which breeds need generating
+    pending = {}
+    fresh = set()  # breeds already up to date
+    owners = {}  # output file -> the breed whose prompt it is generated from
     for i, breed in enumerate(breeds, 1):
         breed_name = breed['name']
         picture_name = breed['pictureHeadShotName']
         # Replace spaces with underscores and ensure .png extension
         filename = picture_name.replace(' ', '_') + '.png'
-        filepath = os.path.join(OUTPUT_DIR, filename)
+        filepath = os.path.join(output_dir, filename)
         
-        # Skip if already exists
-        if os.path.exists(filepath):
-            print(f"[{i}/{len(breeds)}] ⏭️  Skipping {breed_name} (already exists: {filename})")
+        # Some breeds share a headshot (e.g. Siamese and Applehead Siamese);
+        # the first breed listed owns the file
+        if filepath in owners:
+            print(f"[{i}/{len(breeds)}] ⏭️  Skipping {breed_name} (shares {filename} with {owners[filepath]})")
             skipped += 1
             continue
+        owners[filepath] = breed_name
+        cache_keys[filepath] = cache.key([], {**cache_params, "prompt": generate_prompt(breed_name)})
         
-        print(f"[{i}/{len(breeds)}] 🐱 Generating {breed_name}...")
-        print(f"    Filename: {filename}")
-        
-        # Generate prompt
-        prompt = generate_prompt(breed_name)
-        print(f"    Prompt: {prompt[:80]}...")
-        
-        # Generate image
-        image_url = generate_image_with_dalle(client, prompt)
-        if not image_url:
-            print(f"    ❌ Failed to generate image for {breed_name}")
-            failed += 1
+        # Skip if already built with the current settings and prompt
+        if cache.is_fresh(filepath, cache_keys[filepath], adopt_existing=True):
+            print(f"[{i}/{len(breeds)}] ⏭️  Skipping {breed_name} (up to date: {filename})")
+            skipped += 1
+            fresh.add(breed_name)
             continue
-        
-        # Download, resize, and save
-        print(f"    Downloading and processing...")
-        if download_and_resize_image(image_url, filepath, TARGET_SIZE):
-            print(f"    ✅ Saved to {filepath}")
-            successful += 1
-        else:
-            print(f"    ❌ Failed to save {breed_name}")
-            failed += 1
-        
-        # Rate limiting delay (except for last item)
-        if i < len(breeds):
-            print(f"    ⏳ Waiting {DELAY_BETWEEN_REQUESTS} seconds...")
-            time.sleep(DELAY_BETWEEN_REQUESTS)
-        print()
+        pending[breed_name] = filepath
     
+    def generate_breed(breed_name):
+        # A queued breed may have been added by another worker
+        filepath = pending.get(breed_name) or queue.data(breed_name)["path"]
+        if queue:
+            # A worker that stalled past its lease must not pay for a breed taken over
+            queue.ensure_held(breed_name)
+        print(f"🐱 Generating {breed_name} -> {os.path.basename(filepath)}")
+        data = generate_image_with_dalle(client, generate_prompt(breed_name), item=breed_name)
+        if not data:
+            raise RuntimeError("no image data in response")
+        if queue:
+            # Nor overwrite the new holder's image: checked again just before the rename
+            return data, filepath, queue.token(breed_name)
+        return data, filepath
+    
+    if args.batch_out:
+        count = write_requests(
+            args.batch_out,
+            (
+                image_request(breed_name, generate_prompt(breed_name),
+                              DALLE_MODEL, DALLE_SIZE, DALLE_QUALITY)
+                for breed_name, filepath in pending.items()
+            ),
+        )
+        cache.save()
+        print(f"\nWrote {count} batch request(s) to {args.batch_out}")
+        return
+    
+    process = functools.partial(resize_image_bytes, target_size=TARGET_SIZE, optimize=True)
+    queue = None
+    total = len(pending)
+    near_index, near_dups = None, []
+    if args.near_dup is not None:
+        near_index = PhashIndex()
+        near_index.update()
+        print(f"Checking new images against {len(near_index)} indexed image(s) (radius {args.near_dup})")
+    if args.batch_in:
+        print(f"\nIngesting batch results from {args.batch_in} for {len(pending)} pending breed(s)\n")
+        results = ingest_results(args.batch_in, pending, process, fresh=fresh)
+    else:
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise SystemExit("OPENAI_API_KEY environment variable is required")
+        from openai import OpenAI
+
+        # Initialize OpenAI client (retries are handled by the scheduler)
+        print("\nInitializing OpenAI client...")
+        client = OpenAI(api_key=api_key, max_retries=0)
+        jobs = pending
+        if args.queue:
+            queue = WorkQueue(args.queue, lease_seconds=args.lease_seconds)
+            # The cache key is part of the data, so a changed prompt or setting requeues a done breed
+            added = queue.add_many({name: {"path": str(filepath), "key": cache_keys[filepath]}
+                                    for name, filepath in pending.items()})
+            status = queue.status()
+            total = status["items"] - status["done"]
+            print(f"Work queue {args.queue}: {added} breed(s) added or requeued, {total} not done")
+            jobs = queue.claims()
+        print(f"Generating {total} breed(s) with {args.workers} worker(s), "
+              f"{args.rpm:g} requests/min, {args.ipm:g} images/min\n")
+        scheduler = JobScheduler(max_workers=args.workers, requests_per_minute=args.rpm, images_per_minute=args.ipm)
+        results = run_pipeline(jobs, generate_breed, process, scheduler)
+    try:
+        for done, result in enumerate(results, 1):
+            if result.ok:
+                if queue and not queue.complete(result.job, {"path": str(result.value)}):
+                    print(f"[{done}/{total}] ⏭️  {result.job} was already completed by another worker "
+                          f"or requeued meanwhile")
+                    continue
+                if result.value in cache_keys:
+                    cache.record(result.value, cache_keys[result.value])
+                    cache.save()
+                print(f"[{done}/{total}] ✅ Saved {result.job} to {result.value}")
+                successful += 1
+                if near_index:
+                    matches = near_index.check(result.value, args.near_dup)
+                    if matches:
+                        near_dups.append(result.job)
+                        print("    ⚠️  Near-duplicate of " + ", ".join(f"{name} ({d} bits)" for d, name in matches[:3]))
+            elif isinstance(result.error, LeaseLost):
+                print(f"[{done}/{total}] ⏭️  {result.job}: {result.error}")
+            else:
+                if queue:
+                    queue.release(result.job, result.error)
+                print(f"[{done}/{total}] ❌ Failed {result.job} after {result.attempts} attempt(s): {result.error}")
+                failed += 1
+    finally:
+        if queue:
+            queue.close()
+        if near_index:
+            near_index.save()
+
+    cache.save()
+
     # Summary
     print("\n" + "="*60)
     print("SUMMARY")
@@ -176,8 +307,12 @@ def main():
     print(f"✅ Successful: {successful}")
     print(f"⏭️  Skipped: {skipped}")
     print(f"❌ Failed: {failed}")
-    print(f"\nImages saved to: {OUTPUT_DIR}")
+    if near_index:
+        print(f"⚠️  Near-duplicates: {len(near_dups)}" + (f" ({', '.join(near_dups)})" if near_dups else ""))
+    if queue:
+        print("Work queue: " + " ".join(f"{k}={v}" for k, v in queue.status().items()))
+    print(f"\nImages saved to: {output_dir}")
+    stage_timing.report()
 
 if __name__ == "__main__":
     main()
-
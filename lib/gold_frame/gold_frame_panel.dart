@@ -1,9 +1,11 @@
 import 'package:flutter/material.dart';
+import 'gold_nine_slice.dart';
 import 'gold_plaque.dart';
 
 /// A widget that displays a child within a gold frame, with an optional bottom plaque.
 /// 
-/// The frame uses 9-slice scaling to maintain border thickness regardless of size.
+/// The frame is drawn from its pre-sliced nine-patch pieces (see [GoldNineSlice]),
+/// with the corners at the border thickness, regardless of size.
 /// For unbounded height (e.g., in ListView), it uses a Column-based layout.
 /// For bounded height, it uses a Stack-based layout.
 class GoldFramedPanel extends StatelessWidget {
@@ -13,8 +15,9 @@ class GoldFramedPanel extends StatelessWidget {
   /// When set, use this for top/bottom content inset instead of proportional border (e.g. for tall images to reduce letterboxing).
   final double? reducedVerticalInset;
 
-  static const String _frameAsset = 'assets/frame/gold_frame_no_plaque.png';
-  static const Rect _frameCenterSlice = Rect.fromLTWH(108, 106, 806, 810);
+  // Border of gold_frame_no_plaque.png (875x895, insets 120/125/119/113 px) as a fraction of its
+  // size, so a stretched frame looks as it did when the whole image was stretched to fill it
+  static const EdgeInsets _frameBorderFraction = EdgeInsets.fromLTRB(120 / 875, 125 / 895, 119 / 875, 113 / 895);
 
   const GoldFramedPanel({
     Key? key,
@@ -64,73 +67,66 @@ class GoldFramedPanel extends StatelessWidget {
           plaqueHeight = (itemCount * 20.0) + 20.0;
         }
 
-        // For small cards, use Column-based layout to avoid centerSlice issues
-        // centerSlice requires the image to be large enough, which small cards aren't
+        // Small cards and unbounded heights use the Column-based layout, where the
+        // frame is stretched to the panel like the single image it replaced
         final bool shouldUseColumnLayout = isUnboundedHeight || useSmallBorders;
 
         if (shouldUseColumnLayout) {
           // Unbounded height case (ListView, etc.)
-          // Use Column-based layout with frame decoration
+          // Use Column-based layout over the frame, stretched to the panel's size
           return SizedBox(
             width: constraints.maxWidth,
-            child: Container(
-              decoration: BoxDecoration(
-                image: DecorationImage(
-                  image: AssetImage(_frameAsset),
-                  fit: BoxFit.fill,
-                  repeat: ImageRepeat.noRepeat,
+            child: Stack(
+              fit: StackFit.passthrough,
+              children: [
+                const Positioned.fill(
+                  child: GoldNineSlice(name: 'gold_frame', borderFraction: _frameBorderFraction),
                 ),
-              ),
-              padding: EdgeInsets.only(
-                left: borderThickness.left,
-                top: reducedVerticalInset ?? borderThickness.top,
-                right: borderThickness.right,
-                bottom: reducedVerticalInset ?? borderThickness.bottom,
-              ),
-              child: Column(
-                mainAxisSize: MainAxisSize.min,
-                crossAxisAlignment: CrossAxisAlignment.stretch,
-                children: [
-                  // Child content - constrained to prevent overflow
-                  ClipRect(
-                    clipBehavior: Clip.hardEdge,
-                    child: SizedBox(
-                      width: double.infinity,
-                      child: child,
-                    ),
+                Padding(
+                  padding: EdgeInsets.only(
+                    left: borderThickness.left,
+                    top: reducedVerticalInset ?? borderThickness.top,
+                    right: borderThickness.right,
+                    bottom: reducedVerticalInset ?? borderThickness.bottom,
                   ),
-                  // Plaque positioned directly below image (no spacing)
-                  if ((plaqueLines != null && plaqueLines!.isNotEmpty) || 
-                      (plaqueWidgets != null && plaqueWidgets!.isNotEmpty))
-                    ClipRect(
-                      clipBehavior: Clip.hardEdge,
-                      child: GoldPlaque(
-                      lines: plaqueLines,
-                      widgets: plaqueWidgets,
-                      // Increase maxWidth to reduce left/right margins (add 20px total, 10px each side)
-                      maxWidth: constraints.maxWidth - (borderThickness.left + borderThickness.right) + 20,
-                    ),
-                    ),
-                ],
-              ),
+                  child: Column(
+                    mainAxisSize: MainAxisSize.min,
+                    crossAxisAlignment: CrossAxisAlignment.stretch,
+                    children: [
+                      // Child content - constrained to prevent overflow
+                      ClipRect(
+                        clipBehavior: Clip.hardEdge,
+                        child: SizedBox(
+                          width: double.infinity,
+                          child: child,
+                        ),
+                      ),
+                      // Plaque positioned directly below image (no spacing)
+                      if ((plaqueLines != null && plaqueLines!.isNotEmpty) || 
+                          (plaqueWidgets != null && plaqueWidgets!.isNotEmpty))
+                        ClipRect(
+                          clipBehavior: Clip.hardEdge,
+                          child: GoldPlaque(
+                          lines: plaqueLines,
+                          widgets: plaqueWidgets,
+                          // Increase maxWidth to reduce left/right margins (add 20px total, 10px each side)
+                          maxWidth: constraints.maxWidth - (borderThickness.left + borderThickness.right) + 20,
+                        ),
+                        ),
+                    ],
+                  ),
+                ),
+              ],
             ),
           );
         } else {
           // Bounded height case
-          // Use Stack-based layout with centerSlice for 9-slice scaling
+          // Use Stack-based layout over the frame
           return Stack(
             children: [
-              // Frame background with 9-slice scaling
+              // Frame background, nine-slice
               Positioned.fill(
-                child: Container(
-                  decoration: BoxDecoration(
-                    image: DecorationImage(
-                      image: AssetImage(_frameAsset),
-                      fit: BoxFit.fill,
-                      centerSlice: _frameCenterSlice,
-                    ),
-                  ),
-                ),
+                child: GoldNineSlice(name: 'gold_frame', border: borderThickness),
               ),
               // Child content with padding
               Positioned(
@@ -0,0 +1,81 @@
+import 'package:flutter/material.dart';
+
+/// Draws one of the pre-sliced gold images (see scripts/build_gold_frame.py)
+/// as nine pieces filling its (bounded) box.
+///
+/// The corners are drawn at the border thickness, the edges stretch along
+/// their length and the centre stretches both ways. The border is either
+/// fixed ([border]) or a fraction of the box size ([borderFraction]), which
+/// looks the same as stretching the whole source image to fill the box. The
+/// pieces are small 1x/2.0x/3.0x assets under assets/frame/nine/, so nothing
+/// decodes the full-size source art.
+class GoldNineSlice extends StatelessWidget {
+  /// Piece name prefix: 'gold_frame' or 'gold_plaque'.
+  final String name;
+  final EdgeInsets? border;
+  /// Border as fractions of the box width (left/right) and height (top/bottom).
+  final EdgeInsets? borderFraction;
+  /// False when the source has a transparent centre (no `_c` piece is written).
+  final bool hasCenter;
+
+  static const String _dir = 'assets/frame/nine';
+
+  const GoldNineSlice({
+    Key? key,
+    required this.name,
+    this.border,
+    this.borderFraction,
+    this.hasCenter = true,
+  }) : assert((border == null) != (borderFraction == null), 'Provide exactly one of border and borderFraction'),
+       super(key: key);
+
+  Widget _piece(String piece) {
+    return Image.asset(
+      '$_dir/${name}_$piece.png',
+      fit: BoxFit.fill,
+      filterQuality: FilterQuality.medium,
+      gaplessPlayback: true,
+    );
+  }
+
+  Widget _row(EdgeInsets border, double? height, List<String> pieces, {bool drawMiddle = true}) {
+    final Widget row = Row(
+      crossAxisAlignment: CrossAxisAlignment.stretch,
+      children: [
+        SizedBox(width: border.left, child: _piece(pieces[0])),
+        Expanded(child: drawMiddle ? _piece(pieces[1]) : const SizedBox.shrink()),
+        SizedBox(width: border.right, child: _piece(pieces[2])),
+      ],
+    );
+    return height == null ? Expanded(child: row) : SizedBox(height: height, child: row);
+  }
+
+  Widget _slices(EdgeInsets border) {
+    return Column(
+      crossAxisAlignment: CrossAxisAlignment.stretch,
+      children: [
+        _row(border, border.top, const ['tl', 't', 'tr']),
+        _row(border, null, const ['l', 'c', 'r'], drawMiddle: hasCenter),
+        _row(border, border.bottom, const ['bl', 'b', 'br']),
+      ],
+    );
+  }
+
+  @override
+  Widget build(BuildContext context) {
+    if (border != null) {
+      return _slices(border!);
+    }
+    return LayoutBuilder(
+      builder: (context, constraints) {
+        final EdgeInsets f = borderFraction!;
+        return _slices(EdgeInsets.only(
+          left: constraints.maxWidth * f.left,
+          top: constraints.maxHeight * f.top,
+          right: constraints.maxWidth * f.right,
+          bottom: constraints.maxHeight * f.bottom,
+        ));
+      },
+    );
+  }
+}
@@ -1,15 +1,18 @@
 import 'package:flutter/material.dart';
+import 'gold_nine_slice.dart';
 
 /// A widget that displays text on a gold plaque.
 /// 
 /// Supports 1-3 lines of text or widgets, centered horizontally and vertically.
+/// The plaque is drawn from its nine-patch pieces (see [GoldNineSlice]).
 class GoldPlaque extends StatelessWidget {
   final List<String>? lines;
   final List<Widget>? widgets;
   final double maxWidth;
   
-  static const String _plaqueAsset = 'assets/frame/gold_plaque_refined.png';
-  static const Rect _plaqueCenterSlice = Rect.fromLTWH(71, 93, 849, 835);
+  // Border of gold_plaque_refined.png (901x853, insets 71/93 px) as a fraction of its size,
+  // so the plaque looks as it did when the whole image was stretched to fill it
+  static const EdgeInsets _plaqueBorderFraction = EdgeInsets.symmetric(horizontal: 71 / 901, vertical: 93 / 853);
   
   static const double _horizontalPadding = 14.0; // Reduced from 24.0 to decrease left/right margins
   static const double _verticalPadding = 10.0; // Restored to ensure text is fully visible within the plaque
@@ -31,57 +34,50 @@ class GoldPlaque extends StatelessWidget {
       return const SizedBox.shrink();
     }
 
-    // Calculate minimum size needed for centerSlice
-    // centerSlice is Rect.fromLTWH(71, 93, 849, 835)
-    // Minimum width: 71 + 849 = 920, Minimum height: 93 + 835 = 928
-    final double minWidthForCenterSlice = _plaqueCenterSlice.left + _plaqueCenterSlice.width;
-    final double minHeightForCenterSlice = _plaqueCenterSlice.top + _plaqueCenterSlice.height;
-    
-    // Use centerSlice only if container is large enough, otherwise use regular fit
-    final bool canUseCenterSlice = maxWidth >= minWidthForCenterSlice;
-
     return Container(
       constraints: BoxConstraints(maxWidth: maxWidth),
-      decoration: BoxDecoration(
-        image: DecorationImage(
-          image: AssetImage(_plaqueAsset),
-          fit: BoxFit.fill,
-          centerSlice: canUseCenterSlice ? _plaqueCenterSlice : null,
-        ),
-      ),
-      padding: const EdgeInsets.symmetric(
-        horizontal: _horizontalPadding,
-        vertical: _verticalPadding,
-      ),
-      child: ClipRect(
-        clipBehavior: Clip.hardEdge,
-        child: SizedBox(
-          width: maxWidth,
-          child: Column(
-            mainAxisSize: MainAxisSize.min,
-            mainAxisAlignment: MainAxisAlignment.center,
-            crossAxisAlignment: CrossAxisAlignment.stretch,
-            children: widgets != null
-                ? widgets!.map((widget) => ClipRect(clipBehavior: Clip.hardEdge, child: widget)).toList()
-                : lines!.map((line) {
-                    return ClipRect(
-                      clipBehavior: Clip.hardEdge,
-                      child: Text(
-                        line,
-                        textAlign: TextAlign.center,
-                        style: const TextStyle(
-                          color: _textColor,
-                          fontWeight: FontWeight.w600,
-                          decoration: TextDecoration.none,
-                        ),
-                        overflow: TextOverflow.ellipsis,
-                        maxLines: 2,
-                        softWrap: true,
-                      ),
-                    );
-                  }).toList(),
+      child: Stack(
+        children: [
+          const Positioned.fill(
+            child: GoldNineSlice(name: 'gold_plaque', borderFraction: _plaqueBorderFraction),
+          ),
+          Padding(
+            padding: const EdgeInsets.symmetric(
+              horizontal: _horizontalPadding,
+              vertical: _verticalPadding,
+            ),
+            child: ClipRect(
+              clipBehavior: Clip.hardEdge,
+              child: SizedBox(
+                width: maxWidth,
+                child: Column(
+                  mainAxisSize: MainAxisSize.min,
+                  mainAxisAlignment: MainAxisAlignment.center,
+                  crossAxisAlignment: CrossAxisAlignment.stretch,
+                  children: widgets != null
+                      ? widgets!.map((widget) => ClipRect(clipBehavior: Clip.hardEdge, child: widget)).toList()
+                      : lines!.map((line) {
+                          return ClipRect(
+                            clipBehavior: Clip.hardEdge,
+                            child: Text(
+                              line,
+                              textAlign: TextAlign.center,
+                              style: const TextStyle(
+                                color: _textColor,
+                                fontWeight: FontWeight.w600,
+                                decoration: TextDecoration.none,
+                              ),
+                              overflow: TextOverflow.ellipsis,
+                              maxLines: 2,
+                              softWrap: true,
+                            ),
+                          );
+                        }).toList(),
+                ),
+              ),
+            ),
           ),
-        ),
+        ],
       ),
     );
   }
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+One entry point for the asset scripts.
+
+  python scripts/asset_cli.py splash            -> generate_splash_sizes.py
+  python scripts/asset_cli.py resize            -> resize_png_to_jpg.py
+  python scripts/asset_cli.py breeds            -> generate_breed_images.py (project root)
+  python scripts/asset_cli.py cat-types         -> generate_cat_type_images.py
+  python scripts/asset_cli.py validate-videos   -> test_youtube_videos.py
+  python scripts/asset_cli.py watch             -> watch_assets.py
+
+Everything after the subcommand is passed to that script's own argument
+parser, so `asset_cli.py splash --help` shows the splash options. Only the
+chosen script's module is imported: the offline image commands never load the
+OpenAI SDK or aiohttp, and the generators only load the SDK when they call the
+API. All paths resolve from the project root, not the working directory.
+
+Startup time per subcommand is measured by bench_cli_startup.py.
+"""
+
+import argparse
+import importlib
+import sys
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+# subcommand -> (module, directory it lives in, one-line help)
+COMMANDS = {
+    "splash": ("generate_splash_sizes", SCRIPT_DIR, "Generate iOS and Android launch images"),
+    "resize": ("resize_png_to_jpg", SCRIPT_DIR, "Resize cat-type PNGs to JPGs"),
+    "breeds": ("generate_breed_images", PROJECT_ROOT, "Generate breed headshots with DALL-E"),
+    "cat-types": ("generate_cat_type_images", SCRIPT_DIR, "Generate cat-type images with DALL-E"),
+    "validate-videos": ("test_youtube_videos", SCRIPT_DIR, "Check the YouTube videos in breed.dart"),
+    "watch": ("watch_assets", SCRIPT_DIR, "Rebuild JPGs and launch images when sources change"),
+}
+
+
+def load_command(name):
+    """Import and return the module behind a subcommand."""
+    module, directory, _ = COMMANDS[name]
+    for path in (SCRIPT_DIR, directory):
+        if str(path) not in sys.path:
+            sys.path.insert(0, str(path))
+    return importlib.import_module(module)
+
+
+def main(argv=None) -> None:
+    epilog = "commands:\n" + "\n".join(f"  {name:<17} {spec[2]}" for name, spec in COMMANDS.items())
+    parser = argparse.ArgumentParser(
+        description="Asset pipeline commands.",
+        epilog=epilog + "\n\nRun '%(prog)s <command> --help' for a command's options.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("command", choices=COMMANDS, metavar="command")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    module = load_command(args.command)
+    # The script parses sys.argv itself; make its usage line read "asset_cli.py <command>"
+    sys.argv = [f"{parser.prog} {args.command}", *args.args]
+    module.main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Offline batch mode for the image generators, in the OpenAI Batch JSONL format.
+
+Emit: every pending prompt becomes one request line
+  {"custom_id": "<item name>", "method": "POST", "url": "/v1/images/generations",
+   "body": {"model": ..., "prompt": ..., "size": ..., "response_format": "b64_json", ...}}
+which can be uploaded as a batch input file (purpose "batch"). The item name
+(breed or cat type) is the custom_id, since the Batch API needs them to be
+unique and two items may share an output file name.
+
+Ingest: a batch output file has one line per request
+  {"custom_id": ..., "response": {"status_code": 200, "body": {"data": [{"b64_json": ...}]}},
+   "error": null}
+Every successful line is base64-decoded, resized and saved in one process-pool
+pass. Because both sides are plain files, a whole regeneration run can be
+replayed locally without touching the API.
+
+Usage (from a generator):
+  write_requests(path, [image_request(custom_id, prompt, model, size, quality), ...])
+  for result in ingest_results(path, {custom_id: out_path}, process_fn, fresh={custom_id, ...}):
+      ...   # JobResult(job=custom_id, ok, value, error)
+"""
+
+import base64
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+from job_scheduler import JobResult
+from stage_timing import stage
+
+IMAGES_ENDPOINT = "/v1/images/generations"
+
+
+def image_request(custom_id, prompt, model, size, quality):
+    """One batch input line for an image generation."""
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": IMAGES_ENDPOINT,
+        "body": {
+            "model": model,
+            "prompt": prompt,
+            "size": size,
+            "quality": quality,
+            "n": 1,
+            "response_format": "b64_json",
+        },
+    }
+
+
+def write_requests(path, requests) -> int:
+    """Write batch request lines to `path` atomically. Returns the number written."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    count = 0
+    with open(tmp, "w", encoding="utf-8") as f:
+        for request in requests:
+            f.write(json.dumps(request, ensure_ascii=False) + "\n")
+            count += 1
+    os.replace(tmp, path)
+    return count
+
+
+def read_results(path):
+    """Yield (custom_id, b64_json or None, error message or None) for each result line."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield None, None, f"line {line_no}: invalid JSON ({e})"
+                continue
+            custom_id = record.get("custom_id")
+            if record.get("error"):
+                error = record["error"]
+                yield custom_id, None, error.get("message", str(error)) if isinstance(error, dict) else str(error)
+                continue
+            response = record.get("response") or {}
+            status = response.get("status_code")
+            body = response.get("body") or {}
+            if status != 200:
+                message = (body.get("error") or {}).get("message", "") if isinstance(body, dict) else ""
+                yield custom_id, None, f"HTTP {status} {message}".strip()
+                continue
+            data = body.get("data") or [{}]
+            b64 = data[0].get("b64_json")
+            yield custom_id, b64, None if b64 else "no b64_json in response"
+
+
+def _decode_and_process(process_fn, b64, out_path):
+    with stage("b64decode", os.path.basename(out_path)) as ev:
+        data = base64.b64decode(b64)
+        ev["bytes"] = len(data)
+    return process_fn((data, out_path))
+
+
+def ingest_results(path, outputs, process_fn, fresh=(), workers=None, max_in_flight=None):
+    """
+    Decode/resize/save every successful result in `path` in a process pool.
+    `outputs` maps custom_id -> output path; lines for custom_ids in `fresh`
+    (already up to date, e.g. when a results file is ingested again) are
+    skipped, and other unknown custom_ids are reported as failures.
+    Yields a JobResult per result line as it completes. At most `max_in_flight`
+    encoded images are held in memory (default: 2 x workers).
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 2 * workers
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = {}
+        for custom_id, b64, error in read_results(path):
+            if custom_id in fresh:
+                continue
+            if error:
+                yield JobResult(custom_id, False, error=RuntimeError(error))
+                continue
+            if custom_id not in outputs:
+                yield JobResult(custom_id, False, error=KeyError(f"unknown custom_id {custom_id!r}"))
+                continue
+            if len(in_flight) >= max_in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield _collect(future, in_flight.pop(future))
+            future = pool.submit(_decode_and_process, process_fn, b64, outputs[custom_id])
+            in_flight[future] = custom_id
+        for future in list(in_flight):
+            yield _collect(future, in_flight.pop(future))
+
+
+def _collect(future, custom_id):
+    try:
+        return JobResult(custom_id, True, future.result(), attempts=1)
+    except Exception as e:
+        return JobResult(custom_id, False, error=e, attempts=1)
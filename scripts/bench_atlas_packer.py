@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark the MaxRects atlas packer in pack_atlas.py: pack time and fill ratio.
+
+Packs synthetic sets of random rectangles of increasing count (icon-like
+16-96px, and mixed 16-256px) plus the real presets, and reports pages used,
+fill ratio (image area / used page area) and time.
+
+Usage:
+  python scripts/bench_atlas_packer.py [--seed N]
+"""
+
+import argparse
+import random
+import time
+
+from PIL import Image
+
+from pack_atlas import DEFAULT_ATLAS_SIZE, DEFAULT_PADDING, PRESETS, PROJECT_ROOT, pack
+
+
+def _fill(sizes, placements, bins):
+    used = 0
+    for page in range(len(bins)):
+        keys = [k for k, p in placements.items() if p[0] == page]
+        width = max(placements[k][1] + sizes[k][0] for k in keys)
+        height = max(placements[k][2] + sizes[k][1] for k in keys)
+        used += width * height
+    return sum(w * h for w, h in sizes.values()) / used
+
+
+def _run(label, sizes, atlas_size=DEFAULT_ATLAS_SIZE):
+    start = time.perf_counter()
+    placements, bins = pack(sizes, atlas_size, DEFAULT_PADDING)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {len(sizes):>6} {len(bins):>6} {_fill(sizes, placements, bins):>7.1%} {elapsed * 1000:>10.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the atlas packer.")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    print(f"{'set':<28} {'images':>6} {'pages':>6} {'fill':>7} {'time (ms)':>10}")
+    for preset, spec in PRESETS.items():
+        sizes = {}
+        for f in spec["files"]:
+            with Image.open(PROJECT_ROOT / f) as im:
+                w, h = im.size
+            if spec["max_edge"] and max(w, h) > spec["max_edge"]:
+                s = spec["max_edge"] / max(w, h)
+                w, h = round(w * s), round(h * s)
+            sizes[f] = (w, h)
+        _run(f"preset {preset}", sizes)
+
+    for n in (50, 200, 800):
+        _run("icons 16-96px", {i: (rng.randint(16, 96), rng.randint(16, 96)) for i in range(n)})
+    for n in (50, 200, 800):
+        _run("mixed 16-256px", {i: (rng.randint(16, 256), rng.randint(16, 256)) for i in range(n)})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark and round-trip check for breed_parser.py on the real lib/models/breed.dart.
+
+Times the two legacy regexes (generate_breed_images / test_youtube_videos),
+a full tokenizer parse, and a cached index load. Then checks that:
+  - every breed the legacy regexes found has the same fields in the new index;
+  - the index survives a round trip: re-emitting every breed as Dart source
+    and parsing that again gives back an identical index.
+
+Usage:
+  python scripts/bench_breed_parser.py [--repeat N]
+"""
+
+import argparse
+import json
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from breed_parser import BREED_FILE, load_breeds, parse_breeds_source
+
+LEGACY_HEADSHOT_RE = r"Breed\(\s*(\d+),\s*'([^']+)',\s*[^,]+,\s*[^,]+,\s*'([^']+)',"
+LEGACY_VIDEO_RE = (
+    r"Breed\(\s*(\d+),\s*'([^']+)',\s*[^,]+,\s*[^,]+,\s*[^,]+,\s*\d+,\s*'([^']+)',"
+    r"\s*'([^']+)',\s*'([^']+)',\s*'([^']+)',"
+)
+
+BREED_CLASS = """
+class Breed {
+  Breed(this.id, this.name, this.sortOrder, this.htmlUrl, this.pictureHeadShotName,
+      this.crossRefBreedID, this.fullSizedPicture, this.youTubeURL, this.cats101URL,
+      this.playListID, this.rid, this.percentMatch, this.backgroundColor,
+      this.breedSummary, this.stats);
+}
+"""
+
+
+def _dart(value):
+    """Dart literal for a parsed value (inverse of breed_parser's value reader)."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, str):
+        if value.startswith("Colors."):
+            return value
+        return "'" + value.replace("\\", "\\\\").replace("'", "\\'").replace("\n", "\\n") + "'"
+    if isinstance(value, list):
+        return "[" + ", ".join(_dart(v) for v in value) + "]"
+    if isinstance(value, dict) and "isPercent" in value:
+        return f"StatValue({_dart(value['name'])}, {_dart(value['isPercent'])}, {_dart(value['value'])})"
+    raise TypeError(f"cannot emit {value!r}")
+
+
+def emit_dart(breeds):
+    calls = ",\n".join("  Breed(" + ", ".join(_dart(v) for v in b.values()) + ")" for b in breeds)
+    return BREED_CLASS + "\nList<Breed> breeds = [\n" + calls + ",\n];\n"
+
+
+def _best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark breed.dart parsing.")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    source = BREED_FILE.read_text(encoding="utf-8")
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = Path(tmp) / "breeds.json"
+        load_breeds(BREED_FILE, cache_path=cache_path)  # warm the cache
+
+        timings = [
+            ("legacy headshot regex", lambda: list(re.finditer(LEGACY_HEADSHOT_RE, source))),
+            ("legacy video regex", lambda: list(re.finditer(LEGACY_VIDEO_RE, source, re.MULTILINE))),
+            ("tokenizer parse (all fields)", lambda: parse_breeds_source(source)),
+            ("cached index load", lambda: load_breeds(BREED_FILE, cache_path=cache_path)),
+        ]
+        print(f"{'method':<30} {'best (ms)':>10} {'items':>6}")
+        results = {}
+        for label, fn in timings:
+            t, out = _best_of(fn, args.repeat)
+            results[label] = out
+            print(f"{label:<30} {t * 1000:>10.2f} {len(out):>6}")
+
+    breeds = results["tokenizer parse (all fields)"]
+    by_id = {b["id"]: b for b in breeds}
+    failures = []
+
+    for m in results["legacy headshot regex"]:
+        b = by_id.get(int(m.group(1)))
+        if not b or (b["name"], b["pictureHeadShotName"]) != (m.group(2), m.group(3)):
+            failures.append(f"headshot mismatch for id {m.group(1)}")
+    for m in results["legacy video regex"]:
+        b = by_id.get(int(m.group(1)))
+        expected = (m.group(2), m.group(3), m.group(4), m.group(5), m.group(6))
+        if not b or (b["name"], b["fullSizedPicture"], b["youTubeURL"], b["cats101URL"], b["playListID"]) != expected:
+            failures.append(f"video field mismatch for id {m.group(1)}")
+
+    reparsed = parse_breeds_source(emit_dart(breeds))
+    if json.dumps(reparsed, sort_keys=True) != json.dumps(breeds, sort_keys=True):
+        failures.append("round trip through emitted Dart changed the index")
+
+    print(f"\nLegacy regexes matched {len(results['legacy headshot regex'])} / "
+          f"{len(results['legacy video regex'])} breeds; parser found {len(breeds)}")
+    if failures:
+        print("FAILED:")
+        for f in failures:
+            print(f"  - {f}")
+        sys.exit(1)
+    print("Legacy fields agree and round trip is lossless.")
+
+
+if __name__ == "__main__":
+    main()
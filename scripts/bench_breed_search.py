@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark breed_search_index.py lookups against a naive scan of the same data.
+
+The query set replays typing: every prefix of every breed name plus a sample
+of summary words ("p", "pe", "per", ... "persian"), so each query is one
+keystroke of the search box. The naive scan does what the app does today:
+lowercase each breed's name and summaries and test every query word with
+`contains` (Python `in`). The index answers the same query by lookup.
+
+--scale N repeats the corpus N times (names suffixed " #k") to show how both
+approaches grow with the number of breeds. Also checked: every breed whose
+name starts with the query (and the scan finds) is found by the index, and a sample of one-typo names
+still find their breed through the trigram fallback.
+
+Usage:
+  python scripts/bench_breed_search.py [--repeat N] [--scale 1,10,100]
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from breed_parser import load_breeds
+from breed_search_index import SUMMARY_ALIASES, BreedSearch, build_index, parse_summaries, tokenize
+
+SUMMARY_WORDS = 40  # summary words added to the typed queries
+TYPO_SAMPLES = 40
+
+
+def typed_queries(breeds, rng):
+    """Every prefix of every name, plus every prefix of some summary words."""
+    words = sorted({w for b in breeds for w in tokenize(b["breedSummary"]) if len(w) > 3})
+    typed = [b["name"].lower() for b in breeds] + rng.sample(words, min(SUMMARY_WORDS, len(words)))
+    return [text[:n] for text in typed for n in range(1, len(text) + 1) if text[:n].strip()]
+
+
+def naive_search(corpus, query):
+    """The app's scan: lowercase every breed's text and test each query word with contains."""
+    words = query.lower().split()
+    return [bid for bid, name, text in corpus if all(w in (name + " " + text).lower() for w in words)]
+
+
+def _scaled(breeds, summaries, scale):
+    """The corpus repeated `scale` times, copies renamed "<name> #k" (summaries follow their breed)."""
+    by_breed = {SUMMARY_ALIASES.get(h, h): text for h, text in summaries.items()}
+    out, extra = [], {}
+    for k in range(scale):
+        for b in breeds:
+            name = b["name"] if k == 0 else f"{b['name']} #{k}"
+            out.append({**b, "id": b["id"] + k * 10000, "name": name})
+            if b["name"] in by_breed:
+                extra[name] = by_breed[b["name"]]
+    return out, extra
+
+
+def _typo(word, rng):
+    i = rng.randrange(1, len(word))
+    return word[:i] + rng.choice("abcdefghijklmnopqrstuvwxyz".replace(word[i], "")) + word[i + 1:]
+
+
+def _best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark breed search index vs. naive scan.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scale", default="1,10,50", help="Comma-separated corpus multipliers")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    breeds, summaries = load_breeds(), parse_summaries()
+    queries = typed_queries(breeds, rng)
+    failures = []
+
+    print(f"{len(queries)} keystroke queries\n")
+    print(f"{'breeds':>7} {'build ms':>9} {'index us/q':>11} {'scan us/q':>10} {'speedup':>8}")
+    for scale in (int(s) for s in args.scale.split(",")):
+        docs, extra = _scaled(breeds, summaries, scale)
+        start = time.perf_counter()
+        index = build_index(docs, extra)
+        build = time.perf_counter() - start
+        search = BreedSearch(index)
+        corpus = [(b["id"], b["name"], " ".join([b["breedSummary"], extra.get(b["name"], "")])) for b in docs]
+
+        t_index = _best_of(lambda: [search.search(q) for q in queries], args.repeat)
+        t_scan = _best_of(lambda: [naive_search(corpus, q) for q in queries], args.repeat)
+        print(f"{len(docs):>7} {build * 1000:>9.1f} {t_index / len(queries) * 1e6:>11.1f} "
+              f"{t_scan / len(queries) * 1e6:>10.1f} {t_scan / t_index:>7.1f}x")
+
+        if scale == 1:
+            names = {b["id"]: b["name"].lower() for b in breeds}
+            for q in queries:
+                by_name = {bid for bid in naive_search(corpus, q) if names[bid].startswith(q)}
+                missing = by_name - {bid for bid, _ in search.search(q)}
+                if missing:
+                    failures.append(f"{q!r}: index misses {sorted(missing)} found by the scan")
+            found = 0
+            sample = [b for b in breeds if len(b["name"]) >= 5]
+            for b in rng.sample(sample, min(TYPO_SAMPLES, len(sample))):
+                query = _typo(b["name"].lower(), rng)
+                found += b["id"] in {bid for bid, _ in search.search(query, limit=5)}
+            print(f"{'':>7} one-typo names found in top 5: {found}/{min(TYPO_SAMPLES, len(sample))} "
+                  f"(the scan finds none)")
+
+    if failures:
+        print("\nFAILED:")
+        for f in failures[:20]:
+            print(f"  - {f}")
+        sys.exit(1)
+    print("\nEvery breed the scan finds by name prefix is also found by the index.")
+
+
+if __name__ == "__main__":
+    main()
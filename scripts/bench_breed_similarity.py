@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark breed_similarity.py: batched NumPy all-pairs similarity vs. nested loops.
+
+The real 64 breeds are checked first: the batched matrix and top-k must match
+a plain Python double loop (the on-device approach today) to within float32
+rounding. Then synthetic catalogs of --sizes breeds are drawn from the real
+stat distribution (each stat sampled from its observed values) and timed. The
+nested loop is only run up to --loop-max breeds; beyond that its time is
+extrapolated from the largest measured size (it is O(n^2 * stats)).
+
+Usage:
+  python scripts/bench_breed_similarity.py [--sizes 64,500,2000,5000] [--loop-max 500] [--k 8]
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from breed_parser import load_breeds
+from breed_similarity import DEFAULT_K, STAT_MAX, STAT_MIN, similarity_matrix, stat_matrix, stat_weights, top_k
+
+
+def nested_loop(rows, weights, k):
+    """Reference: per-pair Python loops, then a full sort of each breed's list."""
+    span = STAT_MAX - STAT_MIN
+    n = len(rows)
+    S = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(n):
+            S[i][j] = sum(w * (1 - abs(a - b) / span) for w, a, b in zip(weights, rows[i], rows[j]))
+    neighbors = [sorted((j for j in range(n) if j != i), key=lambda j: (-S[i][j], j))[:k] for i in range(n)]
+    return S, neighbors
+
+
+def batched(X, weights, k):
+    S = similarity_matrix(X, weights)
+    return S, top_k(S, k)
+
+
+def synthetic(X, n, rng):
+    """n breeds whose stats are drawn independently from each column of X."""
+    return np.stack([rng.choice(X[:, j], size=n) for j in range(X.shape[1])], axis=1).astype(np.float32)
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark batched breed similarity.")
+    parser.add_argument("--sizes", default="64,500,2000,5000", help="Comma-separated synthetic breed counts")
+    parser.add_argument("--loop-max", type=int, default=500, help="Largest size to run the nested loop on")
+    parser.add_argument("--k", type=int, default=DEFAULT_K)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    names, X = stat_matrix(load_breeds())
+    weights = stat_weights(names)
+    failures = []
+
+    S_ref, nb_ref = nested_loop(X.tolist(), weights.tolist(), args.k)
+    S, (idx, scores) = batched(X, weights, args.k)
+    err = float(np.abs(S - np.array(S_ref)).max())
+    if err > 1e-5:
+        failures.append(f"matrix differs from nested loop by {err:.2e}")
+    for i, expected in enumerate(nb_ref):
+        # Neighbour sets may only differ among pairs whose scores tie at float32 precision
+        got_scores = sorted((round(S_ref[i][j], 5) for j in idx[i]), reverse=True)
+        want_scores = [round(S_ref[i][j], 5) for j in expected]
+        if got_scores != want_scores:
+            failures.append(f"row {i}: top-{args.k} scores {got_scores} != {want_scores}")
+    print(f"Real catalog: {X.shape[0]} breeds x {X.shape[1]} stats, max |batched - loop| = {err:.1e}\n")
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'breeds':>7} {'batched ms':>11} {'loop ms':>12} {'speedup':>9} {'matrix MB':>10}")
+    loop_ref = None  # (n, seconds) of the largest nested-loop run
+    for n in (int(s) for s in args.sizes.split(",")):
+        Xn = synthetic(X, n, rng)
+        t_batch, _ = _timed(lambda: batched(Xn, weights, args.k))
+        if n <= args.loop_max:
+            t_loop, _ = _timed(lambda: nested_loop(Xn.tolist(), weights.tolist(), args.k))
+            loop_ref = (n, t_loop)
+            loop = f"{t_loop * 1000:>12.0f}"
+        elif loop_ref:
+            t_loop = loop_ref[1] * (n / loop_ref[0]) ** 2
+            loop = f"{'~%.0f' % (t_loop * 1000):>12}"
+        else:
+            t_loop, loop = None, f"{'-':>12}"
+        speedup = f"{t_loop / t_batch:>8.0f}x" if t_loop else f"{'-':>9}"
+        print(f"{n:>7} {t_batch * 1000:>11.1f} {loop} {speedup} {n * n * 4 / 1e6:>10.1f}")
+
+    if failures:
+        print("\nFAILED:")
+        for f in failures[:20]:
+            print(f"  - {f}")
+        sys.exit(1)
+    print("\nBatched matrix and top-k agree with the nested loop on the real catalog (~ = extrapolated).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark the vectorized chroma key against the original per-pixel loop
+that generate_splash_sizes.py used, and check that both produce the same
+hard-edged result.
+
+Usage:
+  python scripts/bench_chroma_key.py [image] [--repeat N]
+
+  image   Source image (default: assets/splash/splash.png).
+
+Requires: pip install Pillow numpy
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from chroma_key import apply_chroma_key
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+DEFAULT_IMAGE = PROJECT_ROOT / "assets" / "splash" / "splash.png"
+
+KEY_RGB = (107, 76, 148)
+TOLERANCE = 45
+
+
+def _legacy_replace(img: Image.Image, key_rgb, tolerance) -> Image.Image:
+    """The original per-pixel implementation, kept here as the reference."""
+    pr, pg, pb = key_rgb
+    new_data = []
+    for item in img.getdata():
+        if len(item) == 4:
+            r, g, b, a = item
+        else:
+            r, g, b = item[0], item[1], item[2]
+            a = 255
+        dist = ((r - pr) ** 2 + (g - pg) ** 2 + (b - pb) ** 2) ** 0.5
+        if dist <= tolerance:
+            new_data.append((0, 0, 0, 0))
+        else:
+            new_data.append((r, g, b, a))
+    out = Image.new("RGBA", img.size)
+    out.putdata(new_data)
+    return out
+
+
+def _best_of(fn, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark chroma key implementations.")
+    parser.add_argument("image", nargs="?", type=Path, default=DEFAULT_IMAGE)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per variant; best time is reported")
+    args = parser.parse_args()
+
+    if not args.image.exists():
+        raise SystemExit(f"Image not found: {args.image}")
+    img = Image.open(args.image).convert("RGBA")
+    w, h = img.size
+    print(f"Image: {args.image.name} ({w}x{h}, {w * h / 1e6:.1f} MP)\n")
+
+    legacy_time, legacy = _best_of(lambda: _legacy_replace(img, KEY_RGB, TOLERANCE), 1)
+    variants = [
+        ("vectorized rgb", dict()),
+        ("vectorized rgb feather=12", dict(feather=12)),
+        ("vectorized lab", dict(perceptual=True)),
+        ("vectorized lab feather=6", dict(perceptual=True, feather=6)),
+    ]
+
+    print(f"{'variant':<28} {'best (ms)':>10} {'speedup':>9}")
+    print(f"{'legacy loop':<28} {legacy_time * 1000:>10.1f} {'1.0x':>9}")
+    hard = None
+    for label, kwargs in variants:
+        t, out = _best_of(lambda: apply_chroma_key(img, KEY_RGB, TOLERANCE, **kwargs), args.repeat)
+        if hard is None:
+            hard = out
+        print(f"{label:<28} {t * 1000:>10.1f} {legacy_time / t:>8.1f}x")
+
+    identical = np.array_equal(np.asarray(legacy), np.asarray(hard))
+    print(f"\nHard-edge RGB output identical to legacy loop: {'yes' if identical else 'NO'}")
+
+    # Already-transparent pixels, key-coloured or not, must come out as the loop leaves them
+    probe = np.array(img)
+    probe[: h // 4, :, 3] = 0
+    probe[: h // 8, : w // 2, :3] = KEY_RGB
+    probe = Image.fromarray(probe, "RGBA")
+    same_transparent = np.array_equal(
+        np.asarray(_legacy_replace(probe, KEY_RGB, TOLERANCE)),
+        np.asarray(apply_chroma_key(probe, KEY_RGB, TOLERANCE)),
+    )
+    print(f"Transparent pixels handled like legacy loop:   {'yes' if same_transparent else 'NO'}")
+    if not (identical and same_transparent):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Measure asset_cli.py startup time per subcommand and check what it imports.
+
+Each subcommand is started as `python -X importtime scripts/asset_cli.py <cmd> --help`
+in a fresh interpreter, --runs times. The median wall time is reported together
+with the heaviest top-level imports. The run fails (exit 1) if any median is
+over --budget-ms, or if an offline command (splash, resize, validate-videos)
+or a generator's --help imports the OpenAI SDK.
+
+Usage:
+  python scripts/bench_cli_startup.py [--runs N] [--budget-ms MS]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from asset_cli import COMMANDS
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+CLI = SCRIPT_DIR / "asset_cli.py"
+FORBIDDEN = ("openai",)
+
+
+def _run(args):
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", str(CLI), *args],
+        capture_output=True,
+        text=True,
+    )
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} exited {proc.returncode}: {proc.stderr[-500:]}")
+    return elapsed, proc.stderr
+
+
+def _top_level_imports(importtime_log):
+    """{package: cumulative microseconds} for top-level imports in a -X importtime log."""
+    top = {}
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if name.startswith(" ") and not name.startswith("  "):
+            package = name.strip().split(".")[0]
+            try:
+                top[package] = top.get(package, 0) + int(cumulative)
+            except ValueError:
+                continue  # header line
+    return top
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark asset_cli.py startup per subcommand.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1000.0, help="Maximum median startup time")
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'command':<17} {'median ms':>10} {'max ms':>8}  heaviest imports")
+    for command in [None, *COMMANDS]:
+        argv = [command, "--help"] if command else ["--help"]
+        times, log = [], ""
+        for _ in range(args.runs):
+            elapsed, log = _run(argv)
+            times.append(elapsed * 1000)
+        median = statistics.median(times)
+        imports = _top_level_imports(log)
+        heaviest = sorted(imports.items(), key=lambda kv: kv[1], reverse=True)[:4]
+        label = command or "(no command)"
+        print(f"{label:<17} {median:>10.0f} {max(times):>8.0f}  "
+              + ", ".join(f"{name} {us / 1000:.0f}ms" for name, us in heaviest))
+        if median > args.budget_ms:
+            failures.append(f"{label}: median {median:.0f} ms over {args.budget_ms:.0f} ms budget")
+        for name in FORBIDDEN:
+            if name in imports:
+                failures.append(f"{label}: imports {name}")
+
+    if failures:
+        print("\nFAILED:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print(f"\nAll commands start under {args.budget_ms:.0f} ms without importing {', '.join(FORBIDDEN)}.")
+
+
+if __name__ == "__main__":
+    main()
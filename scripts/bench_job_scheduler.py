@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Check job_scheduler.py against a fake images client that simulates latency and
+throttling. No network and no API key are needed.
+
+The fake client sleeps --latency-ms per call and fails on cue, raising errors
+shaped like the OpenAI SDK's (status_code, response.headers). Scenarios:
+
+1. Retry-After: one job is answered 429 with Retry-After; the job must be
+   retried no sooner than that, and no worker may start a call during the
+   pause (the other jobs are slowed too, not only the throttled one).
+2. 5xx: a job answered 503 twice succeeds on its third attempt.
+3. Other 4xx: a job answered 400 fails after one attempt; nothing is retried.
+4. Rate limits: --jobs fast jobs on --workers workers under --rpm requests and
+   --ipm images per minute (two images per job). Over every window of the run,
+   calls started must stay within the bucket's burst + rate x window, for
+   both buckets.
+5. TokenBucket rejects a rate or capacity <= 0.
+
+Exits 1 on any failure.
+
+Usage:
+  python scripts/bench_job_scheduler.py [--workers 8] [--jobs 60] [--rpm 1200] [--ipm 1800] [--latency-ms 20]
+"""
+
+import argparse
+import sys
+import threading
+import time
+
+from job_scheduler import JobScheduler, TokenBucket
+
+# Slack for thread wake-ups and the gap between taking a token and starting the call
+TIMING_SLACK = 0.05
+
+
+class FakeAPIError(Exception):
+    """An HTTP error as the OpenAI SDK raises it: .status_code and .response.headers."""
+
+    class _Response:
+        def __init__(self, status, headers):
+            self.status_code = status
+            self.headers = headers
+
+    def __init__(self, status, headers=None):
+        super().__init__(f"HTTP {status}")
+        self.status_code = status
+        self.response = self._Response(status, headers or {})
+
+
+class FakeImagesClient:
+    """
+    generate(job) sleeps `latency`, then raises the next error scripted for the
+    job (or returns a fake result). Records when every call started and ended.
+    """
+
+    def __init__(self, latency, script=None):
+        self.latency = latency
+        self.script = {job: list(errors) for job, errors in (script or {}).items()}
+        self.calls = []  # (job, start, end, error or None)
+        self._lock = threading.Lock()
+
+    def generate(self, job):
+        start = time.monotonic()
+        time.sleep(self.latency)
+        with self._lock:
+            errors = self.script.get(job)
+            error = errors.pop(0) if errors else None
+            self.calls.append((job, start, time.monotonic(), error))
+        if error is not None:
+            raise error
+        return f"image for {job}"
+
+    def starts(self, job=None):
+        return sorted(start for j, start, _, _ in self.calls if job is None or j == job)
+
+
+def _scheduler(args, **overrides):
+    options = dict(max_workers=args.workers, requests_per_minute=60_000, images_per_minute=60_000,
+                   base_backoff=0.05, max_backoff=0.2, log=lambda *a: None)
+    options.update(overrides)
+    return JobScheduler(**options)
+
+
+def check_retry_after(args, failures):
+    pause = 0.5
+    client = FakeImagesClient(args.latency_ms / 1000,
+                              {"throttled": [FakeAPIError(429, {"retry-after": str(pause)})]})
+    jobs = ["throttled"] + [f"job-{i}" for i in range(args.workers * 4)]
+    results = {r.job: r for r in _scheduler(args).run(jobs, client.generate)}
+
+    throttled = results["throttled"]
+    if not throttled.ok or throttled.attempts != 2:
+        failures.append(f"429: throttled job ok={throttled.ok} after {throttled.attempts} attempts, expected ok after 2")
+    answered = next(end for job, _, end, error in client.calls if job == "throttled" and error is not None)
+    retried = client.starts("throttled")[-1]
+    if retried - answered < pause - TIMING_SLACK:
+        failures.append(f"429: retried {retried - answered:.2f}s after Retry-After: {pause}")
+    during = [s for s in client.starts() if answered + TIMING_SLACK < s < answered + pause - TIMING_SLACK]
+    if during:
+        failures.append(f"429: {len(during)} call(s) started during the {pause}s pause")
+    if not all(r.ok for r in results.values()):
+        failures.append("429: some jobs failed")
+    print(f"429 + Retry-After {pause}s: retried after {retried - answered:.2f}s; "
+          f"calls started by any worker during the pause: {len(during)}")
+
+
+def check_errors(args, failures):
+    client = FakeImagesClient(args.latency_ms / 1000, {
+        "flaky": [FakeAPIError(503), FakeAPIError(503)],
+        "rejected": [FakeAPIError(400)],
+        "timeout": [TimeoutError("read timed out")],
+    })
+    jobs = ["flaky", "rejected", "timeout", "fine"]
+    results = {r.job: r for r in _scheduler(args).run(jobs, client.generate)}
+    expected = {"flaky": (True, 3), "rejected": (False, 1), "timeout": (True, 2), "fine": (True, 1)}
+    for job, (ok, attempts) in expected.items():
+        r = results[job]
+        calls = len(client.starts(job))
+        print(f"{job:<9} ok={r.ok!s:<5} attempts={r.attempts} calls={calls}")
+        if (r.ok, r.attempts, calls) != (ok, attempts, attempts):
+            failures.append(f"{job}: ok={r.ok}, {r.attempts} attempts, {calls} calls; "
+                            f"expected ok={ok} after {attempts}")
+
+
+def _worst_excess(starts, bucket: TokenBucket, cost):
+    """Largest (calls started in a window) x cost - (burst + rate x window) over all windows."""
+    worst = float("-inf")
+    for i, a in enumerate(starts):
+        for j in range(i, len(starts)):
+            allowed = bucket.capacity + bucket.rate * (starts[j] - a)
+            worst = max(worst, (j - i + 1) * cost - allowed)
+    return worst
+
+
+def check_rate_limits(args, failures):
+    images_per_job = 2
+    client = FakeImagesClient(args.latency_ms / 1000)
+    scheduler = _scheduler(args, requests_per_minute=args.rpm, images_per_minute=args.ipm)
+    start = time.monotonic()
+    results = list(scheduler.run([f"job-{i}" for i in range(args.jobs)], client.generate, images_per_job))
+    wall = time.monotonic() - start
+    starts = client.starts()
+    if len(results) != args.jobs or not all(r.ok for r in results):
+        failures.append("rate limits: not every job succeeded")
+    print(f"\n{args.jobs} jobs, {args.workers} workers, {args.rpm:g} rpm, {args.ipm:g} ipm "
+          f"({images_per_job} images/job): {wall:.2f}s, {len(starts) / wall * 60:.0f} calls/min")
+    for name, bucket, cost in (("requests", scheduler.requests, 1), ("images", scheduler.images, images_per_job)):
+        excess = _worst_excess(starts, bucket, cost)
+        # One token's worth of slack: a call can start a moment after its token was taken
+        ok = excess <= cost + bucket.rate * TIMING_SLACK
+        print(f"  {name:<8} burst {bucket.capacity:g}, {bucket.rate * 60:g}/min: "
+              f"worst window {excess:+.2f} tokens over the limit{'' if ok else '  <- FAIL'}")
+        if not ok:
+            failures.append(f"rate limits: {name} bucket exceeded by {excess:.2f} tokens")
+
+
+def check_bucket_validation(failures):
+    for kwargs in ({"per_minute": 0}, {"per_minute": -5}, {"per_minute": 10, "capacity": 0}):
+        try:
+            TokenBucket(**kwargs)
+        except ValueError:
+            continue
+        failures.append(f"TokenBucket({kwargs}) was accepted")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check the job scheduler against a fake throttling client.")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--jobs", type=int, default=60)
+    parser.add_argument("--rpm", type=float, default=1200)
+    parser.add_argument("--ipm", type=float, default=1800)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    args = parser.parse_args()
+
+    failures = []
+    check_retry_after(args, failures)
+    check_errors(args, failures)
+    check_rate_limits(args, failures)
+    check_bucket_validation(failures)
+
+    if failures:
+        print("\nFAILED:")
+        for f in failures[:20]:
+            print(f"  - {f}")
+        sys.exit(1)
+    print("\nRetry-After pauses every worker; 5xx and timeouts retried; 4xx fail at once; buckets hold.")
+
+
+if __name__ == "__main__":
+    main()
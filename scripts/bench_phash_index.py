@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Check and benchmark phash_index.py.
+
+1. Hash quality on the bundled art: every indexed image is re-encoded as a
+   half-size JPEG (quality 70), which must stay within --radius pHash bits
+   of the original. A copy brightened by 20% is reported too (not checked:
+   a few images with large bright areas move up to 10 bits). The closest
+   pair of images with different content is printed, to show the margin.
+2. Radius queries: --sizes hashes (the real ones, then bit-flipped variants
+   of them, so the set is clustered like real art) are indexed and
+   --queries lookups at --radius are answered three ways: PhashIndex.near
+   (one NumPy XOR + popcount over all hashes), a BK-tree (the usual
+   sub-linear metric tree, as a reference) and a plain Python loop. All
+   three must agree. It prints the share of nodes the BK-tree visits, which
+   is why the index scans instead.
+3. Batched vs. per-image DCT over the real thumbnails.
+
+Exits 1 if a JPEG copy falls outside the radius or the query methods disagree.
+
+Usage:
+  python scripts/bench_phash_index.py [--radius 6] [--sizes 1000,10000,100000] [--queries 200]
+"""
+
+import argparse
+import io
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+from PIL import Image, ImageEnhance
+
+from phash_index import (
+    DEFAULT_RADIUS,
+    PROJECT_ROOT,
+    PhashIndex,
+    hamming,
+    hash_image,
+    hash_thumbnails,
+    thumbnails,
+)
+from resize_png_to_jpg import flatten_onto_white, normalize_mode
+
+
+def variants(img: Image.Image):
+    """{label: copy} of an image as it might come back from another tool."""
+    flat = flatten_onto_white(normalize_mode(img))
+    buf = io.BytesIO()
+    flat.resize((max(1, flat.width // 2), max(1, flat.height // 2)), Image.Resampling.BILINEAR).save(
+        buf, "JPEG", quality=70)
+    buf.seek(0)
+    return {"half-size JPEG": Image.open(buf), "brightened": ImageEnhance.Brightness(flat).enhance(1.2)}
+
+
+CHECKED_VARIANTS = ("half-size JPEG",)
+
+
+def check_quality(index: PhashIndex, radius: int, failures):
+    worst = {}
+    for name, entry in sorted(index.entries.items()):
+        with Image.open(PROJECT_ROOT / name) as im:
+            im.load()
+            for label, copy in variants(im).items():
+                d = hamming(hash_image(copy)[0], entry["phash"])
+                worst[label] = max(worst.get(label, 0), d)
+                if d > radius and label in CHECKED_VARIANTS:
+                    failures.append(f"{name}: {label} copy is {d} bits away (radius {radius})")
+    items = sorted(index.entries.items())
+    closest = min(((hamming(a["phash"], b["phash"]), an, bn) for i, (an, a) in enumerate(items)
+                   for bn, b in items[i + 1:] if a["phash"] != b["phash"]), default=None)
+    print(f"Hash quality on {len(items)} bundled images (radius {radius}):")
+    for label, d in worst.items():
+        note = "" if label in CHECKED_VARIANTS else "  (reported only)"
+        print(f"  {label:<15} worst distance to its original: {d}{note}")
+    if closest:
+        print(f"  closest different images: {closest[0]} bits ({closest[1]}, {closest[2]})")
+
+
+class BKTree:
+    """Reference BK-tree under Hamming distance: node = [hash, names, {distance: child index}]."""
+
+    def __init__(self):
+        self.nodes = []
+        self.visited = 0  # nodes the last query() looked at
+
+    def add(self, h, name):
+        i = 0
+        while self.nodes:
+            node = self.nodes[i]
+            d = hamming(h, node[0])
+            if d == 0:
+                node[1].append(name)
+                return
+            if d not in node[2]:
+                node[2][d] = len(self.nodes)
+                break
+            i = node[2][d]
+        self.nodes.append([h, [name], {}])
+
+    def query(self, h, radius):
+        found, stack, self.visited = [], [0] if self.nodes else [], 0
+        while stack:
+            node_hash, names, children = self.nodes[stack.pop()]
+            self.visited += 1
+            d = hamming(h, node_hash)
+            if d <= radius:
+                found.extend((d, name) for name in names)
+            # Triangle inequality: only subtrees at distance d - r .. d + r can hold a match
+            stack.extend(c for cd, c in children.items() if d - radius <= cd <= d + radius)
+        return sorted(found)
+
+
+def synthetic(seeds, n, rng):
+    """n hashes: the seeds, then copies of random seeds with a few random bits flipped."""
+    out = list(seeds)[:n]
+    while len(out) < n:
+        h = rng.choice(seeds)
+        for _ in range(rng.randint(1, 24)):
+            h ^= 1 << rng.randrange(64)
+        out.append(h)
+    return out
+
+
+def _per_query_ms(fn, probes):
+    start = time.perf_counter()
+    results = [fn(q) for q in probes]
+    return (time.perf_counter() - start) / len(probes) * 1000, results
+
+
+def check_queries(seeds, sizes, queries, radius, rng, failures):
+    print(f"\nRadius {radius} queries, ms per query ({queries} queries):")
+    print(f"{'hashes':>8} {'index scan':>11} {'BK-tree':>9} {'visited':>8} {'Python loop':>12} {'hits/q':>7}")
+    for n in sizes:
+        hashes = synthetic(seeds, n, rng)
+        names = [f"{i:07d}" for i in range(n)]
+        index = PhashIndex(Path(os.devnull))
+        tree = BKTree()
+        for name, h in zip(names, hashes):
+            index.add(name, h, 0, 0, 0)
+            tree.add(h, name)
+        probes = [h ^ (1 << rng.randrange(64)) for h in rng.sample(hashes, min(queries, n))]
+
+        t_index, via_index = _per_query_ms(lambda q: index.near(q, radius), probes)
+        visited = 0
+
+        def tree_query(q):
+            nonlocal visited
+            result = tree.query(q, radius)
+            visited += tree.visited
+            return result
+
+        t_tree, via_tree = _per_query_ms(tree_query, probes)
+        t_loop, via_loop = _per_query_ms(
+            lambda q: sorted((d, name) for name, h in zip(names, hashes) if (d := hamming(q, h)) <= radius), probes)
+        for q, a, b, c in zip(probes, via_index, via_tree, via_loop):
+            if not a == b == c:
+                failures.append(f"n={n}: query {q:016x}: index {len(a)}, BK-tree {len(b)}, loop {len(c)} hits")
+        print(f"{n:>8} {t_index:>11.3f} {t_tree:>9.3f} {visited / len(probes) / len(tree.nodes):>7.1%} "
+              f"{t_loop:>12.3f} {sum(len(r) for r in via_loop) / len(probes):>7.1f}")
+
+
+def check_batching(index: PhashIndex):
+    thumbs = []
+    for name in sorted(index.entries):
+        with Image.open(PROJECT_ROOT / name) as im:
+            thumbs.append(thumbnails(im))
+    start = time.perf_counter()
+    batched = hash_thumbnails(thumbs)
+    t_batch = time.perf_counter() - start
+    start = time.perf_counter()
+    single = [hash_thumbnails([t])[0] for t in thumbs]
+    t_single = time.perf_counter() - start
+    print(f"\nDCT + packing for {len(thumbs)} thumbnails: batched {t_batch * 1000:.2f} ms, "
+          f"one at a time {t_single * 1000:.2f} ms ({t_single / t_batch:.1f}x)")
+    return batched == single
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check and benchmark the perceptual-hash index.")
+    parser.add_argument("--radius", type=int, default=DEFAULT_RADIUS)
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Comma-separated index sizes")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    index = PhashIndex()
+    index.update()
+    index.save()
+    failures = []
+    check_quality(index, args.radius, failures)
+    seeds = sorted({e["phash"] for e in index.entries.values()})
+    check_queries(seeds, [int(s) for s in args.sizes.split(",")], args.queries, args.radius,
+               random.Random(args.seed), failures)
+    if not check_batching(index):
+        failures.append("batched hashes differ from one-at-a-time hashes")
+
+    if failures:
+        print("\nFAILED:")
+        for f in failures[:20]:
+            print(f"  - {f}")
+        sys.exit(1)
+    print("\nJPEG copies stay within the radius; index, BK-tree and loop agree.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Drive the generation and validation pipelines against mock_services.py and
+record throughput and tail latency.
+
+Scenarios (each run as a subprocess, the way it runs for real):
+  breeds      generate_breed_images.py: DALL-E for every breed, resize in a process pool
+  cat-types   generate_cat_type_images.py: one GPT-4o vision call, then DALL-E per type
+  youtube     test_youtube_videos.py --no-cache: oEmbed (watch-page fallback) per video
+
+Every run gets a scratch output directory and derivative cache (ASSET_CACHE_DIR),
+so nothing is skipped as up to date and the repo's assets are not touched.
+Per-request latency comes from the pipeline's own --timing log
+(stage_timing.py): "api" for the generators, "oembed"/"watch" for YouTube.
+
+For each scenario this prints items, wall time, items/s, p50/p95/max request
+latency and what the server answered (including injected 429/5xx). It also
+appends one JSON line with the mock settings and pipeline flags to
+build/bench/pipelines.jsonl, so results from before and after a scheduling
+or concurrency change can be compared.
+
+Usage:
+  python scripts/bench_pipelines.py [--scenarios breeds,cat-types,youtube] [--workers 4]
+                                    [--rpm 6000] [--ipm 6000] [--concurrency 8]
+                                    [--error-429 0.05] [--images-latency lognormal:0.5:0.4] ...
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+import mock_services
+import stage_timing
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+RESULTS_PATH = PROJECT_ROOT / "build" / "bench" / "pipelines.jsonl"
+SCENARIOS = ("breeds", "cat-types", "youtube")
+
+# Stage(s) whose events are the per-item request latency
+LATENCY_STAGES = {"breeds": ("api",), "cat-types": ("api",), "youtube": ("oembed", "watch")}
+
+
+def scenario_command(name, args, server, scratch: Path):
+    """argv for one scenario run."""
+    if name == "breeds":
+        return [sys.executable, str(PROJECT_ROOT / "generate_breed_images.py"),
+                "--output-dir", str(scratch / "out"), "--workers", str(args.workers),
+                "--rpm", str(args.rpm), "--ipm", str(args.ipm)]
+    if name == "cat-types":
+        return [sys.executable, str(SCRIPT_DIR / "generate_cat_type_images.py"),
+                "--output-dir", str(scratch / "out"), "--splash", str(args.splash),
+                "--workers", str(args.workers), "--rpm", str(args.rpm), "--ipm", str(args.ipm)]
+    if name == "youtube":
+        return [sys.executable, str(SCRIPT_DIR / "test_youtube_videos.py"), "--no-cache",
+                "--concurrency", str(args.concurrency),
+                "--oembed-url", f"{server.base_url}/oembed", "--watch-url", f"{server.base_url}/watch"]
+    raise ValueError(name)
+
+
+def run_scenario(name, args, server):
+    """Run one scenario against the server. Returns its result record."""
+    with tempfile.TemporaryDirectory(prefix=f"bench-{name}-") as tmp:
+        scratch = Path(tmp)
+        log = scratch / "timing.jsonl"
+        env = {**os.environ, **server.env(), "ASSET_CACHE_DIR": str(scratch / "cache")}
+        for var in (stage_timing.ENV_LOG, stage_timing.ENV_RUN, stage_timing.ENV_PROFILE):
+            env.pop(var, None)
+        cmd = scenario_command(name, args, server, scratch) + ["--timing", str(log)]
+
+        server.counts.clear()
+        start = time.perf_counter()
+        proc = subprocess.run(cmd, cwd=PROJECT_ROOT, env=env, capture_output=True, text=True)
+        wall = time.perf_counter() - start
+        if args.verbose or proc.returncode not in (0, 1):
+            print(proc.stdout[-4000:], proc.stderr[-4000:], sep="\n")
+        events = stage_timing.load_events(log) if log.exists() else []
+
+    stages = stage_timing.summarize(events)
+    requests = [e for e in events if e["stage"] in LATENCY_STAGES[name]]
+    if name == "youtube":
+        # One item per video: its last request (the watch page when oEmbed fell back)
+        items = len({e["item"] for e in requests})
+    else:
+        items = sum(1 for e in events if e["stage"] == "write" and e.get("ok", True))
+    latency = stage_timing.summarize([{**e, "stage": "request"} for e in requests]).get("request", {})
+    return {
+        "scenario": name,
+        "returncode": proc.returncode,
+        "items": items,
+        "wall_s": round(wall, 3),
+        "items_per_s": round(items / wall, 3) if wall else 0.0,
+        "requests": len(requests),
+        "latency_p50_s": round(latency.get("p50", 0.0), 4),
+        "latency_p95_s": round(latency.get("p95", 0.0), 4),
+        "latency_max_s": round(latency.get("max", 0.0), 4),
+        "stages": {k: {m: round(v, 4) if isinstance(v, float) else v for m, v in s.items()} for k, s in stages.items()},
+        "server": server.stats_dict(),
+    }
+
+
+def _git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the pipelines against local mock services.")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated scenarios")
+    parser.add_argument("--workers", type=int, default=4, help="Generator --workers")
+    parser.add_argument("--rpm", type=float, default=6000, help="Generator --rpm (high: measure the pipeline)")
+    parser.add_argument("--ipm", type=float, default=6000, help="Generator --ipm")
+    parser.add_argument("--concurrency", type=int, default=8, help="test_youtube_videos.py --concurrency")
+    parser.add_argument("--splash", type=Path, default=PROJECT_ROOT / "assets" / "splash" / "splash.png",
+                        help="Mascot image sent to the vision call in cat-types")
+    parser.add_argument("--results", type=Path, default=RESULTS_PATH, help="JSONL file results are appended to")
+    parser.add_argument("--verbose", action="store_true", help="Print each pipeline's output")
+    mock_services.add_arguments(parser)
+    args = parser.parse_args()
+
+    names = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+
+    config = mock_services.config_from_args(args, port=0)
+    server = mock_services.MockServices(config).start()
+    print(f"Mock services on {server.base_url}; image {len(server.png) / 1e6:.2f} MB, "
+          f"429 {config.error_429:.0%}, 5xx {config.error_5xx:.0%}\n")
+    print(f"{'scenario':<10} {'items':>6} {'wall s':>8} {'items/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'max ms':>8}  server responses")
+    results = []
+    try:
+        for name in names:
+            r = run_scenario(name, args, server)
+            results.append(r)
+            answered = ", ".join(f"{ep} " + "/".join(f"{n}x{code}" for code, n in codes.items())
+                                 for ep, codes in r["server"].items())
+            print(f"{name:<10} {r['items']:>6} {r['wall_s']:>8.2f} {r['items_per_s']:>8.2f} "
+                  f"{r['latency_p50_s'] * 1000:>8.0f} {r['latency_p95_s'] * 1000:>8.0f} "
+                  f"{r['latency_max_s'] * 1000:>8.0f}  {answered}")
+    finally:
+        server.stop()
+
+    record = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "revision": _git_revision(),
+        "mock": asdict(config),
+        "pipeline": {"workers": args.workers, "rpm": args.rpm, "ipm": args.ipm, "concurrency": args.concurrency},
+        "results": results,
+    }
+    args.results.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.results, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+    print(f"\nAppended to {args.results}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Chaos check for work_queue.py: kill and stall workers mid-run, then prove that
+no item was lost and none was completed twice.
+
+A scratch queue of --items items is drained by --workers worker processes
+(this script re-run with --worker). Each worker claims an item, "works" for a
+random --work-ms, writes its output with a temp file + rename, and completes it,
+checking ensure_held() before the work and its LeaseToken just before the
+rename, as the generators do.
+Meanwhile the controller:
+
+  - SIGKILLs a random worker --kills times and starts a replacement, so
+    leases are abandoned mid-item and must expire and be taken over;
+  - SIGSTOPs a worker for longer than the lease --stalls times, then
+    SIGCONTs it, so a worker whose lease was taken over finishes late and
+    tries to complete an item that is already done;
+  - once, halfway through, SIGKILLs every worker at once and starts a
+    fresh set, which is what resuming after a crashed run looks like.
+
+Then it checks that every item has a done marker and an output with the right
+content, and that the journal records exactly one "done" per item. It also
+prints how many takeovers, skipped lost leases and late duplicate completions
+happened, to show the crash paths were actually exercised.
+
+A separate in-process check covers requeueing: re-adding a done item with the
+same data leaves it done; with new data it is pending again, a worker holding
+the old revision can neither keep working on it nor complete it, and the next
+worker completes the new revision. Exits 1 on any failure.
+
+Usage:
+  python scripts/bench_work_queue.py [--items 400] [--workers 6] [--kills 25] [--stalls 4]
+                                     [--lease 0.6] [--work-ms 20:80] [--seed 1]
+"""
+
+import argparse
+import json
+import os
+import pickle
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+from work_queue import LeaseLost, WorkQueue
+
+TIMEOUT_SECONDS = 300
+
+
+def run_worker(args) -> None:
+    """Worker process: drain the queue, writing out/<item>.txt for each item."""
+    rng = random.Random()
+    low, high = (float(v) / 1000 for v in args.work_ms.split(":"))
+    out_dir = args.worker / "out"
+    queue = WorkQueue(args.worker, lease_seconds=args.lease, log=lambda *a: None)
+    for item_id in queue.claims(poll=args.lease / 4):
+        out = out_dir / f"{item_id}.txt"
+        tmp = out.with_name(f".{out.name}.{os.getpid()}.tmp")
+        try:
+            queue.ensure_held(item_id)
+            queue.journal("work", item_id)
+            time.sleep(rng.uniform(low, high))
+            lease = queue.token(item_id)
+            tmp.write_text(queue.data(item_id)["expect"], encoding="utf-8")
+            time.sleep(rng.uniform(0, low))  # widen the window between writing and completing
+            lease.check()
+        except LeaseLost:
+            tmp.unlink(missing_ok=True)
+            queue.journal("skip", item_id)
+            continue
+        os.replace(tmp, out)
+        queue.complete(item_id, {"path": out.name})
+    queue.close()
+
+
+def _spawn(queue_dir, args):
+    cmd = [sys.executable, __file__, "--worker", str(queue_dir), "--lease", str(args.lease),
+           "--work-ms", args.work_ms]
+    return subprocess.Popen(cmd)
+
+
+def verify(queue: WorkQueue, items: int):
+    """Returns (failures, journal event counts)."""
+    failures = []
+    events = [json.loads(line) for line in queue.journal_path.read_text(encoding="utf-8").splitlines()]
+    done = Counter(e["item"] for e in events if e["event"] == "done")
+    ids = queue.item_ids()
+    if len(ids) != items:
+        failures.append(f"{len(ids)} items queued, expected {items}")
+    for item_id in ids:
+        if not queue.is_done(item_id):
+            failures.append(f"{item_id}: lost (no done marker)")
+        if done[item_id] != 1:
+            failures.append(f"{item_id}: completed {done[item_id]} times")
+        out = queue.root / "out" / f"{item_id}.txt"
+        if not out.exists():
+            failures.append(f"{item_id}: output missing")
+        elif out.read_text(encoding="utf-8") != queue.data(item_id)["expect"]:
+            failures.append(f"{item_id}: output has the wrong content")
+    return failures, Counter(e["event"] for e in events)
+
+
+def check_requeue(failures) -> None:
+    with tempfile.TemporaryDirectory(prefix="work-queue-requeue-") as tmp:
+        controller = WorkQueue(tmp, log=lambda *a: None)
+        first, second = WorkQueue(tmp, log=lambda *a: None), WorkQueue(tmp, log=lambda *a: None)
+        controller.add("item", {"prompt": "v1"})
+        if not (first.claim("item") and first.complete("item")):
+            failures.append("requeue: could not complete the first revision")
+        if controller.add("item", {"prompt": "v1"}) or not controller.is_done("item"):
+            failures.append("requeue: re-adding the same data changed a done item")
+        if not controller.add("item", {"prompt": "v2"}) or controller.is_done("item"):
+            failures.append("requeue: new data did not make the done item pending again")
+        if not first.claim("item"):
+            failures.append("requeue: could not claim the requeued item")
+        lease = pickle.loads(pickle.dumps(first.token("item")))  # as sent to a resize process
+        controller.add("item", {"prompt": "v3"})  # requeued again while `first` works on v2
+        try:
+            lease.check()
+            failures.append("requeue: a LeaseToken for a stale revision passed its check")
+        except LeaseLost:
+            pass
+        try:
+            first.ensure_held("item")
+            failures.append("requeue: ensure_held passed for a stale revision")
+        except LeaseLost:
+            pass
+        if first.complete("item"):
+            failures.append("requeue: a stale revision was completed")
+        if not (second.claim("item") and second.data("item") == {"prompt": "v3"} and second.complete("item")):
+            failures.append("requeue: the newest revision could not be claimed and completed")
+        print(f"Requeue: revision {controller.revision('item')}, done={controller.is_done('item')}")
+
+
+def check_takeover_token(failures) -> None:
+    with tempfile.TemporaryDirectory(prefix="work-queue-token-") as tmp:
+        stalled, other = WorkQueue(tmp, lease_seconds=0.05, log=lambda *a: None), WorkQueue(tmp, log=lambda *a: None)
+        stalled.add("item", {"prompt": "v1"})
+        stalled.claim("item")
+        lease = pickle.loads(pickle.dumps(stalled.token("item")))
+        time.sleep(0.1)  # no heartbeat: the lease expires
+        if not other.claim("item"):
+            failures.append("token: the expired lease was not taken over")
+        try:
+            lease.check()
+            failures.append("token: a LeaseToken passed its check after a takeover")
+        except LeaseLost:
+            print("Takeover: the stalled worker's LeaseToken fails its check")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Kill workers mid-run and check the work queue loses nothing.")
+    parser.add_argument("--items", type=int, default=400)
+    parser.add_argument("--workers", type=int, default=6)
+    parser.add_argument("--kills", type=int, default=25, help="Workers to SIGKILL at random")
+    parser.add_argument("--stalls", type=int, default=4, help="Workers to SIGSTOP past their lease")
+    parser.add_argument("--lease", type=float, default=0.6, help="Lease seconds (short, so takeovers happen)")
+    parser.add_argument("--work-ms", default="20:80", help="Per-item work time range, ms")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--worker", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        run_worker(args)
+        return
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory(prefix="work-queue-") as tmp:
+        queue_dir = Path(tmp)
+        (queue_dir / "out").mkdir()
+        queue = WorkQueue(queue_dir, lease_seconds=args.lease)
+        queue.add_many({f"item-{i:05d}": {"expect": f"payload {i}"} for i in range(args.items)})
+
+        start = time.perf_counter()
+        workers = [_spawn(queue_dir, args) for _ in range(args.workers)]
+        kills = stalls = 0
+        stopped = {}  # worker -> when to SIGCONT it
+        killed_all = False
+        try:
+            while any(w.poll() is None for w in workers):
+                if time.perf_counter() - start > TIMEOUT_SECONDS:
+                    raise SystemExit(f"FAILED: queue not drained after {TIMEOUT_SECONDS}s: {queue.status()}")
+                time.sleep(rng.uniform(0.02, 0.15))
+                for w, resume in list(stopped.items()):
+                    if time.perf_counter() >= resume:
+                        w.send_signal(signal.SIGCONT)
+                        del stopped[w]
+                live = [w for w in workers if w.poll() is None and w not in stopped]
+                if not live:
+                    break
+                done = queue.status()["done"]
+                if not killed_all and done >= args.items // 2:
+                    for w in live + list(stopped):
+                        w.kill()
+                        w.wait()
+                    stopped.clear()
+                    workers = [_spawn(queue_dir, args) for _ in range(args.workers)]
+                    killed_all = True
+                    print(f"  killed all {len(live)} workers at {done}/{args.items} done; restarted")
+                    continue
+                left_kills, left_stalls = args.kills - kills, args.stalls - stalls
+                if not left_kills + left_stalls:
+                    continue
+                victim = rng.choice(live)
+                if rng.random() < left_kills / (left_kills + left_stalls):
+                    victim.kill()
+                    victim.wait()
+                    workers[workers.index(victim)] = _spawn(queue_dir, args)
+                    kills += 1
+                else:
+                    victim.send_signal(signal.SIGSTOP)
+                    stopped[victim] = time.perf_counter() + args.lease * 2.5
+                    stalls += 1
+        finally:
+            for w in workers:
+                if w in stopped:
+                    w.send_signal(signal.SIGCONT)
+                if w.poll() is None:
+                    w.kill()
+                    w.wait()
+        wall = time.perf_counter() - start
+
+        failures, events = verify(queue, args.items)
+        leftovers = sum(1 for _ in (queue_dir / "out").glob(".*.tmp"))
+
+    print(f"{args.items} items, {args.workers} workers, {kills} kills + 1 kill-all, {stalls} stalls, "
+          f"lease {args.lease:g}s: drained in {wall:.1f}s")
+    print(f"  work started {events['work']}x ({events['work'] - args.items} redone after a crash), "
+          f"takeovers {events['takeover']}, lost leases skipped {events['skip']}, "
+          f"late duplicate completions {events['duplicate']}, "
+          f"abandoned temp files {leftovers}")
+    if events["takeover"] == 0:
+        failures.append("no lease was ever taken over: the kills did not hit a claimed item")
+    check_requeue(failures)
+    check_takeover_token(failures)
+    if failures:
+        print("\nFAILED:")
+        for f in failures[:20]:
+            print(f"  - {f}")
+        sys.exit(1)
+    print("\nEvery item completed exactly once; nothing lost.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Check youtube_async.py against a local oEmbed / watch-page stand-in.
+
+The stand-in answers by video ID prefix, after --latency-ms:
+  ok-*        oEmbed 200 with a title
+  blocked-*   oEmbed 403; the watch page has og:title (playable)
+  removed-*   oEmbed 403; the watch page says "Video unavailable"
+  gone-*      oEmbed 404 (the watch page is never asked)
+  broken-*    oEmbed 500
+
+--videos IDs cycle through those kinds, and every ID is listed --repeat times,
+as the same video shows up under several breeds. The checker must:
+  - return the expected (exists, message) for every kind, falling back to the
+    watch page exactly on 403;
+  - request each distinct ID once (oEmbed, plus watch on 403), however often it
+    is listed;
+  - overlap requests: the run must take well under the serial time.
+Exits 1 on any failure.
+
+Usage:
+  python scripts/bench_youtube_async.py [--videos 100] [--repeat 3] [--concurrency 8] [--latency-ms 50]
+
+Requires: pip install aiohttp
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from collections import Counter
+
+from aiohttp import web
+
+from youtube_async import check_videos_async
+
+# kind -> (exists, message prefix)
+EXPECTED = {
+    "ok": (True, "✓ Playable - Cat video ok-"),
+    "blocked": (True, "✓ Playable (verified via page check)"),
+    "removed": (False, "✗ Video unavailable"),
+    "gone": (False, "✗ Video not found (404)"),
+    "broken": (False, "✗ Error: HTTP 500"),
+}
+
+
+class StandIn:
+    """oEmbed and watch-page endpoints that answer by video ID prefix and count requests."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.requests = Counter()  # (endpoint, video id) -> count
+
+    async def oembed(self, request):
+        video_id = request.query["url"].rsplit("v=", 1)[-1]
+        self.requests["oembed", video_id] += 1
+        await asyncio.sleep(self.latency)
+        kind = video_id.split("-", 1)[0]
+        if kind == "ok":
+            return web.json_response({"title": f"Cat video {video_id}", "type": "video"})
+        if kind in ("blocked", "removed"):
+            return web.Response(status=403)
+        if kind == "gone":
+            return web.Response(status=404)
+        return web.Response(status=500)
+
+    async def watch(self, request):
+        video_id = request.query["v"]
+        self.requests["watch", video_id] += 1
+        await asyncio.sleep(self.latency)
+        if video_id.startswith("removed-"):
+            return web.Response(text="<html><body>Video unavailable</body></html>", content_type="text/html")
+        return web.Response(text=f'<html><meta property="og:title" content="{video_id}"></html>',
+                            content_type="text/html")
+
+    async def serve(self):
+        app = web.Application()
+        app.router.add_get("/oembed", self.oembed)
+        app.router.add_get("/watch", self.watch)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", 0).start()
+        host, port = runner.addresses[0][:2]
+        return runner, f"http://{host}:{port}"
+
+
+def verify(results, ids, requests):
+    failures = []
+    if set(results) != set(ids):
+        failures.append(f"{len(results)} results for {len(set(ids))} distinct IDs")
+    for video_id in sorted(set(ids)):
+        kind = video_id.split("-", 1)[0]
+        exists, prefix = EXPECTED[kind]
+        got = results.get(video_id)
+        if got is None or got[0] != exists or not got[1].startswith(prefix):
+            failures.append(f"{video_id}: got {got!r}, expected ({exists}, {prefix!r}...)")
+        if requests["oembed", video_id] != 1:
+            failures.append(f"{video_id}: oEmbed requested {requests['oembed', video_id]} times")
+        watch_expected = 1 if kind in ("blocked", "removed") else 0
+        if requests["watch", video_id] != watch_expected:
+            failures.append(f"{video_id}: watch page requested {requests['watch', video_id]} times, "
+                            f"expected {watch_expected}")
+    return failures
+
+
+async def run(args):
+    kinds = list(EXPECTED)
+    distinct = [f"{kinds[i % len(kinds)]}-{i:04d}" for i in range(args.videos)]
+    ids = [v for _ in range(args.repeat) for v in distinct] + [None, ""]  # blank IDs are skipped
+
+    stand_in = StandIn(args.latency_ms / 1000)
+    runner, base_url = await stand_in.serve()
+    try:
+        start = time.perf_counter()
+        results = await check_videos_async(ids, args.concurrency, f"{base_url}/oembed", f"{base_url}/watch")
+        wall = time.perf_counter() - start
+    finally:
+        await runner.cleanup()
+    return distinct, results, stand_in.requests, wall
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check the async YouTube checker against a local stand-in.")
+    parser.add_argument("--videos", type=int, default=100, help="Distinct video IDs")
+    parser.add_argument("--repeat", type=int, default=3, help="Times each ID is listed")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    args = parser.parse_args()
+
+    distinct, results, requests, wall = asyncio.run(run(args))
+    failures = verify(results, distinct, requests)
+
+    served = sum(requests.values())
+    serial = served * args.latency_ms / 1000
+    print(f"{len(distinct)} distinct IDs listed {args.repeat}x: {served} requests "
+          f"({sum(n for (e, _), n in requests.items() if e == 'watch')} watch-page fallbacks) "
+          f"in {wall:.2f}s at concurrency {args.concurrency} (serial would be {serial:.2f}s)")
+    for kind in EXPECTED:
+        print(f"  {kind:<8} {sum(1 for v in distinct if v.startswith(kind + '-')):>4} IDs -> "
+              f"{EXPECTED[kind][1]}...")
+    if args.concurrency > 1 and wall > serial / 2:
+        failures.append(f"took {wall:.2f}s, not well under the serial {serial:.2f}s: requests did not overlap")
+    if failures:
+        print("\nFAILED:")
+        for f in failures[:20]:
+            print(f"  - {f}")
+        sys.exit(1)
+    print("\nEvery kind checked correctly and each ID requested once.")
+
+
+if __name__ == "__main__":
+    main()
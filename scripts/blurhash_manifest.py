@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Precompute BlurHash placeholders and dominant colours for the bundled images.
+
+Every image in assets/Cartoon, assets/Full and assets/cat_types gets an entry in
+assets/image_placeholders.json, keyed by the asset path the app builds from
+pictureHeadShotName / fullSizedPicture / imageName (spaces -> underscores):
+
+  {"version": 1, "components": [4, 3], "images": {
+     "assets/Cartoon/American_Curl.png": {"blurhash": "LEHV6nWB2yk8...", "color": "#c49a6c", "w": 512, "h": 512},
+     ...}}
+
+so a tile can paint its placeholder (or plain colour) before the full image
+is decoded. w/h are the source dimensions, for reserving the aspect ratio.
+
+BlurHash follows the reference encoder: the image is converted to linear
+light and projected onto a small cosine basis; the DCT is one NumPy einsum
+over a downscaled copy (the hash only keeps a few low frequencies). Alpha is
+flattened onto white, as the tiles are drawn. The dominant colour is the most
+common colour of a small palette-quantized copy, ignoring transparent pixels.
+
+Only images whose bytes changed since the last run are re-hashed; their keys
+are kept in .asset_cache/placeholders.json.
+
+Usage:
+  python scripts/blurhash_manifest.py [--components 4x3] [--jobs N] [--force]
+
+Requires: pip install Pillow numpy
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from derivative_cache import CACHE_DIR, DerivativeCache
+from resize_png_to_jpg import flatten_onto_white, normalize_mode
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+MANIFEST = PROJECT_ROOT / "assets" / "image_placeholders.json"
+KEY_CACHE = CACHE_DIR / "placeholders.json"
+MANIFEST_VERSION = 1
+
+SOURCE_DIRS = ("assets/Cartoon", "assets/Full", "assets/cat_types")
+PATTERNS = ("*.png", "*.jpg")
+COMPONENTS = (4, 3)
+# Longest edge the image is reduced to before the DCT
+HASH_EDGE = 64
+PALETTE_SIZE = 8
+
+_BASE83 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~"
+_SRGB_TO_LINEAR = np.array(
+    [c / 255 / 12.92 if c / 255 <= 0.04045 else ((c / 255 + 0.055) / 1.055) ** 2.4 for c in range(256)]
+)
+
+
+def _base83(value: int, length: int) -> str:
+    return "".join(_BASE83[(value // 83 ** (length - i - 1)) % 83] for i in range(length))
+
+
+def _linear_to_srgb(v: float) -> int:
+    v = min(max(v, 0.0), 1.0)
+    if v <= 0.0031308:
+        return int(v * 12.92 * 255 + 0.5)
+    return int((1.055 * v ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+
+def blurhash_factors(rgb: np.ndarray, cx: int, cy: int) -> np.ndarray:
+    """(cy, cx, 3) cosine-basis factors of an (H, W, 3) uint8 image, in linear light."""
+    h, w = rgb.shape[:2]
+    linear = _SRGB_TO_LINEAR[rgb]
+    basis_x = np.cos(np.pi * np.arange(cx)[:, None] * np.arange(w)[None, :] / w)
+    basis_y = np.cos(np.pi * np.arange(cy)[:, None] * np.arange(h)[None, :] / h)
+    factors = np.einsum("jy,ix,yxc->jic", basis_y, basis_x, linear) / (w * h)
+    factors *= 2
+    factors[0, 0] /= 2
+    return factors
+
+
+def blurhash_encode(rgb: np.ndarray, cx: int = COMPONENTS[0], cy: int = COMPONENTS[1]) -> str:
+    """BlurHash string for an (H, W, 3) uint8 image with cx x cy components (1-9 each)."""
+    if not (1 <= cx <= 9 and 1 <= cy <= 9):
+        raise ValueError("BlurHash components must be between 1 and 9")
+    factors = blurhash_factors(rgb, cx, cy)
+    dc = factors[0, 0]
+    ac = factors.reshape(-1, 3)[1:]
+
+    out = _base83((cx - 1) + (cy - 1) * 9, 1)
+    if len(ac):
+        quantised_max = int(max(0, min(82, np.floor(np.abs(ac).max() * 166 - 0.5))))
+        max_value = (quantised_max + 1) / 166
+        out += _base83(quantised_max, 1)
+    else:
+        max_value = 1.0
+        out += _base83(0, 1)
+    r, g, b = (_linear_to_srgb(v) for v in dc)
+    out += _base83((r << 16) + (g << 8) + b, 4)
+
+    scaled = ac / max_value
+    quant = np.clip(np.floor(np.sign(scaled) * np.sqrt(np.abs(scaled)) * 9 + 9.5), 0, 18).astype(int)
+    for qr, qg, qb in quant:
+        out += _base83(qr * 19 * 19 + qg * 19 + qb, 2)
+    return out
+
+
+def dominant_color(img: Image.Image) -> str:
+    """Most common colour (#rrggbb) of a small RGBA image, ignoring transparent pixels."""
+    rgba = np.asarray(img.convert("RGBA"))
+    opaque = rgba[rgba[..., 3] >= 128][:, :3]
+    if not len(opaque):
+        return "#ffffff"
+    strip = Image.fromarray(opaque[None, :, :])
+    pal = strip.quantize(colors=PALETTE_SIZE, method=Image.Quantize.MEDIANCUT)
+    counts = np.bincount(np.asarray(pal).ravel(), minlength=PALETTE_SIZE)
+    i = int(counts.argmax())
+    r, g, b = pal.getpalette()[3 * i: 3 * i + 3]
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+
+def placeholder(path, components=COMPONENTS) -> dict:
+    """Manifest entry for one image. Runs in a worker process."""
+    with Image.open(path) as im:
+        w, h = im.size
+        im.draft("RGB", (HASH_EDGE, HASH_EDGE))  # JPEG: decode at reduced scale
+        img = normalize_mode(im)
+        img.thumbnail((HASH_EDGE, HASH_EDGE), Image.Resampling.BILINEAR)
+    rgb = np.asarray(flatten_onto_white(img))
+    return {
+        "blurhash": blurhash_encode(rgb, *components),
+        "color": dominant_color(img),
+        "w": w,
+        "h": h,
+    }
+
+
+def _asset_key(path: Path) -> str:
+    return path.resolve().relative_to(PROJECT_ROOT).as_posix()
+
+
+def _load_json(path: Path):
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_json(path: Path, data, **dump_kwargs):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data, **dump_kwargs), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Precompute BlurHash placeholders for bundled images.")
+    parser.add_argument("--components", default=f"{COMPONENTS[0]}x{COMPONENTS[1]}", help="BlurHash components, XxY")
+    parser.add_argument("--out", type=Path, default=MANIFEST, help="Manifest asset to write")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Re-hash every image")
+    args = parser.parse_args()
+
+    components = tuple(int(c) for c in args.components.lower().split("x"))
+    sources = sorted(p for d in SOURCE_DIRS for pattern in PATTERNS for p in (PROJECT_ROOT / d).glob(pattern))
+
+    previous = _load_json(args.out)
+    if previous.get("version") != MANIFEST_VERSION or tuple(previous.get("components", ())) != components:
+        previous = {}
+    old_images = previous.get("images", {})
+    old_keys = _load_json(KEY_CACHE)
+
+    cache = DerivativeCache()
+    params = {"transform": "blurhash", "components": components, "edge": HASH_EDGE, "palette": PALETTE_SIZE}
+    images, keys, pending = {}, {}, []
+    for src in sources:
+        name = _asset_key(src)
+        keys[name] = cache.key([src], params)
+        if not args.force and name in old_images and old_keys.get(name) == keys[name]:
+            images[name] = old_images[name]
+        else:
+            pending.append((name, src))
+
+    print(f"Hashing {len(pending)} of {len(sources)} image(s) ({len(sources) - len(pending)} unchanged)")
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = {pool.submit(placeholder, src, components): name for name, src in pending}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                images[name] = future.result()
+            except Exception as e:
+                print(f"  Skip {name}: {e}")
+                keys.pop(name)
+                continue
+            print(f"  {name}: {images[name]['blurhash']} {images[name]['color']}")
+    cache.save()
+
+    manifest = {"version": MANIFEST_VERSION, "components": list(components), "images": dict(sorted(images.items()))}
+    if pending or manifest != previous:
+        _write_json(args.out, manifest, separators=(",", ":"))
+    _write_json(KEY_CACHE, keys, indent=2)
+    print(f"{len(images)} placeholder(s) in {args.out} ({args.out.stat().st_size / 1024:.1f} KB)")
+
+
+if __name__ == "__main__":
+    main()
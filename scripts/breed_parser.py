@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Single-pass parser for lib/models/breed.dart, shared by every tool that needs breed data.
+
+The Dart source is tokenized once (strings, numbers, identifiers, punctuation;
+comments skipped). Each `Breed(...)` constructor call in the `breeds` list is
+then read positionally against the field names declared in the `Breed(this.x, ...)`
+constructor, so every field comes out named, including breedSummary and the
+StatValue list:
+
+  {"id": 1, "name": "Abyssinian", ..., "backgroundColor": "Colors.white",
+   "breedSummary": "...", "stats": [{"name": "Energy Level", "isPercent": true, "value": 5}, ...]}
+
+The result is cached as JSON in .asset_cache/breeds.json. The cache is reused
+while breed.dart's size/mtime match; if only the mtime moved, a content hash
+decides.
+
+Usage:
+  python scripts/breed_parser.py [--no-cache] [--json]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+BREED_FILE = PROJECT_ROOT / "lib" / "models" / "breed.dart"
+INDEX_CACHE = PROJECT_ROOT / ".asset_cache" / "breeds.json"
+INDEX_VERSION = 1
+
+# Positional fields of the StatValue constructor
+STAT_VALUE_FIELDS = ("name", "isPercent", "value")
+
+_TOKEN_RE = re.compile(
+    r"""
+      (?P<ws>\s+)
+    | (?P<comment>//[^\n]*|/\*.*?\*/)
+    | (?P<string>r?'''.*?'''|r?\"\"\".*?\"\"\"|r?'(?:[^'\\\n]|\\.)*'|r?"(?:[^"\\\n]|\\.)*")
+    | (?P<number>\d+\.\d+|\d+)
+    | (?P<ident>[A-Za-z_$][\w$]*(?:\.[A-Za-z_$][\w$]*)*)
+    | (?P<punct>[()\[\]{},;=<>])
+    | (?P<other>.)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", "v": "\v", "0": "\0"}
+
+
+class DartParseError(ValueError):
+    pass
+
+
+def _unquote(literal):
+    """Value of a Dart string literal token (no interpolation; `$x` stays literal)."""
+    raw = literal.startswith("r")
+    if raw:
+        literal = literal[1:]
+    q = 3 if literal[:3] in ("'''", '"""') else 1
+    body = literal[q:-q]
+    if raw:
+        return body
+    return re.sub(r"\\(.)", lambda m: _ESCAPES.get(m.group(1), m.group(1)), body, flags=re.DOTALL)
+
+
+def tokenize(source):
+    """Yield (kind, text) tokens, skipping whitespace and comments."""
+    for m in _TOKEN_RE.finditer(source):
+        kind = m.lastgroup
+        if kind in ("ws", "comment"):
+            continue
+        yield kind, m.group()
+
+
+class _Parser:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self, offset=0):
+        i = self.pos + offset
+        return self.tokens[i] if i < len(self.tokens) else (None, None)
+
+    def next(self):
+        tok = self.peek()
+        self.pos += 1
+        return tok
+
+    def expect(self, text):
+        kind, value = self.next()
+        if value != text:
+            raise DartParseError(f"expected {text!r}, got {value!r} (token {self.pos - 1})")
+
+    def value(self):
+        """Parse one expression: literal, identifier, list, or constructor call."""
+        kind, text = self.next()
+        if kind == "string":
+            parts = [_unquote(text)]
+            # Adjacent string literals concatenate
+            while self.peek()[0] == "string":
+                parts.append(_unquote(self.next()[1]))
+            return "".join(parts)
+        if kind == "number":
+            return float(text) if "." in text else int(text)
+        if text == "[":
+            return self.sequence("]")
+        if kind == "ident":
+            if text in ("true", "false"):
+                return text == "true"
+            if text == "null":
+                return None
+            if self.peek()[1] == "(":
+                self.next()
+                args = self.sequence(")")
+                if text == "StatValue":
+                    return dict(zip(STAT_VALUE_FIELDS, args))
+                return {"type": text, "args": args}
+            return text
+        raise DartParseError(f"unexpected token {text!r} (token {self.pos - 1})")
+
+    def sequence(self, close):
+        """Comma-separated values up to `close`; trailing comma allowed."""
+        items = []
+        while self.peek()[1] != close:
+            if self.peek()[0] is None:
+                raise DartParseError(f"unterminated sequence, expected {close!r}")
+            items.append(self.value())
+            if self.peek()[1] == ",":
+                self.next()
+        self.next()
+        return items
+
+
+def _constructor_fields(tokens):
+    """Field names from `Breed(this.a, this.b, ...)` in the class body."""
+    for i in range(len(tokens) - 2):
+        if tokens[i][1] == "Breed" and tokens[i + 1][1] == "(" and tokens[i + 2][1].startswith("this."):
+            fields = []
+            j = i + 2
+            while tokens[j][1] != ")":
+                if tokens[j][1].startswith("this."):
+                    fields.append(tokens[j][1][5:])
+                j += 1
+            return fields
+    raise DartParseError("Breed constructor not found")
+
+
+def parse_breeds_source(source):
+    """Parse breed.dart source text into a list of breed dicts."""
+    tokens = list(tokenize(source))
+    fields = _constructor_fields(tokens)
+
+    # Locate `breeds = [`
+    start = None
+    for i in range(len(tokens) - 2):
+        if tokens[i][1] == "breeds" and tokens[i + 1][1] == "=" and tokens[i + 2][1] == "[":
+            start = i + 3
+            break
+    if start is None:
+        raise DartParseError("`breeds = [` list not found")
+
+    parser = _Parser(tokens)
+    parser.pos = start
+    breeds = []
+    for item in parser.sequence("]"):
+        if not isinstance(item, dict) or item.get("type") != "Breed":
+            raise DartParseError(f"unexpected entry in breeds list: {item!r}")
+        args = item["args"]
+        if len(args) != len(fields):
+            raise DartParseError(f"Breed call has {len(args)} arguments, constructor has {len(fields)}")
+        breeds.append(dict(zip(fields, args)))
+    return breeds
+
+
+def _file_sha256(path):
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def load_breeds(path=BREED_FILE, use_cache=True, cache_path=INDEX_CACHE):
+    """
+    Return the parsed breeds from `path`, using the cached index when it is current.
+    """
+    path = Path(path)
+    st = os.stat(path)
+    stat_sig = [st.st_size, st.st_mtime_ns]
+    cached = None
+    if use_cache:
+        try:
+            cached = json.loads(Path(cache_path).read_text(encoding="utf-8"))
+            if cached.get("version") != INDEX_VERSION or cached.get("source") != str(path.resolve()):
+                cached = None
+        except (OSError, ValueError):
+            cached = None
+        if cached and cached["stat"] == stat_sig:
+            return cached["breeds"]
+
+    digest = _file_sha256(path)
+    if cached and cached["sha256"] == digest:
+        breeds = cached["breeds"]
+    else:
+        breeds = parse_breeds_source(path.read_text(encoding="utf-8"))
+
+    if use_cache:
+        Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "version": INDEX_VERSION,
+            "source": str(path.resolve()),
+            "stat": stat_sig,
+            "sha256": digest,
+            "breeds": breeds,
+        }
+        tmp = Path(str(cache_path) + ".tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, cache_path)
+    return breeds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Parse lib/models/breed.dart into a structured index.")
+    parser.add_argument("--file", type=Path, default=BREED_FILE)
+    parser.add_argument("--no-cache", action="store_true", help="Always re-parse the Dart source")
+    parser.add_argument("--json", action="store_true", help="Print the full index as JSON")
+    args = parser.parse_args()
+
+    breeds = load_breeds(args.file, use_cache=not args.no_cache)
+    if args.json:
+        print(json.dumps(breeds, indent=2, ensure_ascii=False))
+        return
+    for b in breeds:
+        print(f"{b['id']:>3}  {b['name']:<28} stats={len(b['stats'])}  summary={len(b['breedSummary'])} chars")
+    print(f"\n{len(breeds)} breeds")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Build a prebuilt breed search index (assets/breed_search_index.json) from
+lib/models/breed.dart and breed_summaries.txt.
+
+The app filters breeds by scanning every name (and, for full-text search,
+every breedSummary) on each keystroke. This index lets it answer the same
+query by lookup:
+
+  {"version": 1,
+   "docs":  [[1, "Abyssinian"], [2, "American Curl"], ...],        # [breed id, name]
+   "vocab": ["abyssinian", "active", ...],                           # sorted terms
+   "postings": [[0, 13, 5, 1], ...],                                 # per term: doc, weight, doc, weight, ...
+   "trigrams": {"^ab": [0, 17], "aby": [0], ...}}                    # trigram -> term indexes
+
+Text is lowercased, accents are folded and common English stopwords dropped.
+A term's weight in a breed is NAME_WEIGHT per occurrence in the breed's name
+(or its heading in breed_summaries.txt) plus 1 per occurrence in the summaries.
+Both summaries are indexed, the one in breed.dart and the one in breed_summaries.txt.
+
+Lookup (search() below is the reference the app mirrors):
+  1. each query token is matched as a prefix of vocab terms by binary search
+     over the sorted vocab ("amer" -> american);
+  2. if a token matches no term (a typo), candidate terms are the ones sharing
+     at least half of its trigrams ("^" marks a word start). A candidate is kept
+     when the token is within 1 edit (2 for tokens of 6+ letters) of the term's
+     prefix of the same length, and counts at half weight;
+  3. a breed must match every token; breeds are ranked by summed weight, then id.
+A query made only of stopwords ("a", "the") is matched as word prefixes of the
+breed names in "docs" alone, ranked by id: summaries are indexed without
+stopwords, so the vocab cannot answer it, and typing "a" should still find
+Abyssinian.
+
+Only rebuilt when breed.dart, breed_summaries.txt or the index settings change
+(derivative cache).
+
+Usage:
+  python scripts/breed_search_index.py [--out PATH] [--force] [--query "main coon"]
+"""
+
+import argparse
+import bisect
+import json
+import re
+import unicodedata
+from pathlib import Path
+
+from breed_parser import BREED_FILE, load_breeds
+from derivative_cache import DerivativeCache
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+SUMMARIES_FILE = PROJECT_ROOT / "breed_summaries.txt"
+INDEX_PATH = PROJECT_ROOT / "assets" / "breed_search_index.json"
+INDEX_VERSION = 1
+
+NAME_WEIGHT = 10  # a name hit outranks any number of summary mentions in practice
+FUZZY_FACTOR = 0.5  # weight multiplier for typo-tolerant matches
+MIN_TRIGRAM_SHARE = 0.5  # fraction of the token's trigrams a candidate term must share
+
+# breed_summaries.txt headings that spell a breed.dart name differently
+SUMMARY_ALIASES = {
+    "Domestic Med-hair": "Dom. Med.-hair",
+    "Domestic Shorthair": "Dom. Short-hair",
+}
+
+STOPWORDS = frozenset("""
+a an and are as at be been but by can for from has have in into is it its
+of on or that the their them these they this to was were which while with
+""".split())
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip accents ("Égyptian" -> "egyptian")."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text: str, keep_stopwords: bool = False):
+    """Index terms of `text`, in order (hyphenated words split: "long-hair" -> long, hair)."""
+    words = _WORD_RE.findall(fold(text))
+    return words if keep_stopwords else [w for w in words if w not in STOPWORDS]
+
+
+def trigrams(term: str):
+    """Trigrams of a term with a leading "^" marker, so word starts weigh in."""
+    padded = "^" + term
+    if len(padded) < 3:
+        return {padded}
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def parse_summaries(path=SUMMARIES_FILE):
+    """{breed name: summary} from the "# Name" sections of breed_summaries.txt."""
+    summaries = {}
+    name = None
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        if line.startswith("# "):
+            name = line[2:].strip()
+            summaries[name] = ""
+        elif name and line.strip():
+            summaries[name] = (summaries[name] + " " + line.strip()).strip()
+    return summaries
+
+
+def unmatched_headings(breeds, summaries):
+    """breed_summaries.txt headings that name no breed in breed.dart."""
+    names = {b["name"] for b in breeds}
+    return [h for h in summaries if SUMMARY_ALIASES.get(h, h) not in names]
+
+
+def build_index(breeds, summaries):
+    """The index dict for parsed breeds plus {heading: summary} from breed_summaries.txt."""
+    by_name = {b["name"]: i for i, b in enumerate(breeds)}
+    extra_names = [[] for _ in breeds]
+    extra_text = [[] for _ in breeds]
+    for heading, text in summaries.items():
+        i = by_name.get(SUMMARY_ALIASES.get(heading, heading))
+        if i is None:
+            continue  # reported by unmatched_headings()
+        if heading != breeds[i]["name"]:
+            extra_names[i].append(heading)
+        extra_text[i].append(text)
+
+    weights = {}  # term -> {doc: weight}
+    for doc, breed in enumerate(breeds):
+        for name in [breed["name"], *extra_names[doc]]:
+            for term in tokenize(name, keep_stopwords=True):
+                row = weights.setdefault(term, {})
+                row[doc] = row.get(doc, 0) + NAME_WEIGHT
+        for text in [breed.get("breedSummary") or "", *extra_text[doc]]:
+            for term in tokenize(text):
+                row = weights.setdefault(term, {})
+                row[doc] = row.get(doc, 0) + 1
+
+    vocab = sorted(weights)
+    grams = {}
+    for t, term in enumerate(vocab):
+        for g in trigrams(term):
+            grams.setdefault(g, []).append(t)
+    return {
+        "version": INDEX_VERSION,
+        "docs": [[b["id"], b["name"]] for b in breeds],
+        "vocab": vocab,
+        "postings": [[x for doc in sorted(weights[term]) for x in (doc, weights[term][doc])] for term in vocab],
+        "trigrams": dict(sorted(grams.items())),
+    }
+
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance, or limit + 1 once it is certain to exceed `limit`."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        if min(cur) > limit:
+            return limit + 1
+        prev = cur
+    return prev[-1]
+
+
+class BreedSearch:
+    """Query side of the index (the lookup the app performs)."""
+
+    def __init__(self, index):
+        self.docs = index["docs"]
+        self.vocab = index["vocab"]
+        self.postings = index["postings"]
+        self.trigrams = index["trigrams"]
+        self._name_words = None  # per doc, its name's words; built for the first stopword-only query
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        return cls(json.loads(Path(path).read_text(encoding="utf-8")))
+
+    def prefix_terms(self, token: str):
+        """Indexes of vocab terms starting with `token`."""
+        lo = bisect.bisect_left(self.vocab, token)
+        hi = bisect.bisect_left(self.vocab, token + "\uffff", lo)
+        return range(lo, hi)
+
+    def fuzzy_terms(self, token: str):
+        """Indexes of vocab terms whose prefix is within a small edit distance of `token`."""
+        grams = trigrams(token)
+        shared = {}
+        for g in grams:
+            for t in self.trigrams.get(g, ()):
+                shared[t] = shared.get(t, 0) + 1
+        need = max(1, int(len(grams) * MIN_TRIGRAM_SHARE))
+        limit = 2 if len(token) >= 6 else 1
+        return [
+            t for t, n in shared.items()
+            if n >= need and _edit_distance(token, self.vocab[t][:len(token)], limit) <= limit
+        ]
+
+    def _token_scores(self, token: str):
+        terms, factor = self.prefix_terms(token), 1.0
+        if not terms:
+            terms, factor = self.fuzzy_terms(token), FUZZY_FACTOR
+        scores = {}
+        for t in terms:
+            row = self.postings[t]
+            for k in range(0, len(row), 2):
+                doc, w = row[k], row[k + 1] * factor
+                if w > scores.get(doc, 0):
+                    scores[doc] = w
+        return scores
+
+    def _name_matches(self, tokens, limit=None):
+        """Breeds whose name has a word starting with every token, by id."""
+        if self._name_words is None:
+            self._name_words = [tokenize(name, keep_stopwords=True) for _, name in self.docs]
+        found = [tuple(self.docs[doc]) for doc, words in enumerate(self._name_words)
+                 if all(any(w.startswith(t) for w in words) for t in tokens)]
+        return sorted(found)[:limit]
+
+    def search(self, query: str, limit=None):
+        """[(breed id, name)] matching every query token, best first."""
+        tokens = tokenize(query)
+        if not tokens:
+            stopwords = tokenize(query, keep_stopwords=True)
+            return self._name_matches(stopwords, limit) if stopwords else []
+        total = None
+        for token in tokens:
+            scores = self._token_scores(token)
+            if total is None:
+                total = scores
+            else:
+                total = {doc: total[doc] + s for doc, s in scores.items() if doc in total}
+            if not total:
+                return []
+        ranked = sorted(total, key=lambda doc: (-total[doc], self.docs[doc][0]))
+        return [tuple(self.docs[doc]) for doc in ranked[:limit]]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the breed search index asset.")
+    parser.add_argument("--out", type=Path, default=INDEX_PATH, help="Index asset to write")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if up to date")
+    parser.add_argument("--query", action="append", default=[], help="Run a query against the index (repeatable)")
+    args = parser.parse_args()
+
+    cache = DerivativeCache()
+    params = {
+        "transform": "breed_search_index",
+        "version": INDEX_VERSION,
+        "name_weight": NAME_WEIGHT,
+        "stopwords": sorted(STOPWORDS),
+        "aliases": SUMMARY_ALIASES,
+    }
+    key = cache.key([BREED_FILE, SUMMARIES_FILE], params)
+    if not args.force and cache.is_fresh(args.out, key):
+        print(f"Up to date {args.out}")
+    else:
+        breeds, summaries = load_breeds(), parse_summaries()
+        for heading in unmatched_headings(breeds, summaries):
+            print(f"  {heading!r} in {SUMMARIES_FILE.name} matches no breed; skipped")
+        index = build_index(breeds, summaries)
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        tmp = args.out.with_suffix(".tmp")
+        tmp.write_text(json.dumps(index, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+        tmp.replace(args.out)
+        cache.record(args.out, key)
+        cache.save()
+        print(
+            f"{len(index['docs'])} breeds, {len(index['vocab'])} terms, {len(index['trigrams'])} trigrams "
+            f"in {args.out} ({args.out.stat().st_size / 1024:.1f} KB)"
+        )
+
+    if args.query:
+        search = BreedSearch.load(args.out)
+        for q in args.query:
+            hits = search.search(q, limit=5)
+            print(f"{q!r}: " + (", ".join(name for _, name in hits) or "(no match)"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Precompute breed-to-breed similarity from the StatValue stats in lib/models/breed.dart.
+
+Every breed's stats (Energy Level, Fun-loving, TLC, ...) become one row of a
+NumPy matrix. Two breeds' similarity is the weighted mean, over stats, of the
+per-stat match the app already uses for questionnaire answers
+(cat_type_filter_mapping.dart):
+
+  match = 1 - |a - b| / (STAT_MAX - STAT_MIN)
+
+All pairs are computed in row blocks (one broadcasted |difference| and one
+einsum against the weights per block), then the top-k neighbours of every
+breed are taken with argpartition. Nothing loops per pair in Python.
+
+The result goes to assets/breed_similarity.json:
+
+  {"version": 1, "stats": ["Energy Level", ...], "weights": [1.0, ...], "ids": [1, 2, ...],
+   "k": 8, "neighbors": {"1": [[41, 96], [55, 93], ...], ...},     # breed id -> [[id, percent], ...]
+   "matrix": "<base64>"}                                              # n*n uint8 percents, row-major in ids order
+
+so "similar breeds" is neighbors[id], and any pair is matrix[i * n + j].
+A stat missing from a breed counts as the median of that stat over all breeds.
+
+Only rebuilt when breed.dart or the settings change (derivative cache).
+Scaling is measured by bench_breed_similarity.py.
+
+Usage:
+  python scripts/breed_similarity.py [--k 8] [--out PATH] [--force] [--show NAME]
+
+Requires: pip install numpy
+"""
+
+import argparse
+import base64
+import json
+from pathlib import Path
+
+import numpy as np
+
+from breed_parser import BREED_FILE, load_breeds
+from derivative_cache import DerivativeCache
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+OUTPUT_PATH = PROJECT_ROOT / "assets" / "breed_similarity.json"
+ASSET_VERSION = 1
+
+DEFAULT_K = 8
+STAT_MIN, STAT_MAX = 1, 5  # StatValue scale
+# Relative weight per stat name; stats not listed weigh 1.0
+STAT_WEIGHTS = {}
+BLOCK_ELEMENTS = 1 << 24  # floats per broadcasted block (64 MB as float32)
+
+
+def stat_matrix(breeds):
+    """(stat names, n x d float32 matrix) from parsed breeds; missing stats become the column median."""
+    names = []
+    for b in breeds:
+        for s in b["stats"]:
+            if s["name"] not in names:
+                names.append(s["name"])
+    column = {name: j for j, name in enumerate(names)}
+    X = np.full((len(breeds), len(names)), np.nan, dtype=np.float32)
+    for i, b in enumerate(breeds):
+        for s in b["stats"]:
+            X[i, column[s["name"]]] = s["value"]
+    missing = np.isnan(X)
+    if missing.any():
+        X[missing] = np.take(np.nanmedian(X, axis=0), np.nonzero(missing)[1])
+    return names, X
+
+
+def stat_weights(names):
+    """Weights for the stat columns, normalized to sum to 1."""
+    w = np.array([STAT_WEIGHTS.get(name, 1.0) for name in names], dtype=np.float32)
+    return w / w.sum()
+
+
+def similarity_matrix(X, weights):
+    """All-pairs weighted stat match of the rows of X, as an n x n float32 matrix in [0, 1]."""
+    n, d = X.shape
+    S = np.empty((n, n), dtype=np.float32)
+    scaled = X / np.float32(STAT_MAX - STAT_MIN)
+    block = max(1, BLOCK_ELEMENTS // max(1, n * d))
+    for start in range(0, n, block):
+        diff = np.abs(scaled[start:start + block, None, :] - scaled[None, :, :])
+        S[start:start + block] = 1.0 - np.einsum("ijk,k->ij", diff, weights)
+    return S
+
+
+def top_k(S, k):
+    """(indexes, scores) of each row's k best other rows, best first (ties: lower index first)."""
+    n = S.shape[0]
+    k = min(k, n - 1)
+    if k <= 0:
+        return np.empty((n, 0), dtype=np.int64), np.empty((n, 0), dtype=S.dtype)
+    masked = S.copy()
+    np.fill_diagonal(masked, -np.inf)
+    part = np.argpartition(-masked, k - 1, axis=1)[:, :k]
+    scores = np.take_along_axis(masked, part, axis=1)
+    order = np.lexsort((part, -scores), axis=1)
+    idx = np.take_along_axis(part, order, axis=1)
+    return idx, np.take_along_axis(scores, order, axis=1)
+
+
+def to_percent(S):
+    return np.rint(S * 100).astype(np.uint8)
+
+
+def build_asset(breeds, k=DEFAULT_K):
+    names, X = stat_matrix(breeds)
+    weights = stat_weights(names)
+    S = similarity_matrix(X, weights)
+    idx, scores = top_k(S, k)
+    ids = [b["id"] for b in breeds]
+    percents = to_percent(scores)
+    return {
+        "version": ASSET_VERSION,
+        "stats": names,
+        "weights": [round(float(w), 6) for w in weights],
+        "ids": ids,
+        "k": int(idx.shape[1]),
+        "neighbors": {
+            str(ids[i]): [[ids[j], int(p)] for j, p in zip(idx[i], percents[i])] for i in range(len(ids))
+        },
+        "matrix": base64.b64encode(to_percent(S).tobytes()).decode("ascii"),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Precompute breed similarity from StatValue stats.")
+    parser.add_argument("--k", type=int, default=DEFAULT_K, help="Neighbours kept per breed")
+    parser.add_argument("--out", type=Path, default=OUTPUT_PATH, help="Asset to write")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if up to date")
+    parser.add_argument("--show", action="append", default=[], metavar="NAME", help="Print a breed's neighbours")
+    args = parser.parse_args()
+
+    cache = DerivativeCache()
+    params = {
+        "transform": "breed_similarity",
+        "version": ASSET_VERSION,
+        "k": args.k,
+        "scale": [STAT_MIN, STAT_MAX],
+        "weights": STAT_WEIGHTS,
+    }
+    key = cache.key([BREED_FILE], params)
+    breeds = load_breeds()
+    if not args.force and cache.is_fresh(args.out, key):
+        print(f"Up to date {args.out}")
+        asset = json.loads(args.out.read_text(encoding="utf-8"))
+    else:
+        asset = build_asset(breeds, args.k)
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        tmp = args.out.with_suffix(".tmp")
+        tmp.write_text(json.dumps(asset, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+        tmp.replace(args.out)
+        cache.record(args.out, key)
+        cache.save()
+        print(f"{len(asset['ids'])} breeds x {len(asset['stats'])} stats, top {asset['k']} neighbours "
+              f"in {args.out} ({args.out.stat().st_size / 1024:.1f} KB)")
+
+    by_name = {b["name"].lower(): b for b in breeds}
+    names = {b["id"]: b["name"] for b in breeds}
+    for name in args.show:
+        breed = by_name.get(name.lower())
+        if breed is None:
+            print(f"{name!r}: no such breed")
+            continue
+        neighbors = asset["neighbors"][str(breed["id"])]
+        print(f"{breed['name']}: " + ", ".join(f"{names[j]} {p}%" for j, p in neighbors))
+
+
+if __name__ == "__main__":
+    main()
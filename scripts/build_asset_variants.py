@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Build Flutter resolution-aware variants (1x / 2.0x / 3.0x) of the bundled images.
+
+Each source in assets/Cartoon, assets/Full and assets/cat_types is decoded
+once. Every density is sized from the set's logical display width and is
+resampled from the nearest larger level of a downscale pyramid, not from the
+full-size source. Each density is written twice:
+  - in the source's own format (optimized PNG, or progressive JPEG with alpha
+    flattened onto white, as in resize_png_to_jpg.py), under the same name,
+    so Image.asset('assets/Cartoon/X.png') picks it up unchanged;
+  - as WebP (alpha kept), for when the app switches extensions.
+No density is upscaled past the source. A density that would come out the same
+size as a lower one is skipped; Flutter falls back to the nearest variant.
+
+When a set holds both X.png and X.jpg (a generated image and its JPG copy from
+resize_png_to_jpg.py), they are one source: the PNG is decoded, as the
+original, and the native variants are written under both names. The JPG and
+WebP variants are stretched to the JPG's aspect ratio (512x374), as
+resize_png_to_jpg.py does, so they match the image the app loads.
+
+Layout under the output root (default build/asset_variants) mirrors the repo:
+  assets/Cartoon/Abyssinian.png, assets/Cartoon/2.0x/Abyssinian.png, ...webp
+
+Unchanged sources are skipped via the shared derivative cache. At the end a
+table of bundle bytes saved per set and format is printed and written to
+asset_variants_report.json.
+
+Usage:
+  python scripts/build_asset_variants.py [--sets Cartoon,Full,cat_types] [--out DIR] [--jobs N] [--force]
+
+Requires: pip install Pillow
+"""
+
+import argparse
+import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from PIL import Image
+
+from derivative_cache import DerivativeCache
+from resize_png_to_jpg import flatten_onto_white, normalize_mode
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+DEFAULT_OUT = PROJECT_ROOT / "build" / "asset_variants"
+REPORT_NAME = "asset_variants_report.json"
+
+DENSITIES = (1.0, 2.0, 3.0)
+JPG_QUALITY = 85
+WEBP_QUALITY = 80
+
+# Logical (1x) width per asset set: the largest width the app draws it at.
+#   Cartoon   - breed grid tiles (50pt), list avatars and fit cards
+#   Full      - breed detail header, full width 16:9 on a phone
+#   cat_types - personality cards, same footprint as the 296x220 *_resized.mp4
+ASSET_SETS = {
+    "Cartoon": {"dir": "assets/Cartoon", "patterns": ("*.png",), "logical_width": 128},
+    "Full": {"dir": "assets/Full", "patterns": ("*.jpg",), "logical_width": 400},
+    "cat_types": {"dir": "assets/cat_types", "patterns": ("*.jpg", "*.png"), "logical_width": 296},
+}
+
+
+def density_dir(density: float) -> str:
+    """Flutter variant folder for a density ('' for 1x)."""
+    return "" if density == 1.0 else f"{density:.1f}x"
+
+
+def plan_widths(src_width: int, logical_width: int, densities=DENSITIES):
+    """[(density, width)] to build: capped at the source width, duplicates dropped."""
+    plan = []
+    for d in densities:
+        w = min(round(logical_width * d), src_width)
+        if plan and plan[-1][1] == w:
+            continue
+        plan.append((d, w))
+    return plan
+
+
+def build_pyramid(img: Image.Image, widths):
+    """
+    {width: image} for each requested width. Levels are built largest first,
+    each one resampled from the smallest already-built level that is at least
+    as wide, so only the first step touches the full-size source.
+    """
+    levels = [img]
+    out = {}
+    for w in sorted(set(widths), reverse=True):
+        base = min((lv for lv in levels if lv.width >= w), key=lambda lv: lv.width)
+        if base.width == w:
+            level = base
+        else:
+            h = max(1, round(base.height * w / base.width))
+            level = base.resize((w, h), Image.Resampling.LANCZOS)
+        levels.append(level)
+        out[w] = level
+    return out
+
+
+def _save(img: Image.Image, path: Path, fmt: str) -> int:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if fmt == "png":
+        img.save(path, "PNG", optimize=True)
+    elif fmt == "jpg":
+        flatten_onto_white(img).save(path, "JPEG", quality=JPG_QUALITY, optimize=True, progressive=True)
+    else:
+        img.save(path, "WEBP", quality=WEBP_QUALITY, method=4)
+    return path.stat().st_size
+
+
+def native_format(path: Path) -> str:
+    return "png" if path.suffix.lower() == ".png" else "jpg"
+
+
+def variant_paths(src: Path, rel_dir: str, out_root: Path, plan, natives=None):
+    """[(density, width, fmt, path)] for every output of one source (natives: its bundled formats)."""
+    natives = natives or (native_format(src),)
+    paths = []
+    for density, width in plan:
+        folder = out_root / rel_dir / density_dir(density)
+        for fmt in (*natives, "webp"):
+            paths.append((density, width, fmt, folder / f"{src.stem}.{fmt}"))
+    return paths
+
+
+def build_variants(src: Path, rel_dir: str, out_root: Path, plan, natives=None, jpg_shape=None):
+    """
+    Decode one source and write all its variants. Runs in a worker process.
+    jpg_shape: (width, height) of the bundled JPG made from a PNG source; the
+    jpg and webp variants are stretched to its aspect ratio.
+    """
+    with Image.open(src) as im:
+        img = normalize_mode(im)
+        img.load()
+    widths = [w for _, w in plan]
+    pyramid = jpg_pyramid = build_pyramid(img, widths)
+    if jpg_shape:
+        height = max(1, round(img.width * jpg_shape[1] / jpg_shape[0]))
+        jpg_pyramid = build_pyramid(img.resize((img.width, height), Image.Resampling.LANCZOS), widths)
+    return [
+        {"density": d, "format": fmt, "path": str(path),
+         "bytes": _save((pyramid if fmt == "png" else jpg_pyramid)[w], path, fmt)}
+        for d, w, fmt, path in variant_paths(src, rel_dir, out_root, plan, natives)
+    ]
+
+
+def _collect_sources(set_names):
+    """
+    [(set name, spec, source, bundled files, jpg shape)], one per stem. A stem
+    bundled as both PNG and JPG is decoded from the PNG, the original the JPG
+    was made from; jpg shape is then the JPG's (width, height), else None.
+    """
+    sources = []
+    for name in set_names:
+        spec = ASSET_SETS[name]
+        folder = PROJECT_ROOT / spec["dir"]
+        by_stem = {}
+        for pattern in spec["patterns"]:
+            for path in folder.glob(pattern):
+                by_stem.setdefault(path.stem, []).append(path)
+        for stem in sorted(by_stem):
+            files = sorted(by_stem[stem], key=lambda p: native_format(p) != "png")
+            jpg_shape = None
+            if len(files) > 1:
+                with Image.open(files[1]) as im:
+                    jpg_shape = im.size
+            sources.append((name, spec, files[0], files, jpg_shape))
+    return sources
+
+
+def _print_report(report):
+    print(f"\n{'set':<11} {'files':>5} {'source':>10} {'native':>10} {'webp':>10} {'saved (native)':>15} {'saved (webp)':>13}")
+    for name, row in report.items():
+        src = row["source_bytes"]
+        print(
+            f"{name:<11} {row['files']:>5} {src / 1e6:>8.2f}MB {row['native_bytes'] / 1e6:>8.2f}MB "
+            f"{row['webp_bytes'] / 1e6:>8.2f}MB {(src - row['native_bytes']) / 1e6:>13.2f}MB "
+            f"{(src - row['webp_bytes']) / 1e6:>11.2f}MB"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build 1x/2x/3x PNG/JPEG/WebP variants of bundled images.")
+    parser.add_argument("--sets", default=",".join(ASSET_SETS), help="Comma-separated asset sets")
+    parser.add_argument("--out", type=Path, default=DEFAULT_OUT, help="Output root")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if outputs are up to date")
+    args = parser.parse_args()
+
+    set_names = [s.strip() for s in args.sets.split(",") if s.strip()]
+    unknown = [s for s in set_names if s not in ASSET_SETS]
+    if unknown:
+        raise SystemExit(f"Unknown asset set(s): {', '.join(unknown)} (choose from {', '.join(ASSET_SETS)})")
+    out_root = args.out.resolve()
+
+    cache = DerivativeCache()
+    report = {name: {"files": 0, "source_bytes": 0, "native_bytes": 0, "webp_bytes": 0} for name in set_names}
+    pending = []
+    up_to_date = 0
+
+    def tally(name, files, outputs):
+        row = report[name]
+        row["files"] += len(files)
+        row["source_bytes"] += sum(f.stat().st_size for f in files)
+        for o in outputs:
+            row["webp_bytes" if o["format"] == "webp" else "native_bytes"] += o["bytes"]
+
+    for name, spec, src, files, jpg_shape in _collect_sources(set_names):
+        with Image.open(src) as im:
+            src_width = im.width
+        plan = plan_widths(src_width, spec["logical_width"])
+        natives = tuple(native_format(f) for f in files)
+        params = {
+            "transform": "asset_variants",
+            "plan": plan,
+            "natives": natives,
+            "jpg_shape": jpg_shape,
+            "jpg_quality": JPG_QUALITY,
+            "webp_quality": WEBP_QUALITY,
+            "out": str(out_root),
+        }
+        key = cache.key([src], params)
+        paths = variant_paths(src, spec["dir"], out_root, plan, natives)
+        if not args.force and all(cache.is_fresh(p, key) for _, _, _, p in paths):
+            up_to_date += 1
+            tally(name, files, [{"format": fmt, "bytes": p.stat().st_size} for _, _, fmt, p in paths])
+            continue
+        pending.append((name, spec, src, files, plan, natives, jpg_shape, key))
+
+    print(f"Building variants for {len(pending)} source(s) ({up_to_date} up to date) into {out_root}")
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = {
+            pool.submit(build_variants, src, spec["dir"], out_root, plan, natives, jpg_shape): (name, src, files, key)
+            for name, spec, src, files, plan, natives, jpg_shape, key in pending
+        }
+        for future in as_completed(futures):
+            name, src, files, key = futures[future]
+            try:
+                outputs = future.result()
+            except Exception as e:
+                print(f"  Skip {src.relative_to(PROJECT_ROOT)}: {e}")
+                continue
+            for o in outputs:
+                cache.record(o["path"], key)
+            tally(name, files, outputs)
+            densities = sorted({o["density"] for o in outputs})
+            print(f"  {src.relative_to(PROJECT_ROOT)} -> {', '.join(f'{d:g}x' for d in densities)}")
+    cache.save()
+
+    _print_report(report)
+    out_root.mkdir(parents=True, exist_ok=True)
+    (out_root / REPORT_NAME).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\nReport written to {out_root / REPORT_NAME}")
+
+
+if __name__ == "__main__":
+    main()
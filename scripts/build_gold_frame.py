@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Slice the gold frame and plaque into nine-patch pieces and pre-render them at
+the sizes the app draws them.
+
+GoldFramedPanel and GoldPlaque (lib/gold_frame/) used to decode the full-size
+gold_frame_no_plaque.png (875x895) and gold_plaque_refined.png (901x853) for
+every card and scale them at runtime. This writes, for each of the two images:
+
+  - nine-slice pieces (tl, t, tr, l, c, r, bl, b, br) sized so the border is
+    BORDER_PT logical points thick, as Flutter 1x/2.0x/3.0x variants under
+    assets/frame/nine/. A fully transparent centre (the frame) is not written;
+  - pre-renders at each display size in SOURCES, also at 1x/2.0x/3.0x, under
+    build/gold_frame/sized/ (outside assets/, so they are never committed or
+    bundled unused). Corners are scaled uniformly and only the edges and
+    centre stretch, so a 3:4 card keeps its corner ornaments square;
+  - assets/frame/gold_frame_manifest.json with each source's size and insets
+    (pixels), and every piece and pre-render's logical size, insets and files.
+
+Every PNG written goes through optimize_pngs.optimize_png, so it is stored
+palette-quantized when that stays above the SSIM threshold.
+
+GoldFramedPanel and GoldPlaque draw the nine-slice pieces (GoldNineSlice), and
+only assets/frame/nine/ is in the app bundle. The full-size sources stay out
+of it; a screen that draws a fixed size can copy its pre-render into assets/.
+
+Insets: the frame's are measured from its alpha channel (the inner edge of the
+opaque border, taken over the middle half of each side). The plaque is opaque
+throughout, so its insets are the left/top of GoldPlaque._plaqueCenterSlice,
+mirrored: that rect (71, 93, 849, 835) predates the current 901x853 art and
+extends past it. No density is rendered larger than its source, as in build_asset_variants.py.
+
+Only rebuilt when a source or the tables below change (derivative cache).
+
+Usage:
+  python scripts/build_gold_frame.py [--force]
+
+Requires: pip install Pillow numpy
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from build_asset_variants import DENSITIES, density_dir, plan_widths
+from derivative_cache import DerivativeCache
+from optimize_pngs import optimize_png
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+FRAME_DIR = PROJECT_ROOT / "assets" / "frame"
+NINE_DIR = FRAME_DIR / "nine"
+SIZED_DIR = PROJECT_ROOT / "build" / "gold_frame" / "sized"
+MANIFEST_PATH = FRAME_DIR / "gold_frame_manifest.json"
+MANIFEST_VERSION = 2
+
+ALPHA_CLEAR = 16  # alpha at or below this counts as transparent when measuring insets
+PIECES = ("tl", "t", "tr", "l", "c", "r", "bl", "b", "br")
+
+
+def _frame_border(width):
+    """GoldFramedPanel's proportional side border (108/886 of the card width)."""
+    return width * 108.0 / 886.0
+
+
+def _plaque_size(card_width, lines=2):
+    """GoldPlaque size inside a card: maxWidth = inner width + 20, 20pt per line + 20."""
+    return round(card_width - 2 * _frame_border(card_width) + 20), lines * 20 + 20
+
+
+# name -> source, insets (left, top, right, bottom in source px; None = measure),
+# nine-slice border thickness (logical pt), and {size name: (width, height) in logical pt}
+#   capture - 140pt share-capture cards (fit.dart, personality_fit.dart)
+#   grid    - breed list grid cell, 3:4 (breedList.dart), about 165pt wide on a phone
+#   card    - 210pt fit and personality cards
+#   detail  - pet detail media gallery, full width less 18pt padding on a 430pt phone
+SOURCES = {
+    "gold_frame": {
+        "source": FRAME_DIR / "gold_frame_no_plaque.png",
+        "insets": None,
+        "border_pt": 26,
+        "sizes": {"capture": (140, 187), "grid": (165, 220), "card": (210, 280), "detail": (394, 403)},
+    },
+    "gold_plaque": {
+        "source": FRAME_DIR / "gold_plaque_refined.png",
+        "insets": (71, 93, 71, 93),
+        "border_pt": 8,
+        "sizes": {"capture": _plaque_size(140), "grid": _plaque_size(165), "card": _plaque_size(210)},
+    },
+}
+
+
+def measure_insets(img: Image.Image):
+    """(left, top, right, bottom): depth of the opaque border around a transparent centre."""
+    clear = np.asarray(img.getchannel("A")) <= ALPHA_CLEAR
+    h, w = clear.shape
+
+    def depth(lines):
+        # Skip any transparent margin, then count the opaque run up to the hole
+        depths = []
+        for line in lines:
+            start = int(np.argmax(~line))
+            depths.append(start + int(np.argmax(line[start:])))
+        return max(depths)
+
+    rows = clear[h // 4: 3 * h // 4]
+    cols = clear[:, w // 4: 3 * w // 4].T
+    insets = (depth(rows), depth(cols), depth(rows[:, ::-1]), depth(cols[:, ::-1]))
+    if min(insets) <= 0 or insets[0] + insets[2] >= w or insets[1] + insets[3] >= h:
+        raise ValueError(f"no transparent centre found (insets {insets})")
+    return insets
+
+
+def _bands(total, first, last):
+    """(start, end) of the first / middle / last band along an axis of `total` pixels."""
+    return (0, first), (first, total - last), (total - last, total)
+
+
+def slice_boxes(size, insets):
+    """{piece: (left, upper, right, lower)} crop boxes of the nine pieces."""
+    w, h = size
+    left, top, right, bottom = insets
+    xs, ys = _bands(w, left, right), _bands(h, top, bottom)
+    return {PIECES[r * 3 + c]: (xs[c][0], ys[r][0], xs[c][1], ys[r][1]) for r in range(3) for c in range(3)}
+
+
+def render_nine_slice(img: Image.Image, insets, size, corner_scale):
+    """
+    Draw `img` at `size` with its corners scaled by `corner_scale`, edges
+    stretched along their length and the centre stretched both ways.
+    """
+    w, h = size
+    left, top, right, bottom = (max(1, round(v * corner_scale)) for v in insets)
+    left, right = min(left, w // 2), min(right, w - w // 2)
+    top, bottom = min(top, h // 2), min(bottom, h - h // 2)
+    xs, ys = _bands(w, left, right), _bands(h, top, bottom)
+    out = Image.new("RGBA", (w, h), (0, 0, 0, 0))
+    for piece, box in slice_boxes(img.size, insets).items():
+        r, c = divmod(PIECES.index(piece), 3)
+        dw, dh = xs[c][1] - xs[c][0], ys[r][1] - ys[r][0]
+        if dw <= 0 or dh <= 0:
+            continue
+        out.paste(img.crop(box).resize((dw, dh), Image.Resampling.LANCZOS), (xs[c][0], ys[r][0]))
+    return out
+
+
+def _save_png(img: Image.Image, path: Path) -> int:
+    """Write a PNG, palette-quantized where optimize_pngs.py's SSIM gate allows. Returns its size."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    img.save(path, "PNG", optimize=True)
+    return optimize_png(path)["bytes"]
+
+
+def _rel(path: Path) -> str:
+    return path.relative_to(PROJECT_ROOT).as_posix()
+
+
+def _variant(folder: Path, density: float, name: str) -> Path:
+    return folder / density_dir(density) / name
+
+
+def build_nine_slice(name, img, insets, border_pt):
+    """Write the pieces at every density. Returns their manifest entry."""
+    scale_1x = border_pt / max(insets)
+    boxes = slice_boxes(img.size, insets)
+    pieces, total = {}, 0
+    for piece, box in boxes.items():
+        crop = img.crop(box)
+        if piece == "c" and crop.getchannel("A").getextrema()[1] <= ALPHA_CLEAR:
+            continue  # transparent centre: nothing to draw
+        w1 = max(1, round(crop.width * scale_1x))
+        h1 = max(1, round(crop.height * scale_1x))
+        file_name = f"{name}_{piece}.png"
+        for density, w in plan_widths(crop.width, w1, DENSITIES):
+            h = max(1, round(crop.height * w / crop.width))
+            total += _save_png(crop.resize((w, h), Image.Resampling.LANCZOS), _variant(NINE_DIR, density, file_name))
+        pieces[piece] = {"asset": _rel(NINE_DIR / file_name), "size": [w1, h1]}
+    return {
+        "border_pt": border_pt,
+        "insets": [round(v * scale_1x) for v in insets],
+        "pieces": pieces,
+        "bytes": total,
+    }
+
+
+def build_sizes(name, img, insets, sizes):
+    """Write the pre-renders at every density. Returns their manifest entries."""
+    entries = {}
+    for size_name, (w1, h1) in sizes.items():
+        file_name = f"{name}_{size_name}.png"
+        densities, total = [], 0
+        for density, w in plan_widths(img.width, w1, DENSITIES):
+            h = max(1, round(h1 * w / w1))
+            corner_scale = min(w / img.width, h / img.height)
+            rendered = render_nine_slice(img, insets, (w, h), corner_scale)
+            total += _save_png(rendered, _variant(SIZED_DIR, density, file_name))
+            densities.append(density)
+        entries[size_name] = {"path": _rel(SIZED_DIR / file_name), "size": [w1, h1], "densities": densities,
+                              "bytes": total}
+    return entries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Nine-slice and pre-render the gold frame and plaque.")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if up to date")
+    args = parser.parse_args()
+
+    cache = DerivativeCache()
+    params = {
+        "transform": "gold_frame",
+        "version": MANIFEST_VERSION,
+        "densities": DENSITIES,
+        "sources": {name: {k: v for k, v in spec.items() if k != "source"} for name, spec in SOURCES.items()},
+    }
+    key = cache.key([spec["source"] for spec in SOURCES.values()], params)
+    if not args.force and cache.is_fresh(MANIFEST_PATH, key):
+        print(f"Up to date {MANIFEST_PATH}")
+        return
+
+    manifest = {"version": MANIFEST_VERSION}
+    for name, spec in SOURCES.items():
+        src = spec["source"]
+        with Image.open(src) as im:
+            img = im.convert("RGBA")
+        insets = tuple(spec["insets"] or measure_insets(img))
+        nine = build_nine_slice(name, img, insets, spec["border_pt"])
+        sizes = build_sizes(name, img, insets, spec["sizes"])
+        manifest[name] = {
+            "source": _rel(src),
+            "source_size": list(img.size),
+            "insets": list(insets),
+            "nine_slice": nine,
+            "sizes": sizes,
+        }
+        src_bytes = src.stat().st_size
+        print(f"{_rel(src)}: {img.width}x{img.height}, {src_bytes / 1024:.0f} KB, insets {insets}")
+        print(f"  nine-slice ({len(nine['pieces'])} pieces, {len(DENSITIES)} densities): {nine['bytes'] / 1024:.1f} KB")
+        for size_name, entry in sizes.items():
+            w, h = entry["size"]
+            print(f"  {size_name:<8} {w}x{h}pt @ {', '.join(f'{d:g}x' for d in entry['densities'])}: "
+                  f"{entry['bytes'] / 1024:.1f} KB")
+
+    MANIFEST_PATH.write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+    cache.record(MANIFEST_PATH, key)
+    cache.save()
+    print(f"Wrote {_rel(MANIFEST_PATH)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Vectorized chroma key: make pixels close to a key colour transparent.
+
+The distance from every pixel to the key colour is computed in one pass with
+NumPy, either as plain RGB Euclidean distance or as CIE76 delta-E in Lab space
+(perceptual). Pixels within `tolerance` become fully transparent; with
+`feather` > 0 the alpha ramps linearly from 0 to the original alpha over the
+next `feather` distance units, which softens jagged edges.
+
+Usage:
+  python scripts/chroma_key.py input.png output.png [--key R,G,B] [--tolerance N]
+                               [--feather N] [--perceptual]
+
+Requires: pip install Pillow numpy
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# D65 reference white and sRGB -> XYZ matrix
+_D65_WHITE = np.array([0.95047, 1.0, 1.08883], dtype=np.float32)
+_SRGB_TO_XYZ = np.array(
+    [
+        [0.4124564, 0.3575761, 0.1804375],
+        [0.2126729, 0.7151522, 0.0721750],
+        [0.0193339, 0.1191920, 0.9503041],
+    ],
+    dtype=np.float32,
+)
+
+
+def srgb_to_lab(rgb: np.ndarray) -> np.ndarray:
+    """Convert an (..., 3) array of 0-255 sRGB values to CIE Lab (float32)."""
+    c = np.asarray(rgb, dtype=np.float32) / 255.0
+    c = np.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+    xyz = (c @ _SRGB_TO_XYZ.T) / _D65_WHITE
+    eps = 216 / 24389
+    kappa = 24389 / 27
+    f = np.where(xyz > eps, np.cbrt(xyz), (kappa * xyz + 16) / 116)
+    lab = np.empty_like(f)
+    lab[..., 0] = 116 * f[..., 1] - 16
+    lab[..., 1] = 500 * (f[..., 0] - f[..., 1])
+    lab[..., 2] = 200 * (f[..., 1] - f[..., 2])
+    return lab
+
+
+def key_distance(rgb: np.ndarray, key_rgb, perceptual: bool = False) -> np.ndarray:
+    """Distance from every pixel in an (H, W, 3) array to `key_rgb`, as float32."""
+    if perceptual:
+        diff = srgb_to_lab(rgb) - srgb_to_lab(np.array(key_rgb, dtype=np.float32))
+        return np.sqrt(np.einsum("...c,...c->...", diff, diff))
+    diff = rgb.astype(np.int32) - np.array(key_rgb, dtype=np.int32)
+    return np.sqrt(np.einsum("...c,...c->...", diff, diff).astype(np.float32))
+
+
+def key_mask_and_alpha(
+    rgba: np.ndarray,
+    key_rgb,
+    tolerance: float,
+    feather: float = 0.0,
+    perceptual: bool = False,
+):
+    """
+    Return (keyed, alpha) for an (H, W, 4) RGBA array: the boolean mask of
+    pixels within `tolerance` of the key, and the keyed alpha channel (uint8).
+    Without feathering and in RGB mode the comparison is done on exact integer
+    squared distances, so it matches the original per-pixel loop bit for bit.
+    """
+    rgb = rgba[..., :3]
+    alpha = rgba[..., 3]
+    if feather <= 0 and not perceptual:
+        diff = rgb.astype(np.int32) - np.array(key_rgb, dtype=np.int32)
+        keyed = np.einsum("...c,...c->...", diff, diff) <= tolerance * tolerance
+        return keyed, np.where(keyed, 0, alpha).astype(np.uint8)
+
+    dist = key_distance(rgb, key_rgb, perceptual)
+    keyed = dist <= tolerance
+    if feather <= 0:
+        return keyed, np.where(keyed, 0, alpha).astype(np.uint8)
+    ramp = np.clip((dist - tolerance) / feather, 0.0, 1.0)
+    return keyed, np.rint(ramp * alpha).astype(np.uint8)
+
+
+def chroma_key_alpha(
+    rgba: np.ndarray,
+    key_rgb,
+    tolerance: float,
+    feather: float = 0.0,
+    perceptual: bool = False,
+) -> np.ndarray:
+    """Return the keyed alpha channel (uint8, H x W) for an (H, W, 4) RGBA array."""
+    return key_mask_and_alpha(rgba, key_rgb, tolerance, feather, perceptual)[1]
+
+
+def apply_chroma_key(
+    img: Image.Image,
+    key_rgb,
+    tolerance: float,
+    feather: float = 0.0,
+    perceptual: bool = False,
+) -> Image.Image:
+    """Return an RGBA copy of `img` with the key colour made transparent."""
+    rgba = np.array(img.convert("RGBA"))
+    keyed, alpha = key_mask_and_alpha(rgba, key_rgb, tolerance, feather, perceptual)
+    rgba[..., 3] = alpha
+    # Keyed pixels become (0, 0, 0, 0) so no key colour bleeds when resampling;
+    # pixels that were already transparent keep their RGB, as in the original loop
+    rgba[keyed] = 0
+    return Image.fromarray(rgba, "RGBA")
+
+
+def _parse_rgb(value: str):
+    parts = [int(p) for p in value.split(",")]
+    if len(parts) != 3 or not all(0 <= p <= 255 for p in parts):
+        raise argparse.ArgumentTypeError("expected R,G,B with values 0-255")
+    return tuple(parts)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Make a key colour transparent.")
+    parser.add_argument("input", type=Path)
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--key", type=_parse_rgb, default=(107, 76, 148), help="R,G,B (default: splash purple)")
+    parser.add_argument("--tolerance", type=float, default=45)
+    parser.add_argument("--feather", type=float, default=0)
+    parser.add_argument("--perceptual", action="store_true", help="Use Lab delta-E instead of RGB distance")
+    args = parser.parse_args()
+
+    with Image.open(args.input) as im:
+        out = apply_chroma_key(im, args.key, args.tolerance, args.feather, args.perceptual)
+    out.save(args.output, "PNG")
+    print(f"Wrote {args.output} ({out.size[0]}x{out.size[1]})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Content-addressed cache of derived assets, shared by the asset scripts.
+
+Each output file is recorded in one manifest (.asset_cache/manifest.json at
+the project root) under a key: a SHA-256 over the bytes of its source files
+plus the transform parameters that produced it. An output is fresh when its
+recorded key matches the key for the current sources/parameters and the file
+on disk is still the one that was recorded (same size and mtime). Anything
+else is rebuilt, so changing e.g. TARGET_SIZE or JPG_QUALITY invalidates
+exactly the outputs that depend on it.
+
+Source digests are memoized by (size, mtime) so a no-op build does not
+re-read every source file.
+
+Several scripts may hold the manifest at once (a watcher and a generator in
+another terminal). save() therefore writes only this process's changes: under
+a lock file it re-reads the manifest, applies the entries recorded or
+forgotten since the last save, and writes the merge back.
+
+Usage (from another script):
+  cache = DerivativeCache()
+  key = cache.key([png_path], {"size": TARGET_SIZE, "quality": JPG_QUALITY})
+  if not cache.is_fresh(jpg_path, key):
+      ...build jpg_path...
+      cache.record(jpg_path, key)
+  cache.save()
+
+  python scripts/derivative_cache.py [--prune]   Show (and optionally prune) the manifest.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: merge without the lock
+    fcntl = None
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+# ASSET_CACHE_DIR points a run (e.g. a benchmark) at a scratch cache
+CACHE_DIR = Path(os.environ.get("ASSET_CACHE_DIR") or PROJECT_ROOT / ".asset_cache")
+MANIFEST_PATH = CACHE_DIR / "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def file_digest(path) -> str:
+    """SHA-256 hex digest of a file's bytes."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _rel(path) -> str:
+    """Manifest path for a file: relative to the project root when inside it."""
+    p = Path(path).resolve()
+    try:
+        return p.relative_to(PROJECT_ROOT).as_posix()
+    except ValueError:
+        return p.as_posix()
+
+
+def _stat_sig(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+class DerivativeCache:
+    """On-disk manifest mapping output files to the key they were built from."""
+
+    def __init__(self, manifest_path: Path = MANIFEST_PATH):
+        self.manifest_path = Path(manifest_path)
+        self._sources, self._outputs = self._read()
+        # Changes since the last save, merged into the manifest on disk by save(): rel -> entry (None: removed)
+        self._changed = {"sources": {}, "outputs": {}}
+        self._dirty = False
+
+    def _read(self):
+        """(sources, outputs) as currently on disk."""
+        try:
+            data = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+            if data.get("version") == MANIFEST_VERSION:
+                return data.get("sources", {}), data.get("outputs", {})
+        except (OSError, ValueError):
+            pass
+        return {}, {}
+
+    def _set(self, table: str, rel: str, entry) -> None:
+        target = self._sources if table == "sources" else self._outputs
+        if entry is None:
+            target.pop(rel, None)
+        else:
+            target[rel] = entry
+        self._changed[table][rel] = entry
+        self._dirty = True
+
+    def source_digest(self, path) -> str:
+        """Digest of a source file, reusing the stored one if size/mtime are unchanged."""
+        rel = _rel(path)
+        sig = _stat_sig(path)
+        entry = self._sources.get(rel)
+        if entry and entry["stat"] == sig:
+            return entry["sha256"]
+        digest = file_digest(path)
+        self._set("sources", rel, {"stat": sig, "sha256": digest})
+        return digest
+
+    def key(self, sources=(), params=None) -> str:
+        """Cache key for an output built from `sources` (paths) with `params` (JSON-able)."""
+        h = hashlib.sha256()
+        for src in sources:
+            h.update(self.source_digest(src).encode("ascii"))
+            h.update(b"\0")
+        h.update(json.dumps(params or {}, sort_keys=True, default=list).encode("utf-8"))
+        return h.hexdigest()
+
+    def is_fresh(self, output, key: str, adopt_existing: bool = False) -> bool:
+        """
+        True if `output` exists and was recorded under `key` and is unchanged since.
+        With adopt_existing, an output that exists but has no manifest entry at all
+        (e.g. built before the cache existed) is recorded under `key` and treated
+        as fresh; used by the paid generators so they never re-buy old images.
+        """
+        rel = _rel(output)
+        if not os.path.exists(output):
+            return False
+        entry = self._outputs.get(rel)
+        if entry is None:
+            if adopt_existing:
+                self.record(output, key)
+                return True
+            return False
+        return entry["key"] == key and entry["stat"] == _stat_sig(output)
+
+    def record(self, output, key: str) -> None:
+        """Record that `output` was just built from `key`."""
+        self._set("outputs", _rel(output), {"key": key, "stat": _stat_sig(output)})
+
+    def forget(self, output) -> None:
+        if _rel(output) in self._outputs:
+            self._set("outputs", _rel(output), None)
+
+    def prune(self) -> int:
+        """Drop entries whose output or source file no longer exists. Returns count removed."""
+        removed = 0
+        for name, table in (("outputs", self._outputs), ("sources", self._sources)):
+            for rel in list(table):
+                path = Path(rel) if Path(rel).is_absolute() else PROJECT_ROOT / rel
+                if not path.exists():
+                    self._set(name, rel, None)
+                    removed += 1
+        return removed
+
+    def save(self) -> None:
+        """
+        Merge this process's changes into the manifest on disk and write it
+        atomically, if anything changed. Entries other processes saved in the
+        meantime are kept (and become visible to this instance).
+        """
+        if not self._dirty:
+            return
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.manifest_path.with_name(self.manifest_path.name + ".lock"), "a") as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            sources, outputs = self._read()
+            for name, table in (("sources", sources), ("outputs", outputs)):
+                for rel, entry in self._changed[name].items():
+                    if entry is None:
+                        table.pop(rel, None)
+                    else:
+                        table[rel] = entry
+            data = {"version": MANIFEST_VERSION, "sources": sources, "outputs": outputs}
+            tmp = self.manifest_path.with_name(f"{self.manifest_path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(data, indent=1, sort_keys=True), encoding="utf-8")
+            os.replace(tmp, self.manifest_path)
+        self._sources, self._outputs = sources, outputs
+        self._changed = {"sources": {}, "outputs": {}}
+        self._dirty = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.save()
+        return False
+
+    def __len__(self):
+        return len(self._outputs)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inspect the shared derivative cache manifest.")
+    parser.add_argument("--prune", action="store_true", help="Remove entries for files that no longer exist")
+    args = parser.parse_args()
+
+    with DerivativeCache() as cache:
+        print(f"Manifest: {cache.manifest_path}")
+        print(f"  {len(cache._outputs)} output(s), {len(cache._sources)} source digest(s)")
+        if args.prune:
+            print(f"  Pruned {cache.prune()} stale entr(ies)")
+
+
+if __name__ == "__main__":
+    main()
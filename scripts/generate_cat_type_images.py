@@ -3,43 +3,98 @@
 Generate DALL-E 3 images for each cat type in cat_types.json.
 Uses the Felix mascot from splash_screen.png for consistency.
 Combines overall_prompt + each type's prompt. Output: 512x512 PNG in assets/cat_types/.
+
+Types are generated concurrently under requests/min and images/min limits,
+with 429/Retry-After-aware backoff (see job_scheduler.py). Images come back
+inline as b64_json and are resized/encoded in a process pool while the next
+API calls are in flight (see image_pipeline.py).
+
+Batch mode: --batch-out FILE writes every pending prompt as OpenAI Batch
+JSONL instead of calling the image API; --batch-in FILE later ingests the
+batch results file and decodes/resizes/saves everything in one parallel pass
+(see batch_jobs.py).
+
+--queue DIR makes the run resumable and shareable between processes or
+hosts: pending types go into a work queue directory and are claimed one at a
+time under a lease; rerun after a crash and only types not marked done are
+generated, plus any done type whose prompt or settings changed since (see
+work_queue.py).
+
+--near-dup [RADIUS] checks each new image against the perceptual-hash index
+of the existing art and reports near-duplicates as they land (see
+phash_index.py).
+
+--timing [PATH] logs per-stage timings (API call, decode, resize, encode,
+write) as JSONL and prints p50/p95/max per stage at the end; add --profile
+to cProfile the CPU stages (see stage_timing.py).
+
+The OpenAI SDK is only imported (and OPENAI_API_KEY only required) when an
+API call is actually needed: live generation, or a Felix description that is
+not cached yet.
+
+Usage:
+  python scripts/generate_cat_type_images.py [--limit N] [--workers N] [--rpm N] [--ipm N]
+                                             [--output-dir DIR] [--splash PATH]
+                                             [--queue build/queue/cat_types]
+  python scripts/generate_cat_type_images.py --batch-out build/batch/cat_types.jsonl
+  python scripts/generate_cat_type_images.py --batch-in build/batch/cat_types_results.jsonl
+  python scripts/asset_cli.py cat-types [...]
 """
 
+import argparse
 import base64
-import io
+import functools
 import json
 import os
 import re
-import time
 from pathlib import Path
 
-from dotenv import load_dotenv
-from openai import OpenAI
-from PIL import Image
-import requests
+import phash_index
+import stage_timing
+import work_queue
+from batch_jobs import image_request, ingest_results, write_requests
+from derivative_cache import CACHE_DIR, DerivativeCache
+from image_pipeline import resize_image_bytes, run_pipeline
+from job_scheduler import (
+    DEFAULT_IMAGES_PER_MINUTE,
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_REQUESTS_PER_MINUTE,
+    JobScheduler,
+)
+from phash_index import PhashIndex
+from stage_timing import stage
+from work_queue import LeaseLost, WorkQueue
 
 # Project root (parent of scripts/)
 SCRIPT_DIR = Path(__file__).resolve().parent
 PROJECT_ROOT = SCRIPT_DIR.parent
-load_dotenv(PROJECT_ROOT / ".env")
-
-API_KEY = os.getenv("OPENAI_API_KEY")
-if not API_KEY:
-    raise ValueError("OPENAI_API_KEY not set. Add it to .env or environment.")
 
 CAT_TYPES_JSON = PROJECT_ROOT / "test" / "cat_types.json"
 OUTPUT_DIR = PROJECT_ROOT / "assets" / "cat_types"
 SPLASH_IMAGE = PROJECT_ROOT / "assets" / "splash" / "splash_screen.png"
 OUTPUT_SIZE = (512, 512)
-DELAY_BETWEEN_REQUESTS = 2  # seconds
-MAX_RETRIES = 3
-INITIAL_BACKOFF = 5  # seconds
-MAX_TYPES = 5  # Generate images for only this many types
-
-# Cached DALL-E–oriented description of Felix from splash image (from vision)
-FELIX_DESCRIPTION_CACHE = OUTPUT_DIR / "felix_description.txt"
+DALLE_MODEL = "dall-e-3"
+DALLE_SIZE = "1024x1024"
+DALLE_QUALITY = "standard"
+
+# DALL-E–oriented descriptions of Felix from the splash image (from vision), keyed by
+# the splash image's content hash + vision model + prompt, so editing the splash
+# invalidates the description (and with it every type prompt that embeds it)
+VISION_MODEL = "gpt-4o"
+FELIX_DESCRIPTION_CACHE = CACHE_DIR / "felix_descriptions.json"
+
+VISION_PROMPT = (
+    "Describe this cartoon cat mascot in one detailed paragraph for an image generator. "
+    "Include: body shape, fur pattern and colors, face shape, eyes, nose, mouth, ears, "
+    "style (e.g. cartoon, Pixar-like), and any props or background. "
+    "Write so that another AI (DALL-E 3) could draw this exact same character in different "
+    "poses and scenes. Output only the paragraph, no preamble. "
+    "Then add one sentence: The image must show the full type-specific scene with setting "
+    "and props, not the cat alone; the cat is the main character but the scene should "
+    "illustrate the cat type clearly."
+)
 
-# Fallback if vision fails or no splash image
+# Used only when there is no splash image (a failed vision call aborts the run instead)
 CONSISTENCY_FALLBACK = (
     "Felix is a cute cartoon tuxedo cat mascot: cream-and-black fur, big shiny eyes, "
     "soft rounded face, small oversized red nose, Pixar-like warm shading. "
@@ -47,67 +102,96 @@ CONSISTENCY_FALLBACK = (
 )
 
 
-def get_felix_description_from_image(client, splash_path):
+@functools.lru_cache(maxsize=None)
+def _openai_client():
+    """OpenAI client (retries are handled by the scheduler), created on first use."""
+    from dotenv import load_dotenv
+    from openai import OpenAI
+
+    load_dotenv(PROJECT_ROOT / ".env")
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise SystemExit("OPENAI_API_KEY not set. Add it to .env or environment.")
+    return OpenAI(api_key=api_key, max_retries=0)
+
+
+def _load_descriptions():
+    try:
+        return json.loads(FELIX_DESCRIPTION_CACHE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_descriptions(descriptions):
+    FELIX_DESCRIPTION_CACHE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = FELIX_DESCRIPTION_CACHE.with_name(FELIX_DESCRIPTION_CACHE.name + ".tmp")
+    tmp.write_text(json.dumps(descriptions, indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, FELIX_DESCRIPTION_CACHE)
+
+
+def get_felix_description_from_image(client, splash_path, cache=None, scheduler=None):
     """
     Use GPT-4o vision to describe the splash image for DALL-E 3 consistency.
-    Returns a string suitable for prepending to DALL-E prompts. Caches to file.
+    Returns a string suitable for prepending to DALL-E prompts. Cached per
+    splash image content hash, so a changed splash gets a fresh description.
+    With client=None the shared client is created only on a cache miss.
+
+    The call goes through `scheduler` (rate limits, 429/5xx retries). If it
+    still fails or comes back empty, the run is aborted: the description is
+    part of every prompt and so of every cache key, and silently using the
+    fallback would regenerate every type with off-model art.
     """
     if not splash_path.exists():
         print(f"  Splash image not found, using fallback description.")
         return CONSISTENCY_FALLBACK
 
-    # Use cache if present
-    if FELIX_DESCRIPTION_CACHE.exists():
-        try:
-            text = FELIX_DESCRIPTION_CACHE.read_text(encoding="utf-8").strip()
-            if text:
-                print(f"  Using cached Felix description ({len(text)} chars)")
-                return text
-        except Exception as e:
-            print(f"  Cache read failed: {e}, calling vision.")
+    cache = cache or DerivativeCache()
+    key = cache.key([splash_path], {"transform": "felix_vision", "model": VISION_MODEL, "prompt": VISION_PROMPT})
+    descriptions = _load_descriptions()
+    text = descriptions.get(key, "").strip()
+    if text:
+        print(f"  Using cached Felix description ({len(text)} chars)")
+        return text
 
     with open(splash_path, "rb") as f:
         b64 = base64.b64encode(f.read()).decode("utf-8")
 
-    prompt = (
-        "Describe this cartoon cat mascot in one detailed paragraph for an image generator. "
-        "Include: body shape, fur pattern and colors, face shape, eyes, nose, mouth, ears, "
-        "style (e.g. cartoon, Pixar-like), and any props or background. "
-        "Write so that another AI (DALL-E 3) could draw this exact same character in different "
-        "poses and scenes. Output only the paragraph, no preamble. "
-        "Then add one sentence: The image must show the full type-specific scene with setting "
-        "and props, not the cat alone; the cat is the main character but the scene should "
-        "illustrate the cat type clearly."
-    )
-
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": prompt},
-                        {
-                            "type": "image_url",
-                            "image_url": {"url": f"data:image/png;base64,{b64}"},
-                        },
-                    ],
-                }
-            ],
-            max_tokens=500,
-        )
+    client = client or _openai_client()
+
+    def describe(_):
+        with stage("vision", splash_path.name):
+            response = client.chat.completions.create(
+                model=VISION_MODEL,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": [
+                            {"type": "text", "text": VISION_PROMPT},
+                            {
+                                "type": "image_url",
+                                "image_url": {"url": f"data:image/png;base64,{b64}"},
+                            },
+                        ],
+                    }
+                ],
+                max_tokens=500,
+            )
         description = (response.choices[0].message.content or "").strip()
         if not description:
-            return CONSISTENCY_FALLBACK
-        # Cache it
-        OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-        FELIX_DESCRIPTION_CACHE.write_text(description, encoding="utf-8")
-        print(f"  Felix description from vision ({len(description)} chars), cached.")
+            raise ValueError("vision returned an empty description")
         return description
-    except Exception as e:
-        print(f"  Vision failed: {e}, using fallback description.")
-        return CONSISTENCY_FALLBACK
+
+    result = (scheduler or JobScheduler(max_workers=1)).run_one("Felix description", describe, images=0)
+    if not result.ok:
+        raise SystemExit(
+            f"Vision description of {splash_path.name} failed after {result.attempts} attempt(s): {result.error}\n"
+            "Not falling back to the stock description, which would change every prompt and regenerate "
+            "every type. Rerun once the API answers."
+        )
+    descriptions[key] = result.value
+    _save_descriptions(descriptions)
+    print(f"  Felix description from vision ({len(result.value)} chars), cached.")
+    return result.value
 
 
 def slug(name):
@@ -125,95 +209,205 @@ def build_prompt(overall_prompt, cat_type, felix_description):
 
 
 def generate_image(client, prompt, out_path):
-    """Call DALL-E 3, download image, resize to 512x512, save PNG. Returns True on success."""
+    """Call DALL-E 3 and return (png_bytes, out_path) for the resize stage, or None if no image data."""
     # DALL-E 3 only supports 1024x1024, 1792x1024, 1024x1792; we generate 1024x1024 then resize
-    response = client.images.generate(
-        model="dall-e-3",
-        prompt=prompt,
-        size="1024x1024",
-        quality="standard",
-        n=1,
-        response_format="url",  # then we download and resize
-    )
-    image_url = response.data[0].url
-    if not image_url:
-        return False
-    resp = requests.get(image_url, timeout=60)
-    resp.raise_for_status()
-    img = Image.open(io.BytesIO(resp.content)).convert("RGB")
-    img = img.resize(OUTPUT_SIZE, Image.Resampling.LANCZOS)
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-    img.save(out_path, "PNG")
-    return True
+    with stage("api", Path(out_path).name) as ev:
+        response = client.images.generate(
+            model=DALLE_MODEL,
+            prompt=prompt,
+            size=DALLE_SIZE,
+            quality=DALLE_QUALITY,
+            n=1,
+            response_format="b64_json",  # inline, no separate download
+        )
+        b64 = response.data[0].b64_json
+        data = base64.b64decode(b64) if b64 else None
+        ev["bytes"] = len(data) if data else 0
+    if not data:
+        return None
+    return data, out_path
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Generate DALL-E 3 images for each cat type.")
+    parser.add_argument("--limit", type=int, default=None, help="Only consider the first N types")
+    parser.add_argument("--output-dir", type=Path, default=OUTPUT_DIR, help="Where to write the PNGs")
+    parser.add_argument("--splash", type=Path, default=SPLASH_IMAGE, help="Mascot reference image for vision")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS, help="Concurrent generations")
+    parser.add_argument("--rpm", type=float, default=DEFAULT_REQUESTS_PER_MINUTE, help="API requests per minute")
+    parser.add_argument("--ipm", type=float, default=DEFAULT_IMAGES_PER_MINUTE, help="Images per minute")
+    batch = parser.add_mutually_exclusive_group()
+    batch.add_argument("--batch-out", metavar="FILE", help="Write pending prompts as batch JSONL and exit")
+    batch.add_argument("--batch-in", metavar="FILE", help="Ingest a batch results JSONL file")
+    work_queue.add_arguments(parser)
+    phash_index.add_arguments(parser)
+    stage_timing.add_arguments(parser)
+    args = parser.parse_args()
+    if args.queue and (args.batch_out or args.batch_in):
+        parser.error("--queue cannot be combined with --batch-out/--batch-in")
+    if args.rpm <= 0 or args.ipm <= 0:
+        parser.error("--rpm and --ipm must be positive")
+    stage_timing.configure_from_args(args, "cat_types")
+
     with open(CAT_TYPES_JSON, "r", encoding="utf-8") as f:
         data = json.load(f)
 
     overall_prompt = data.get("overall_prompt", "")
     all_types = data.get("types", [])
-    cat_types = all_types[:MAX_TYPES]
+    cat_types = all_types[:args.limit]
 
     if not overall_prompt:
         raise ValueError("cat_types.json must contain 'overall_prompt'")
     if not cat_types:
         raise ValueError("cat_types.json must contain 'types' (non-empty)")
 
-    if not SPLASH_IMAGE.exists():
-        print(f"Warning: Mascot reference not found at {SPLASH_IMAGE}")
+    if not args.splash.exists():
+        print(f"Warning: Mascot reference not found at {args.splash}")
     else:
-        print(f"Mascot reference: {SPLASH_IMAGE.name} (DALL-E 3 description from vision)")
+        print(f"Mascot reference: {args.splash.name} (DALL-E 3 description from vision)")
     print(f"Using overall_prompt (first 80 chars): {overall_prompt[:80]}...")
-    print(f"Generating images for {len(cat_types)} types (max {MAX_TYPES}).\n")
+    print(f"Considering {len(cat_types)} of {len(all_types)} types.\n")
 
-    client = OpenAI(api_key=API_KEY)
-
-    # Get Felix description from splash image via GPT-4o vision (cached after first run)
-    felix_description = get_felix_description_from_image(client, SPLASH_IMAGE)
+    # Get Felix description from splash image via GPT-4o vision (cached per splash content)
+    cache = DerivativeCache()
+    scheduler = JobScheduler(max_workers=args.workers, requests_per_minute=args.rpm, images_per_minute=args.ipm)
+    felix_description = get_felix_description_from_image(None, args.splash, cache, scheduler)
     print()
 
+    # Each output is keyed on model + final prompt + size, so editing overall_prompt,
+    # one type's prompt, or the splash (via the description) regenerates exactly the
+    # affected types. Existing images that predate the cache are adopted rather than
+    # paid for again.
+    cache_params = {
+        "transform": "cat_type_image",
+        "model": DALLE_MODEL,
+        "size": DALLE_SIZE,
+        "quality": DALLE_QUALITY,
+        "output_size": OUTPUT_SIZE,
+    }
+    cache_keys = {}
+
     skipped = []
     succeeded = 0
+    pending = {}
+    fresh = set()  # types already up to date
 
     for i, cat_type in enumerate(cat_types):
         name = cat_type["name"]
         filename = f"{slug(name)}.png"
-        out_path = OUTPUT_DIR / filename
+        out_path = args.output_dir / filename
         prompt = build_prompt(overall_prompt, cat_type, felix_description)
+        cache_keys[out_path] = cache.key([], {**cache_params, "prompt": prompt})
 
-        if out_path.exists():
-            print(f"[{i+1}/{len(cat_types)}] Skip (exists): {filename}")
+        if cache.is_fresh(out_path, cache_keys[out_path], adopt_existing=True):
+            print(f"[{i+1}/{len(cat_types)}] Skip (up to date): {filename}")
             succeeded += 1
+            fresh.add(name)
             continue
-
-        print(f"[{i+1}/{len(cat_types)}] Generating: {name} -> {filename}")
-
-        for attempt in range(MAX_RETRIES):
-            try:
-                if generate_image(client, prompt, out_path):
-                    succeeded += 1
-                    print(f"  -> Saved {out_path}")
-                    break
-            except Exception as e:
-                backoff = INITIAL_BACKOFF * (2 ** attempt)
-                if attempt < MAX_RETRIES - 1:
-                    print(f"  -> Error: {e}. Retry in {backoff}s ({attempt+1}/{MAX_RETRIES})")
-                    time.sleep(backoff)
-                else:
-                    print(f"  -> Failed after {MAX_RETRIES} attempts: {e}. Skipping.")
-                    skipped.append((name, str(e)))
-                    break
-        else:
-            skipped.append((name, "no image data"))
-
-        time.sleep(DELAY_BETWEEN_REQUESTS)
-
+        pending[name] = (out_path, prompt)
+
+    def generate_type(name):
+        if name in pending:
+            out_path, prompt = pending[name]
+        else:  # queued by another worker
+            item = queue.data(name)
+            out_path, prompt = Path(item["path"]), item["prompt"]
+        if queue:
+            # A worker that stalled past its lease must not pay for a type taken over
+            queue.ensure_held(name)
+        print(f"Generating: {name} -> {out_path.name}")
+        payload = generate_image(client, prompt, out_path)
+        if not payload:
+            raise RuntimeError("no image data")
+        if queue:
+            # Nor overwrite the new holder's image: checked again just before the rename
+            return (*payload, queue.token(name))
+        return payload
+
+    if args.batch_out:
+        count = write_requests(
+            args.batch_out,
+            (
+                image_request(name, prompt, DALLE_MODEL, DALLE_SIZE, DALLE_QUALITY)
+                for name, (out_path, prompt) in pending.items()
+            ),
+        )
+        cache.save()
+        print(f"\nWrote {count} batch request(s) to {args.batch_out}")
+        return
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    process = functools.partial(resize_image_bytes, target_size=OUTPUT_SIZE, mode="RGB")
+    queue = None
+    total = len(pending)
+    near_index, near_dups = None, []
+    if args.near_dup is not None:
+        near_index = PhashIndex()
+        near_index.update()
+        print(f"Checking new images against {len(near_index)} indexed image(s) (radius {args.near_dup})")
+    if args.batch_in:
+        print(f"\nIngesting batch results from {args.batch_in} for {len(pending)} pending type(s)\n")
+        outputs = {name: out_path for name, (out_path, _) in pending.items()}
+        results = ingest_results(args.batch_in, outputs, process, fresh=fresh)
+    else:
+        client = _openai_client()
+        jobs = pending
+        if args.queue:
+            queue = WorkQueue(args.queue, lease_seconds=args.lease_seconds)
+            # The cache key is part of the data, so a changed prompt or setting requeues a done type
+            added = queue.add_many({name: {"path": str(out_path), "prompt": prompt, "key": cache_keys[out_path]}
+                                    for name, (out_path, prompt) in pending.items()})
+            status = queue.status()
+            total = status["items"] - status["done"]
+            print(f"\nWork queue {args.queue}: {added} type(s) added or requeued, {total} not done")
+            jobs = queue.claims()
+        print(f"\nGenerating {total} type(s) with {args.workers} worker(s), "
+              f"{args.rpm:g} requests/min, {args.ipm:g} images/min\n")
+        results = run_pipeline(jobs, generate_type, process, scheduler)
+    try:
+        for done, result in enumerate(results, 1):
+            if result.ok:
+                if queue and not queue.complete(result.job, {"path": str(result.value)}):
+                    print(f"[{done}/{total}] -> {result.job} was already completed by another worker "
+                          f"or requeued meanwhile")
+                    continue
+                if result.value in cache_keys:
+                    cache.record(result.value, cache_keys[result.value])
+                    cache.save()
+                succeeded += 1
+                print(f"[{done}/{total}] -> Saved {result.value}")
+                if near_index:
+                    matches = near_index.check(result.value, args.near_dup)
+                    if matches:
+                        near_dups.append((result.job, matches))
+                        print("    Near-duplicate of " + ", ".join(f"{name} ({d} bits)" for d, name in matches[:3]))
+            elif isinstance(result.error, LeaseLost):
+                print(f"[{done}/{total}] -> {result.job}: {result.error}")
+            else:
+                if queue:
+                    queue.release(result.job, result.error)
+                print(f"[{done}/{total}] -> Failed {result.job} after {result.attempts} attempt(s): "
+                      f"{result.error}. Skipping.")
+                skipped.append((result.job, str(result.error)))
+    finally:
+        if queue:
+            queue.close()
+        if near_index:
+            near_index.save()
+
+    cache.save()
     print(f"\nDone. Generated: {succeeded}/{len(cat_types)}")
+    if queue:
+        print("Work queue: " + " ".join(f"{k}={v}" for k, v in queue.status().items()))
+    if near_dups:
+        print("Near-duplicates of existing art:")
+        for name, matches in near_dups:
+            print(f"  - {name}: " + ", ".join(f"{other} ({d} bits)" for d, other in matches[:3]))
     if skipped:
         print("Skipped:")
         for name, reason in skipped:
             print(f"  - {name}: {reason}")
+    stage_timing.report()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Two-stage streaming pipeline for the image generators: generate, then resize/encode.
+
+Stage 1 runs on the scheduler's worker threads. Each thread calls the API
+(rate-limited, with retries, see job_scheduler.py) and decodes the inline
+b64_json result to bytes. Stage 2 hands those bytes to a process pool, which
+decodes, resizes and encodes the image on another core. A bounded queue
+between the stages provides backpressure: if encoding falls behind, the
+generator threads block before starting another request. At most
+(workers + queue_size + cpu_workers) decoded images are in memory, however
+many jobs are queued. So the CPU work for item N overlaps the API call for
+item N+1.
+
+Jobs are pulled from the iterable only as a generator thread becomes free, so
+it may be lazy, e.g. WorkQueue.claims() (work_queue.py) claiming items just in time.
+Outputs are written to a temp file and renamed into place, so an interrupted
+run never leaves a half-written PNG that a later run would take as done.
+
+Usage (from another script):
+  process = functools.partial(resize_image_bytes, target_size=(512, 512))
+  for result in run_pipeline(jobs, generate_fn, process, scheduler):
+      ...   # JobResult; result.value is whatever process returned
+"""
+
+import io
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+from job_scheduler import JobResult
+from stage_timing import stage
+
+DEFAULT_QUEUE_SIZE = 4
+
+_DONE = object()
+_STARTED = object()
+
+
+def resize_image_bytes(payload, target_size, mode=None, optimize=False):
+    """
+    CPU stage: payload is (image_bytes, out_path) or (image_bytes, out_path,
+    lease). Decode, resize to target_size with LANCZOS and save as PNG.
+    mode=None keeps alpha when the source has it. A lease (work_queue.LeaseToken)
+    is checked just before the output is renamed into place, so a worker whose
+    lease was taken over meanwhile does not overwrite the new holder's image.
+    Returns out_path.
+    """
+    data, out_path, *lease = payload
+    item = os.path.basename(out_path)
+    with stage("decode", item) as ev:
+        img = Image.open(io.BytesIO(data))
+        if mode is None:
+            mode = "RGBA" if img.mode in ("RGBA", "LA", "P") else "RGB"
+        img = img.convert(mode)
+        ev["bytes"] = len(data)
+    with stage("resize", item):
+        img = img.resize(target_size, Image.Resampling.LANCZOS)
+    with stage("encode", item) as ev:
+        buf = io.BytesIO()
+        img.save(buf, "PNG", optimize=optimize)
+        ev["bytes"] = buf.tell()
+    with stage("write", item) as ev:
+        os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+        tmp = f"{out_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                ev["bytes"] = f.write(buf.getbuffer())
+            if lease:
+                lease[0].check()
+            os.replace(tmp, out_path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+    return out_path
+
+
+def run_pipeline(jobs, generate_fn, process_fn, scheduler, cpu_workers=None, queue_size=DEFAULT_QUEUE_SIZE):
+    """
+    Run generate_fn(job) -> payload on the scheduler's threads and process_fn(payload)
+    in a process pool. Yields one JobResult per job as it completes either stage.
+    jobs is consumed lazily, one job each time a generator thread is free.
+    process_fn must be picklable (a module-level function or functools.partial of one).
+    """
+    if hasattr(jobs, "__len__"):
+        if not jobs:
+            return
+        cpu_workers = cpu_workers or min(len(jobs), os.cpu_count() or 1)
+    cpu_workers = cpu_workers or os.cpu_count() or 1
+
+    jobs = iter(jobs)
+    jobs_lock = threading.Lock()
+    cpu_q = queue.Queue(maxsize=queue_size)
+    out_q = queue.Queue()
+    stop = threading.Event()
+
+    def generate_worker():
+        try:
+            while not stop.is_set():
+                with jobs_lock:
+                    job = next(jobs, _DONE)
+                if job is _DONE:
+                    return
+                out_q.put(_STARTED)
+                result = scheduler.run_one(job, generate_fn)
+                if result.ok:
+                    # Blocks while the CPU stage is behind
+                    cpu_q.put((job, result.value, result.attempts))
+                else:
+                    out_q.put(result)
+        finally:
+            out_q.put(_DONE)
+
+    def cpu_worker(pool):
+        while True:
+            item = cpu_q.get()
+            if item is _DONE:
+                return
+            job, payload, attempts = item
+            try:
+                value = pool.submit(process_fn, payload).result()
+                out_q.put(JobResult(job, True, value, attempts=attempts))
+            except Exception as e:
+                out_q.put(JobResult(job, False, error=e, attempts=attempts))
+            del payload
+
+    pool = ProcessPoolExecutor(max_workers=cpu_workers)
+    generators = [threading.Thread(target=generate_worker, daemon=True) for _ in range(scheduler.max_workers)]
+    cpus = [threading.Thread(target=cpu_worker, args=(pool,), daemon=True) for _ in range(cpu_workers)]
+    for t in generators + cpus:
+        t.start()
+    try:
+        # Every job a generator took is announced (_STARTED) before its result,
+        # so once all generators have exited, started == yielded means drained
+        running, started, yielded = len(generators), 0, 0
+        while running or yielded < started:
+            item = out_q.get()
+            if item is _DONE:
+                running -= 1
+            elif item is _STARTED:
+                started += 1
+            else:
+                yielded += 1
+                yield item
+    finally:
+        stop.set()
+        for t in generators:
+            t.join()
+        for _ in cpus:
+            cpu_q.put(_DONE)
+        for t in cpus:
+            t.join()
+        pool.shutdown()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Concurrent, rate-limit-aware job scheduler for the DALL-E generation scripts.
+
+Jobs run on a thread pool. Before every attempt a job takes one token from a
+requests-per-minute bucket and `images` tokens from an images-per-minute
+bucket, so the run never exceeds the API quota no matter how many workers
+there are. Failed attempts are retried with full-jitter exponential backoff:
+  - 429 responses honour Retry-After (or retry-after-ms) when present, and
+    pause *all* workers for that long, not only the one that was throttled;
+  - 5xx, timeouts and connection errors are retried;
+  - other 4xx errors (bad prompt, content policy) fail immediately.
+
+Usage (from another script):
+  scheduler = JobScheduler(max_workers=4, requests_per_minute=15, images_per_minute=15)
+  for result in scheduler.run(jobs, work_fn):   # yields JobResult as jobs finish
+      ...
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, Optional
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_REQUESTS_PER_MINUTE = 15
+DEFAULT_IMAGES_PER_MINUTE = 15
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_BASE_BACKOFF = 2.0  # seconds
+DEFAULT_MAX_BACKOFF = 60.0  # seconds
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `per_minute` tokens/minute."""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None, clock=time.monotonic, sleep=time.sleep):
+        if per_minute <= 0:
+            raise ValueError(f"rate must be positive, got {per_minute} per minute")
+        if capacity is not None and capacity <= 0:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else max(1.0, per_minute / 60.0)
+        self._tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def pause(self, seconds: float) -> None:
+        """Hand out no tokens for `seconds` (used when the server says slow down)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+    def acquire(self, n: float = 1.0) -> float:
+        """Block until `n` tokens are available and take them. Returns seconds waited."""
+        n = min(n, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                else:
+                    self._refill(now)
+                    if self._tokens >= n:
+                        self._tokens -= n
+                        return waited
+                    delay = (n - self._tokens) / self.rate
+            self._sleep(delay)
+            waited += delay
+
+
+@dataclass
+class JobResult:
+    job: Any
+    ok: bool
+    value: Any = None
+    error: Optional[BaseException] = None
+    attempts: int = 0
+
+
+def status_code(exc) -> Optional[int]:
+    """HTTP status carried by an SDK/HTTP exception, if any."""
+    code = getattr(exc, "status_code", None)
+    if code is None:
+        response = getattr(exc, "response", None)
+        code = getattr(response, "status_code", None) or getattr(response, "status", None)
+    return code if isinstance(code, int) else None
+
+
+def retry_after(exc) -> Optional[float]:
+    """Seconds from a Retry-After / retry-after-ms header on the exception's response."""
+    headers = getattr(getattr(exc, "response", None), "headers", None) or getattr(exc, "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms") is not None:
+            return float(headers["retry-after-ms"]) / 1000.0
+        if headers.get("retry-after") is not None:
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        return None
+    return None
+
+
+def is_retryable(exc) -> bool:
+    code = status_code(exc)
+    if code is None:
+        # No HTTP status: network problem (connection reset, timeout, DNS...)
+        return isinstance(exc, (ConnectionError, TimeoutError)) or any(
+            name in type(exc).__name__ for name in ("Connection", "Timeout")
+        )
+    return code == 429 or code >= 500
+
+
+class JobScheduler:
+    """Run jobs concurrently under request/image rate limits with retry and backoff."""
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+        images_per_minute: float = DEFAULT_IMAGES_PER_MINUTE,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        base_backoff: float = DEFAULT_BASE_BACKOFF,
+        max_backoff: float = DEFAULT_MAX_BACKOFF,
+        log=print,
+        sleep=time.sleep,
+    ):
+        self.max_workers = max_workers
+        # Allow each worker one request in the initial burst, never more than a minute's quota
+        self.requests = TokenBucket(requests_per_minute, capacity=min(max_workers, requests_per_minute), sleep=sleep)
+        self.images = TokenBucket(images_per_minute, capacity=min(max_workers, images_per_minute), sleep=sleep)
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.log = log
+        self._sleep = sleep
+
+    def backoff(self, attempt: int, exc) -> float:
+        """Delay before retry number `attempt` (0-based) after `exc`."""
+        hinted = retry_after(exc)
+        if hinted is not None:
+            return hinted + random.uniform(0, self.base_backoff)
+        return random.uniform(0, min(self.max_backoff, self.base_backoff * (2 ** attempt)))
+
+    def run_one(self, job, fn, images: int = 1) -> JobResult:
+        """Run fn(job) on the calling thread with rate limiting and retries."""
+        for attempt in range(self.max_attempts):
+            self.requests.acquire()
+            self.images.acquire(images)
+            try:
+                return JobResult(job, True, fn(job), attempts=attempt + 1)
+            except Exception as e:
+                if not is_retryable(e) or attempt == self.max_attempts - 1:
+                    return JobResult(job, False, error=e, attempts=attempt + 1)
+                delay = self.backoff(attempt, e)
+                if status_code(e) == 429:
+                    # Throttled: hold every worker back, not just this one
+                    self.requests.pause(delay)
+                self.log(f"  -> {job}: {e}. Retry in {delay:.1f}s ({attempt + 1}/{self.max_attempts})")
+                self._sleep(delay)
+        return JobResult(job, False, error=RuntimeError("no attempts made"))
+
+    def run(self, jobs, fn, images_per_job: int = 1):
+        """Run fn(job) for every job; yield a JobResult for each as it finishes."""
+        jobs = list(jobs)
+        if not jobs:
+            return
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [pool.submit(self.run_one, job, fn, images_per_job) for job in jobs]
+            for future in as_completed(futures):
+                yield future.result()
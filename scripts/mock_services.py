@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the services the asset pipelines call, for load testing.
+
+Endpoints (one aiohttp server):
+  POST /v1/images/generations   DALL-E: b64_json inline, or a url on /cdn/
+  POST /v1/chat/completions     GPT-4o chat / vision: a canned description
+  GET  /cdn/<name>.png          image download (the url response_format)
+  GET  /oembed?url=...          YouTube oEmbed
+  GET  /watch?v=...             YouTube watch page
+  GET  /__stats                 requests per endpoint and status, as JSON
+  POST /__reset                 zero the counters
+
+Point the pipelines at it with OPENAI_BASE_URL=http://HOST:PORT/v1 (the OpenAI
+SDK reads it) and test_youtube_videos.py --oembed-url/--watch-url.
+
+Every endpoint waits a latency drawn from its distribution, then fails with
+429 (with a Retry-After) or a 5xx at the configured rates, before answering.
+Latency specs:
+  fixed:S            always S seconds
+  uniform:A:B        uniform between A and B
+  lognormal:M:SIGMA  median M, log-space sigma SIGMA (long right tail, like real APIs)
+  exp:MEAN           exponential with mean MEAN
+
+Payloads: the generated image is a PNG of --image-px square; --image-noise
+(0-1) is the fraction of random pixels, which sets how large it encodes (1.0 is
+about 3 MB at 1024px, like a DALL-E PNG). --watch-kb pads the watch page. oEmbed
+answers 403 (forcing the watch-page fallback) or 404 for a stable, hashed
+fraction of video IDs (--oembed-403, --missing).
+
+Random draws use --seed, so a run is reproducible for a given request order.
+
+Usage:
+  python scripts/mock_services.py [--port 8765] [--images-latency lognormal:0.5:0.4]
+                                  [--error-429 0.05] [--error-5xx 0.01] [--image-px 1024]
+  (from Python) server = MockServices(MockConfig(...)).start(); ...; server.stop()
+
+Requires: pip install aiohttp Pillow numpy
+"""
+
+import argparse
+import asyncio
+import base64
+import io
+import json
+import math
+import random
+import threading
+import time
+import zlib
+from collections import Counter
+from dataclasses import dataclass, fields
+
+import numpy as np
+from aiohttp import web
+from PIL import Image
+
+DEFAULT_PORT = 8765
+
+
+def parse_latency(spec: str):
+    """Sampler for a latency spec (see module docstring): a function of a random.Random."""
+    kind, *args = spec.split(":")
+    try:
+        values = [float(a) for a in args]
+        if kind == "fixed" and len(values) == 1:
+            return lambda rng: values[0]
+        if kind == "uniform" and len(values) == 2:
+            return lambda rng: rng.uniform(values[0], values[1])
+        if kind == "lognormal" and len(values) == 2:
+            mu = math.log(values[0]) if values[0] > 0 else float("-inf")
+            return lambda rng: rng.lognormvariate(mu, values[1]) if values[0] > 0 else 0.0
+        if kind == "exp" and len(values) == 1:
+            return lambda rng: rng.expovariate(1.0 / values[0]) if values[0] > 0 else 0.0
+    except ValueError:
+        pass
+    raise ValueError(f"bad latency spec {spec!r} (fixed:S, uniform:A:B, lognormal:MEDIAN:SIGMA, exp:MEAN)")
+
+
+@dataclass
+class MockConfig:
+    host: str = "127.0.0.1"
+    port: int = DEFAULT_PORT  # 0 picks a free port
+    images_latency: str = "lognormal:0.5:0.4"
+    chat_latency: str = "lognormal:0.8:0.3"
+    cdn_latency: str = "lognormal:0.05:0.5"
+    oembed_latency: str = "lognormal:0.08:0.5"
+    watch_latency: str = "lognormal:0.25:0.5"
+    error_429: float = 0.0
+    error_5xx: float = 0.0
+    retry_after: float = 0.5  # seconds, sent with every 429
+    image_px: int = 1024
+    image_noise: float = 0.25
+    chat_chars: int = 900
+    watch_kb: int = 64
+    oembed_403: float = 0.1
+    missing: float = 0.05
+    seed: int = 1
+
+
+def _fake_png(px: int, noise: float, seed: int) -> bytes:
+    """A px x px RGB PNG: a smooth gradient with a `noise` fraction of random pixels."""
+    rng = np.random.default_rng(seed)
+    ramp = np.linspace(0, 255, px, dtype=np.float32)
+    img = np.stack(np.broadcast_arrays(ramp[None, :], ramp[:, None], (ramp[None, :] + ramp[:, None]) / 2), axis=-1)
+    img = img.astype(np.uint8)
+    mask = rng.random((px, px)) < noise
+    img[mask] = rng.integers(0, 256, size=(int(mask.sum()), 3), dtype=np.uint8)
+    buf = io.BytesIO()
+    Image.fromarray(img, "RGB").save(buf, "PNG")
+    return buf.getvalue()
+
+
+def _hash_fraction(text: str) -> float:
+    """Stable value in [0, 1) for a string."""
+    return zlib.crc32(text.encode("utf-8")) / 2 ** 32
+
+
+class MockServices:
+    """The aiohttp app plus its counters; start() runs it on a background thread."""
+
+    def __init__(self, config: MockConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.latency = {
+            "images": parse_latency(config.images_latency),
+            "chat": parse_latency(config.chat_latency),
+            "cdn": parse_latency(config.cdn_latency),
+            "oembed": parse_latency(config.oembed_latency),
+            "watch": parse_latency(config.watch_latency),
+        }
+        self.png = _fake_png(config.image_px, config.image_noise, config.seed)
+        self.png_b64 = base64.b64encode(self.png).decode("ascii")
+        filler = "Felix is a cartoon tuxedo cat with big shiny eyes and a small red nose. "
+        self.chat_text = (filler * (config.chat_chars // len(filler) + 1))[:config.chat_chars]
+        pad = "<!-- padding -->" * (config.watch_kb * 1024 // 16)
+        self.watch_page = f'<html><head><meta property="og:title" content="Cat video"></head><body>{pad}</body></html>'
+        self.counts = Counter()
+        self.base_url = None
+        self._loop = None
+        self._thread = None
+        self._runner = None
+
+    # --- request handling -------------------------------------------------
+
+    async def _gate(self, endpoint, openai_style=True):
+        """Latency plus error injection. Returns an error response or None."""
+        await asyncio.sleep(max(0.0, self.latency[endpoint](self.rng)))
+        roll = self.rng.random()
+        if roll < self.config.error_429:
+            self.counts[(endpoint, 429)] += 1
+            headers = {
+                "retry-after": str(max(1, math.ceil(self.config.retry_after))),
+                "retry-after-ms": str(int(self.config.retry_after * 1000)),
+            }
+            body = {"error": {"message": "Rate limit reached (mock)", "type": "requests", "code": "rate_limit_exceeded"}}
+            return web.json_response(body, status=429, headers=headers) if openai_style else \
+                web.Response(status=429, headers=headers)
+        if roll < self.config.error_429 + self.config.error_5xx:
+            status = self.rng.choice((500, 502, 503))
+            self.counts[(endpoint, status)] += 1
+            body = {"error": {"message": "Server error (mock)", "type": "server_error", "code": None}}
+            return web.json_response(body, status=status) if openai_style else web.Response(status=status)
+        return None
+
+    def _ok(self, endpoint, response):
+        self.counts[(endpoint, response.status)] += 1
+        return response
+
+    async def images(self, request):
+        body = await request.json()
+        if (error := await self._gate("images")) is not None:
+            return error
+        n = int(body.get("n", 1))
+        if body.get("response_format") == "b64_json":
+            data = [{"b64_json": self.png_b64, "revised_prompt": body.get("prompt", "")} for _ in range(n)]
+        else:
+            data = [{"url": f"{self.base_url}/cdn/img-{self.rng.getrandbits(32):08x}.png"} for _ in range(n)]
+        return self._ok("images", web.json_response({"created": int(time.time()), "data": data}))
+
+    async def chat(self, request):
+        body = await request.json()
+        if (error := await self._gate("chat")) is not None:
+            return error
+        response = {
+            "id": f"chatcmpl-mock{self.rng.getrandbits(32):08x}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": self.chat_text},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 1000, "completion_tokens": len(self.chat_text) // 4,
+                      "total_tokens": 1000 + len(self.chat_text) // 4},
+        }
+        return self._ok("chat", web.json_response(response))
+
+    async def cdn(self, request):
+        if (error := await self._gate("cdn", openai_style=False)) is not None:
+            return error
+        return self._ok("cdn", web.Response(body=self.png, content_type="image/png"))
+
+    async def oembed(self, request):
+        if (error := await self._gate("oembed", openai_style=False)) is not None:
+            return error
+        video_id = request.query.get("url", "").rpartition("v=")[2]
+        h = _hash_fraction(video_id)
+        if h < self.config.missing:
+            return self._ok("oembed", web.Response(status=404))
+        if h < self.config.missing + self.config.oembed_403:
+            return self._ok("oembed", web.Response(status=403))
+        return self._ok("oembed", web.json_response({"title": f"Cat video {video_id}", "type": "video"}))
+
+    async def watch(self, request):
+        if (error := await self._gate("watch", openai_style=False)) is not None:
+            return error
+        if _hash_fraction(request.query.get("v", "")) < self.config.missing:
+            return self._ok("watch", web.Response(status=404))
+        return self._ok("watch", web.Response(text=self.watch_page, content_type="text/html"))
+
+    async def stats(self, request):
+        return web.json_response(self.stats_dict())
+
+    async def reset(self, request):
+        self.counts.clear()
+        return web.json_response({"ok": True})
+
+    def stats_dict(self):
+        """{endpoint: {status: count}}."""
+        out = {}
+        for (endpoint, status), n in sorted(self.counts.items()):
+            out.setdefault(endpoint, {})[str(status)] = n
+        return out
+
+    def app(self):
+        app = web.Application(client_max_size=64 * 1024 * 1024)  # vision requests carry a base64 image
+        app.router.add_post("/v1/images/generations", self.images)
+        app.router.add_post("/v1/chat/completions", self.chat)
+        app.router.add_get("/cdn/{name}", self.cdn)
+        app.router.add_get("/oembed", self.oembed)
+        app.router.add_get("/watch", self.watch)
+        app.router.add_get("/__stats", self.stats)
+        app.router.add_post("/__reset", self.reset)
+        return app
+
+    # --- lifecycle --------------------------------------------------------
+
+    async def _start(self):
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.config.host, self.config.port)
+        await site.start()
+        host, port = self._runner.addresses[0][:2]
+        self.base_url = f"http://{host}:{port}"
+
+    def start(self):
+        """Serve on a background thread. Returns self; base_url is set once listening."""
+        self._loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(self._start())
+            started.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="mock-services", daemon=True)
+        self._thread.start()
+        started.wait()
+        return self
+
+    def stop(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop = None
+
+    def env(self):
+        """Environment for a pipeline subprocess: the OpenAI SDK pointed at this server."""
+        return {"OPENAI_BASE_URL": f"{self.base_url}/v1", "OPENAI_API_KEY": "sk-mock"}
+
+
+def add_arguments(parser) -> None:
+    """Add the MockConfig options to an argument parser."""
+    defaults = MockConfig()
+    for name in ("images", "chat", "cdn", "oembed", "watch"):
+        parser.add_argument(f"--{name}-latency", default=getattr(defaults, f"{name}_latency"), metavar="SPEC",
+                            help=f"{name} latency distribution (default {getattr(defaults, f'{name}_latency')})")
+    parser.add_argument("--error-429", type=float, default=defaults.error_429, help="Fraction of requests answered 429")
+    parser.add_argument("--error-5xx", type=float, default=defaults.error_5xx, help="Fraction answered 500/502/503")
+    parser.add_argument("--retry-after", type=float, default=defaults.retry_after, help="Retry-After sent with 429s (s)")
+    parser.add_argument("--image-px", type=int, default=defaults.image_px, help="Generated image edge (px)")
+    parser.add_argument("--image-noise", type=float, default=defaults.image_noise,
+                        help="Fraction of random pixels (sets the PNG size)")
+    parser.add_argument("--chat-chars", type=int, default=defaults.chat_chars, help="Chat completion length")
+    parser.add_argument("--watch-kb", type=int, default=defaults.watch_kb, help="Watch page size (KB)")
+    parser.add_argument("--oembed-403", type=float, default=defaults.oembed_403,
+                        help="Fraction of video IDs whose oEmbed answers 403")
+    parser.add_argument("--missing", type=float, default=defaults.missing, help="Fraction of video IDs that 404")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def config_from_args(args, **overrides) -> MockConfig:
+    values = {f.name: getattr(args, f.name) for f in fields(MockConfig) if hasattr(args, f.name)}
+    return MockConfig(**{**values, **overrides})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local stand-in for OpenAI, the image CDN and YouTube.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    server = MockServices(config_from_args(args)).start()
+    print(f"Mock services on {server.base_url} (image PNG {len(server.png) / 1e6:.2f} MB)")
+    print(f"  export OPENAI_BASE_URL={server.base_url}/v1 OPENAI_API_KEY=sk-mock")
+    print(f"  test_youtube_videos.py --oembed-url {server.base_url}/oembed --watch-url {server.base_url}/watch")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(server.stats_dict(), indent=2))
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Inspect the cat_types MP4s and rewrite them to faststart order in place.
+
+An MP4 is a sequence of boxes (size, type, payload). The player needs `moov`
+(the sample tables) before it can show a frame, so when `moov` sits after
+`mdat` the whole file has to be fetched or seeked before playback starts.
+The files written by our encoder have ftyp, free, mdat, moov.
+
+For every *.mp4 under the given folders (default assets/cat_types) this:
+  - parses the box tree in pure Python and reports duration, resolution,
+    codec, frame count, bitrate and the top-level atom layout;
+  - when `moov` comes after `mdat`, moves it in front of the first `mdat` with
+    memory-mapped I/O: the bytes in between are shifted with mmap.move, the
+    moov is written into the gap, and every stco/co64 chunk offset is raised
+    by the moov size. The media data is not re-encoded or copied elsewhere,
+    and the file size is unchanged;
+  - writes a JSON index with the metadata and a poster reference per video:
+    the sibling image the app shows before playback (X_resized.mp4 -> X.jpg)
+    and the time of the first sync sample.
+
+The rewrite is in place, so an interrupted run can leave a damaged file;
+the videos are checked in, so restore it from git and run again.
+
+Usage:
+  python scripts/mp4_faststart.py [folders...] [--check] [--index PATH]
+
+--check only reports and exits 1 if any file is not faststart.
+"""
+
+import argparse
+import json
+import mmap
+import struct
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+DEFAULT_FOLDERS = [PROJECT_ROOT / "assets" / "cat_types"]
+DEFAULT_INDEX = PROJECT_ROOT / "build" / "video_index.json"
+
+# Boxes whose payload is a sequence of child boxes
+CONTAINERS = {b"moov", b"trak", b"mdia", b"minf", b"stbl", b"edts", b"dinf", b"mvex", b"udta"}
+POSTER_SUFFIXES = (".jpg", ".png")
+
+
+class Mp4Error(ValueError):
+    pass
+
+
+class Box:
+    """One box: type, absolute offset, total size and header size."""
+
+    __slots__ = ("type", "offset", "size", "header")
+
+    def __init__(self, type_, offset, size, header):
+        self.type = type_
+        self.offset = offset
+        self.size = size
+        self.header = header
+
+    @property
+    def payload(self):
+        return self.offset + self.header
+
+    @property
+    def end(self):
+        return self.offset + self.size
+
+    def __repr__(self):
+        return f"Box({self.type.decode('latin-1')}, offset={self.offset}, size={self.size})"
+
+
+def iter_boxes(buf, start=0, end=None):
+    """Yield the boxes laid out back to back in buf[start:end]."""
+    end = len(buf) if end is None else end
+    pos = start
+    while pos + 8 <= end:
+        size, type_ = struct.unpack_from(">I4s", buf, pos)
+        header = 8
+        if size == 1:
+            if pos + 16 > end:
+                raise Mp4Error(f"truncated 64-bit box header at {pos}")
+            size = struct.unpack_from(">Q", buf, pos + 8)[0]
+            header = 16
+        elif size == 0:  # extends to the end of the enclosing space
+            size = end - pos
+        if size < header or pos + size > end:
+            raise Mp4Error(f"bad {type_!r} box size {size} at {pos}")
+        yield Box(type_, pos, size, header)
+        pos += size
+
+
+def find(buf, box, path):
+    """First descendant of `box` along the type path, e.g. [b'mdia', b'hdlr']."""
+    for child in iter_boxes(buf, box.payload, box.end):
+        if child.type == path[0]:
+            if len(path) == 1:
+                return child
+            found = find(buf, child, path[1:])
+            if found:
+                return found
+    return None
+
+
+def _full_box(buf, box):
+    """(version, payload offset after version/flags) of a FullBox."""
+    return buf[box.payload], box.payload + 4
+
+
+def _mvhd(buf, box):
+    version, p = _full_box(buf, box)
+    if version == 1:
+        timescale, duration = struct.unpack_from(">IQ", buf, p + 16)
+    else:
+        timescale, duration = struct.unpack_from(">II", buf, p + 8)
+    return timescale, duration
+
+
+def _track_info(buf, trak):
+    hdlr = find(buf, trak, [b"mdia", b"hdlr"])
+    handler = bytes(buf[hdlr.payload + 8: hdlr.payload + 12]).decode("latin-1") if hdlr else "?"
+    info = {"handler": handler}
+
+    tkhd = find(buf, trak, [b"tkhd"])
+    if tkhd:
+        # Width and height are the last two 16.16 fixed-point fields
+        w, h = struct.unpack_from(">II", buf, tkhd.end - 8)
+        info["width"], info["height"] = w >> 16, h >> 16
+
+    mdhd = find(buf, trak, [b"mdia", b"mdhd"])
+    timescale = None
+    if mdhd:
+        timescale, duration = _mvhd(buf, mdhd)  # same layout as mvhd up to duration
+        info["duration"] = round(duration / timescale, 3) if timescale else None
+
+    stbl = find(buf, trak, [b"mdia", b"minf", b"stbl"])
+    if stbl:
+        stsd = find(buf, stbl, [b"stsd"])
+        if stsd and struct.unpack_from(">I", buf, stsd.payload + 4)[0]:
+            info["codec"] = bytes(buf[stsd.payload + 12: stsd.payload + 16]).decode("latin-1")
+        stsz = find(buf, stbl, [b"stsz"])
+        if stsz:
+            info["samples"] = struct.unpack_from(">I", buf, stsz.payload + 8)[0]
+        if timescale:
+            info["first_sync_time"] = _first_sync_time(buf, stbl, timescale)
+    return info
+
+
+def _first_sync_time(buf, stbl, timescale):
+    """Presentation time (s, ignoring edit lists) of the first sync sample."""
+    stss = find(buf, stbl, [b"stss"])
+    sample = 1
+    if stss and struct.unpack_from(">I", buf, stss.payload + 4)[0]:
+        sample = struct.unpack_from(">I", buf, stss.payload + 8)[0]
+    stts = find(buf, stbl, [b"stts"])
+    if not stts:
+        return 0.0
+    count = struct.unpack_from(">I", buf, stts.payload + 4)[0]
+    t, remaining = 0, sample - 1
+    for i in range(count):
+        n, delta = struct.unpack_from(">II", buf, stts.payload + 8 + 8 * i)
+        step = min(n, remaining)
+        t += step * delta
+        remaining -= step
+        if not remaining:
+            break
+    return round(t / timescale, 3)
+
+
+def _chunk_offset_tables(buf, moov):
+    """Every stco/co64 box in moov."""
+    tables = []
+    for trak in iter_boxes(buf, moov.payload, moov.end):
+        if trak.type != b"trak":
+            continue
+        stbl = find(buf, trak, [b"mdia", b"minf", b"stbl"])
+        if stbl:
+            tables.extend(b for b in iter_boxes(buf, stbl.payload, stbl.end) if b.type in (b"stco", b"co64"))
+    return tables
+
+
+def inspect(buf, file_size):
+    """Metadata and top-level layout of an MP4 held in `buf`."""
+    top = list(iter_boxes(buf))
+    types = [b.type for b in top]
+    if b"moov" not in types:
+        raise Mp4Error("no moov box")
+    moov = top[types.index(b"moov")]
+    mvhd = find(buf, moov, [b"mvhd"])
+    if not mvhd:
+        raise Mp4Error("no mvhd box")
+    timescale, duration = _mvhd(buf, mvhd)
+    seconds = duration / timescale if timescale else 0.0
+    tracks = [_track_info(buf, t) for t in iter_boxes(buf, moov.payload, moov.end) if t.type == b"trak"]
+    video = next((t for t in tracks if t["handler"] == "vide"), {})
+    first_mdat = types.index(b"mdat") if b"mdat" in types else len(types)
+    return {
+        "duration": round(seconds, 3),
+        "width": video.get("width"),
+        "height": video.get("height"),
+        "codec": video.get("codec"),
+        "frames": video.get("samples"),
+        "bitrate_kbps": round(file_size * 8 / seconds / 1000, 1) if seconds else None,
+        "layout": [{"type": b.type.decode("latin-1"), "offset": b.offset, "size": b.size} for b in top],
+        "faststart": types.index(b"moov") < first_mdat,
+        "tracks": tracks,
+        "_poster_time": video.get("first_sync_time", 0.0),
+    }
+
+
+def faststart_in_place(path) -> bool:
+    """Move moov in front of the first mdat. Returns False if it already is."""
+    with open(path, "r+b") as f, mmap.mmap(f.fileno(), 0) as mm:
+        top = list(iter_boxes(mm))
+        types = [b.type for b in top]
+        if b"moov" not in types or b"mdat" not in types:
+            raise Mp4Error("need both moov and mdat")
+        moov = top[types.index(b"moov")]
+        first_mdat = top[types.index(b"mdat")]
+        if moov.offset < first_mdat.offset:
+            return False
+
+        # Patch chunk offsets in a copy of moov: everything from the insertion
+        # point up to the old moov position moves forward by moov.size
+        insert_at = first_mdat.offset
+        new_moov = bytearray(mm[moov.offset:moov.end])
+        shift = moov.size
+        for table in _chunk_offset_tables(mm, moov):
+            base = table.payload - moov.offset
+            count = struct.unpack_from(">I", new_moov, base + 4)[0]
+            fmt, width = (">Q", 8) if table.type == b"co64" else (">I", 4)
+            for i in range(count):
+                pos = base + 8 + width * i
+                offset = struct.unpack_from(fmt, new_moov, pos)[0]
+                if insert_at <= offset < moov.offset:
+                    offset += shift
+                    if width == 4 and offset > 0xFFFFFFFF:
+                        raise Mp4Error("chunk offset overflows stco; needs co64")
+                    struct.pack_into(fmt, new_moov, pos, offset)
+
+        mm.move(insert_at + shift, insert_at, moov.offset - insert_at)
+        mm[insert_at:insert_at + shift] = new_moov
+        mm.flush()
+    return True
+
+
+def _poster(video: Path):
+    base = video.stem[: -len("_resized")] if video.stem.endswith("_resized") else video.stem
+    for suffix in POSTER_SUFFIXES:
+        candidate = video.with_name(base + suffix)
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def _rel(path: Path) -> str:
+    try:
+        return path.resolve().relative_to(PROJECT_ROOT).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+def process(path: Path, check_only=False) -> dict:
+    """Inspect one file, rewrite it to faststart unless check_only, and return its index entry."""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        info = inspect(mm, len(mm))
+    rewritten = False
+    if not info["faststart"] and not check_only:
+        rewritten = faststart_in_place(path)
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            info = inspect(mm, len(mm))
+    poster = _poster(path)
+    info["poster"] = {"image": _rel(poster) if poster else None, "time": info.pop("_poster_time")}
+    info["rewritten"] = rewritten
+    return info
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report MP4 metadata and rewrite files to faststart order.")
+    parser.add_argument("folders", nargs="*", type=Path, default=DEFAULT_FOLDERS)
+    parser.add_argument("--check", action="store_true", help="Only report; exit 1 if any file is not faststart")
+    parser.add_argument("--index", type=Path, default=DEFAULT_INDEX, help="JSON index to write")
+    args = parser.parse_args()
+
+    videos = sorted({p.resolve() for folder in args.folders for p in folder.rglob("*.mp4")})
+    index = {}
+    failed = 0
+    for video in videos:
+        try:
+            info = process(video, check_only=args.check)
+        except (OSError, ValueError, struct.error) as e:
+            print(f"  Skip {video.name}: {e}")
+            failed += 1
+            continue
+        index[_rel(video)] = info
+        layout = " ".join(b["type"] for b in info["layout"])
+        status = "rewritten" if info["rewritten"] else ("ok" if info["faststart"] else "NOT faststart")
+        print(f"  {video.name}: {info['width']}x{info['height']} {info['codec']} {info['duration']}s "
+              f"{info['bitrate_kbps']} kbps [{layout}] {status}")
+
+    slow = [name for name, info in index.items() if not info["faststart"]]
+    rewritten = sum(info["rewritten"] for info in index.values())
+    print(f"{len(index)} video(s): {rewritten} rewritten, {len(slow)} not faststart, {failed} failed")
+    if not args.check:
+        args.index.parent.mkdir(parents=True, exist_ok=True)
+        args.index.write_text(json.dumps(index, indent=2), encoding="utf-8")
+        print(f"Index written to {args.index}")
+    if failed or (args.check and slow):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Budget-driven lossy PNG optimizer with perceptual quality gating.
+
+For every PNG under the given folders (default: assets/), several encodings
+are tried:
+  - lossless re-encode (optimize=True), dropping a fully opaque alpha channel;
+  - palette quantization at each of --colors (alpha preserved; libimagequant
+    is used when Pillow has it, otherwise fast octree / median cut).
+Each candidate is decoded again and compared with the original using SSIM
+computed with NumPy over R, G, B (premultiplied by alpha) and A; the score is
+the worst channel. The smallest candidate scoring at least --threshold
+replaces the file, and only if it is actually smaller.
+
+The original bytes of every rewritten file are kept in
+.asset_cache/png_originals/, named by the SHA-256 of the file that replaced
+them. A later run (--force, or a new --threshold / --colors) quantizes from and
+measures against that original, never against its own lossy output, so the
+loss does not compound and the threshold keeps bounding it. If no candidate
+passes the new threshold, the original is put back.
+
+Files run in a process pool. A per-file JSON report is written, and files
+already optimized with the same settings are skipped via the shared
+derivative cache.
+
+Usage:
+  python scripts/optimize_pngs.py [folders...] [--threshold 0.985] [--colors 256,128,64,32]
+                                  [--jobs N] [--dry-run] [--report PATH]
+
+Requires: pip install Pillow numpy
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, features
+
+from derivative_cache import CACHE_DIR, DerivativeCache
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+DEFAULT_FOLDERS = [PROJECT_ROOT / "assets"]
+DEFAULT_REPORT = PROJECT_ROOT / "build" / "png_optimizer_report.json"
+# Pre-optimization bytes, as <sha256 of the optimized file>.png
+ORIGINALS_DIR = CACHE_DIR / "png_originals"
+
+SSIM_THRESHOLD = 0.985
+PALETTE_COLORS = (256, 128, 64, 32)
+SSIM_WINDOW = 7
+_C1 = (0.01 * 255) ** 2
+_C2 = (0.03 * 255) ** 2
+
+
+def _box_mean(x: np.ndarray, r: int = SSIM_WINDOW) -> np.ndarray:
+    """Mean over every r x r window (valid region), via a summed-area table."""
+    c = np.pad(x, ((1, 0), (1, 0))).cumsum(0).cumsum(1)
+    return (c[r:, r:] - c[:-r, r:] - c[r:, :-r] + c[:-r, :-r]) / (r * r)
+
+
+def ssim(a: np.ndarray, b: np.ndarray) -> float:
+    """Mean SSIM of two equally sized 2-D arrays (0-255 scale, uniform 7x7 window)."""
+    a = a.astype(np.float64)
+    b = b.astype(np.float64)
+    if min(a.shape) < SSIM_WINDOW:
+        return 1.0 if np.array_equal(a, b) else 0.0
+    mu_a = _box_mean(a)
+    mu_b = _box_mean(b)
+    var_a = _box_mean(a * a) - mu_a * mu_a
+    var_b = _box_mean(b * b) - mu_b * mu_b
+    cov = _box_mean(a * b) - mu_a * mu_b
+    num = (2 * mu_a * mu_b + _C1) * (2 * cov + _C2)
+    den = (mu_a * mu_a + mu_b * mu_b + _C1) * (var_a + var_b + _C2)
+    return float((num / den).mean())
+
+
+def rgba_ssim(original: np.ndarray, candidate: np.ndarray) -> float:
+    """Worst-channel SSIM of two (H, W, 4) arrays, colour premultiplied by alpha."""
+    def premultiplied(x):
+        x = x.astype(np.float64)
+        return np.concatenate([x[..., :3] * (x[..., 3:] / 255.0), x[..., 3:]], axis=-1)
+
+    pa = premultiplied(original)
+    pb = premultiplied(candidate)
+    return min(ssim(pa[..., c], pb[..., c]) for c in range(4))
+
+
+def _encode(img: Image.Image) -> bytes:
+    buf = io.BytesIO()
+    img.save(buf, "PNG", optimize=True)
+    return buf.getvalue()
+
+
+def _quantize(img: Image.Image, colors: int) -> Image.Image:
+    if features.check("libimagequant"):
+        method = Image.Quantize.LIBIMAGEQUANT
+    elif img.mode == "RGBA":
+        method = Image.Quantize.FASTOCTREE
+    else:
+        method = Image.Quantize.MEDIANCUT
+    return img.quantize(colors=colors, method=method, dither=Image.Dither.FLOYDSTEINBERG)
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def optimize_png(path, threshold=SSIM_THRESHOLD, colors=PALETTE_COLORS, dry_run=False) -> dict:
+    """
+    Try every candidate encoding for one PNG. Runs in a worker process.
+    Candidates are made from, and scored against, the file's kept original
+    when it has one (it was optimized before), otherwise the file itself.
+    """
+    path = Path(path)
+    current = path.read_bytes()
+    kept = ORIGINALS_DIR / f"{hashlib.sha256(current).hexdigest()}.png"
+    source = kept.read_bytes() if kept.exists() else current
+    with Image.open(io.BytesIO(source)) as im:
+        rgba = im.convert("RGBA")
+    reference = np.asarray(rgba)
+    opaque = bool((reference[..., 3] == 255).all())
+    base = rgba.convert("RGB") if opaque else rgba
+
+    candidates = [("lossless-rgb" if opaque else "lossless-rgba", _encode(base))]
+    for n in colors:
+        candidates.append((f"palette-{n}", _encode(_quantize(base, n))))
+
+    best = None
+    tried = []
+    for name, data in sorted(candidates, key=lambda c: len(c[1])):
+        with Image.open(io.BytesIO(data)) as decoded:
+            score = rgba_ssim(reference, np.asarray(decoded.convert("RGBA")))
+        tried.append({"encoding": name, "bytes": len(data), "ssim": round(score, 5)})
+        if score >= threshold:
+            best = (name, data, score)
+            break  # candidates are sorted by size, so the first that passes is the smallest
+
+    result = {
+        "file": str(path),
+        "original_bytes": len(source),
+        "bytes": len(source),
+        "encoding": "original",
+        "ssim": 1.0,
+        "tried": tried,
+    }
+    target = source
+    if best and len(best[1]) < len(source):
+        result.update(encoding=best[0], bytes=len(best[1]), ssim=round(best[2], 5))
+        target = best[1]
+    if not dry_run and target != current:
+        if target is not source:
+            ORIGINALS_DIR.mkdir(parents=True, exist_ok=True)
+            _write_atomic(ORIGINALS_DIR / f"{hashlib.sha256(target).hexdigest()}.png", source)
+        # An older kept original is left in place: identical files share it
+        _write_atomic(path, target)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Shrink PNGs with SSIM-gated palette quantization.")
+    parser.add_argument("folders", nargs="*", type=Path, default=DEFAULT_FOLDERS)
+    parser.add_argument("--threshold", type=float, default=SSIM_THRESHOLD, help="Minimum SSIM to accept")
+    parser.add_argument("--colors", default=",".join(map(str, PALETTE_COLORS)), help="Palette sizes to try")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--dry-run", action="store_true", help="Report only, do not rewrite files")
+    parser.add_argument("--force", action="store_true", help="Re-examine files already optimized")
+    parser.add_argument("--report", type=Path, default=DEFAULT_REPORT)
+    args = parser.parse_args()
+
+    colors = tuple(int(c) for c in args.colors.split(",") if c.strip())
+    pngs = sorted({p.resolve() for folder in args.folders for p in folder.rglob("*.png")})
+    cache = DerivativeCache()
+    params = {"transform": "optimize_png", "threshold": args.threshold, "colors": colors}
+
+    pending = []
+    for png in pngs:
+        # Key on the file's current bytes: once rewritten, it is its own (fresh) output
+        if not args.force and cache.is_fresh(png, cache.key([png], params)):
+            continue
+        pending.append(png)
+    print(f"Optimizing {len(pending)} of {len(pngs)} PNG(s) (threshold SSIM {args.threshold})")
+
+    results = []
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = {pool.submit(optimize_png, p, args.threshold, colors, args.dry_run): p for p in pending}
+        for future in as_completed(futures):
+            png = futures[future]
+            try:
+                r = future.result()
+            except Exception as e:
+                print(f"  Skip {png.name}: {e}")
+                continue
+            results.append(r)
+            if not args.dry_run:
+                cache.record(png, cache.key([png], params))
+            saved = r["original_bytes"] - r["bytes"]
+            print(f"  {png.name}: {r['encoding']} {r['original_bytes'] / 1024:.0f} KB -> "
+                  f"{r['bytes'] / 1024:.0f} KB (-{saved / 1024:.0f} KB, SSIM {r['ssim']})")
+    cache.save()
+
+    if not results:
+        # Keep the last run's report rather than replacing it with an empty one
+        print(f"Nothing optimized; {args.report} left as it was")
+        return
+    before = sum(r["original_bytes"] for r in results)
+    after = sum(r["bytes"] for r in results)
+    results.sort(key=lambda r: r["file"])
+    args.report.parent.mkdir(parents=True, exist_ok=True)
+    args.report.write_text(
+        json.dumps({"threshold": args.threshold, "colors": colors, "files": results}, indent=2),
+        encoding="utf-8",
+    )
+    print(f"\nTotal: {before / 1e6:.2f} MB -> {after / 1e6:.2f} MB "
+          f"({(before - after) / 1e6:.2f} MB saved{', dry run' if args.dry_run else ''})")
+    print(f"Report written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Pack small images (icons, chat avatars) into sprite atlases with a MaxRects packer.
+
+Images can first be downscaled so their longest edge is at most --max-edge
+(their display size x device density), then packed into one or more atlas
+textures no larger than --atlas-size. Next to each atlas PNG a JSON map is
+written:
+
+  {"image": "icons_0.png", "size": [w, h], "fill": 0.83,
+   "frames": {"assets/Icons/video_icon_resized.png": {"x": 0, "y": 0, "w": 48, "h": 48}, ...}}
+
+The packer is MaxRects with the best-short-side-fit heuristic: free space is
+kept as a list of maximal rectangles, and each placement splits every free
+rectangle it overlaps and prunes the ones contained in others. Images are
+placed largest first; a set that fits on one page gets the smallest page that
+holds it.
+
+Usage:
+  python scripts/pack_atlas.py --preset icons
+  python scripts/pack_atlas.py --preset avatars
+  python scripts/pack_atlas.py img1.png img2.png ... --name custom [--max-edge 150] [--atlas-size 2048]
+
+Requires: pip install Pillow
+"""
+
+import argparse
+import json
+import math
+from pathlib import Path
+
+from PIL import Image
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+DEFAULT_OUT = PROJECT_ROOT / "build" / "atlases"
+DEFAULT_ATLAS_SIZE = 2048
+DEFAULT_PADDING = 2
+
+# Named image sets. max_edge is the display size at 3x (None keeps source size).
+PRESETS = {
+    # Small UI icons; the 1024px launcher icon.png is not a sprite
+    "icons": {
+        "files": [
+            "assets/Icons/No_Cat_Image.png",
+            "assets/Icons/favorited_icon_resized.png",
+            "assets/Icons/small_youtube_icon.png",
+            "assets/Icons/video_icon_resized.png",
+        ],
+        "max_edge": None,
+    },
+    # chatList.dart conversation avatars, drawn at 50pt
+    "avatars": {
+        "files": [
+            "assets/Cartoon/Abyssinian.png",
+            "assets/Cartoon/Balinese.png",
+            "assets/Cartoon/Bombay.png",
+            "assets/Cartoon/American_Curl.png",
+            "assets/Cartoon/Devon_Rex.png",
+        ],
+        "max_edge": 150,
+    },
+}
+
+
+class MaxRectsBin:
+    """One atlas page. insert() returns (x, y) or None if the rectangle does not fit."""
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.free = [(0, 0, width, height)]
+        self.used_area = 0
+
+    def _find(self, w, h):
+        best = None
+        best_key = None
+        for fx, fy, fw, fh in self.free:
+            if w <= fw and h <= fh:
+                short, long_ = sorted((fw - w, fh - h))
+                key = (short, long_)
+                if best_key is None or key < best_key:
+                    best, best_key = (fx, fy), key
+        return best
+
+    def insert(self, w: int, h: int):
+        pos = self._find(w, h)
+        if pos is None:
+            return None
+        self._place(pos[0], pos[1], w, h)
+        self.used_area += w * h
+        return pos
+
+    def _place(self, x, y, w, h):
+        kept = []
+        split = []
+        for fx, fy, fw, fh in self.free:
+            # No overlap: keep as is
+            if x >= fx + fw or x + w <= fx or y >= fy + fh or y + h <= fy:
+                kept.append((fx, fy, fw, fh))
+                continue
+            # Split into up to four maximal rectangles around the placed one
+            if x > fx:
+                split.append((fx, fy, x - fx, fh))
+            if x + w < fx + fw:
+                split.append((x + w, fy, fx + fw - (x + w), fh))
+            if y > fy:
+                split.append((fx, fy, fw, y - fy))
+            if y + h < fy + fh:
+                split.append((fx, y + h, fw, fy + fh - (y + h)))
+        self.free = _prune(kept, split)
+
+
+def _contains(a, b):
+    return b[0] >= a[0] and b[1] >= a[1] and b[0] + b[2] <= a[0] + a[2] and b[1] + b[3] <= a[1] + a[3]
+
+
+def _prune(kept, split):
+    """
+    Drop free rectangles fully contained in another one. Rectangles the placement
+    did not touch were already maximal among themselves, so only pairs involving
+    a newly split rectangle need checking.
+    """
+    split = sorted(set(split), key=lambda r: r[2] * r[3], reverse=True)
+    fresh = []
+    for r in split:
+        if not any(_contains(k, r) for k in kept) and not any(_contains(f, r) for f in fresh):
+            fresh.append(r)
+    kept = [k for k in kept if not any(_contains(f, k) for f in fresh)]
+    return kept + fresh
+
+
+def pack(sizes, atlas_size=DEFAULT_ATLAS_SIZE, padding=DEFAULT_PADDING):
+    """
+    Pack {key: (w, h)} into as many atlas pages as needed.
+    Returns (placements, bins) where placements maps key -> (page, x, y).
+
+    When everything fits on one page, power-of-two page sizes from the smallest
+    that could hold it up to atlas_size are all tried and the packing with the
+    smallest trimmed area wins, so small sets are not spread across a mostly
+    empty 2048px page.
+    """
+    best = _pack(sizes, atlas_size, padding)
+    if len(best[1]) != 1:
+        return best
+    best_area = _trimmed_area(sizes, best[0])
+    area = sum((w + padding) * (h + padding) for w, h in sizes.values())
+    side = 1 << max(0, math.ceil(math.log2(max(1, math.isqrt(area)))))
+    while side < atlas_size:
+        try:
+            candidate = _pack(sizes, side, padding)
+        except ValueError:
+            candidate = None
+        if candidate and len(candidate[1]) == 1:
+            trimmed = _trimmed_area(sizes, candidate[0])
+            if trimmed < best_area:
+                best, best_area = candidate, trimmed
+        side *= 2
+    return best
+
+
+def _trimmed_area(sizes, placements):
+    width = max(x + sizes[k][0] for k, (_, x, _) in placements.items())
+    height = max(y + sizes[k][1] for k, (_, _, y) in placements.items())
+    return width * height
+
+
+def _pack(sizes, atlas_size, padding):
+    placements = {}
+    bins = []
+    order = sorted(sizes, key=lambda k: (max(sizes[k]), sizes[k][0] * sizes[k][1]), reverse=True)
+    for key in order:
+        w, h = sizes[key]
+        pw, ph = w + padding, h + padding
+        if pw > atlas_size or ph > atlas_size:
+            raise ValueError(f"{key} ({w}x{h}) does not fit in a {atlas_size}px atlas")
+        for page, b in enumerate(bins):
+            pos = b.insert(pw, ph)
+            if pos:
+                break
+        else:
+            bins.append(MaxRectsBin(atlas_size, atlas_size))
+            page = len(bins) - 1
+            pos = bins[page].insert(pw, ph)
+        placements[key] = (page, pos[0], pos[1])
+    return placements, bins
+
+
+def _load(path: Path, max_edge):
+    img = Image.open(path).convert("RGBA")
+    if max_edge and max(img.size) > max_edge:
+        scale = max_edge / max(img.size)
+        img = img.resize((max(1, round(img.width * scale)), max(1, round(img.height * scale))),
+                         Image.Resampling.LANCZOS)
+    return img
+
+
+def build_atlases(files, name, out_dir=DEFAULT_OUT, max_edge=None, atlas_size=DEFAULT_ATLAS_SIZE,
+                  padding=DEFAULT_PADDING):
+    """Pack `files` into atlas PNG + JSON pairs in out_dir. Returns the JSON maps."""
+    images = {}
+    for f in dict.fromkeys(Path(f) for f in files):
+        path = f if f.is_absolute() else PROJECT_ROOT / f
+        try:
+            key = path.resolve().relative_to(PROJECT_ROOT).as_posix()
+        except ValueError:
+            key = path.as_posix()
+        images[key] = _load(path, max_edge)
+
+    placements, bins = pack({k: im.size for k, im in images.items()}, atlas_size, padding)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    maps = []
+    for page, b in enumerate(bins):
+        frames = {k: v for k, v in placements.items() if v[0] == page}
+        # Trim the page to the used area
+        width = max(x + images[k].width for k, (_, x, _) in frames.items())
+        height = max(y + images[k].height for k, (_, _, y) in frames.items())
+        atlas = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+        for k, (_, x, y) in frames.items():
+            atlas.paste(images[k], (x, y))
+        image_name = f"{name}_{page}.png"
+        atlas.save(out_dir / image_name, "PNG", optimize=True)
+        content = sum(images[k].width * images[k].height for k in frames)
+        atlas_map = {
+            "image": image_name,
+            "size": [width, height],
+            "fill": round(content / (width * height), 4),
+            "frames": {
+                k: {"x": x, "y": y, "w": images[k].width, "h": images[k].height}
+                for k, (_, x, y) in sorted(frames.items())
+            },
+        }
+        (out_dir / f"{name}_{page}.json").write_text(json.dumps(atlas_map, indent=2), encoding="utf-8")
+        maps.append(atlas_map)
+    return maps
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pack images into sprite atlases with JSON maps.")
+    parser.add_argument("files", nargs="*", type=Path, help="Images to pack (instead of --preset)")
+    parser.add_argument("--preset", choices=sorted(PRESETS), help="Named image set")
+    parser.add_argument("--name", help="Atlas base name (default: preset name)")
+    parser.add_argument("--max-edge", type=int, default=None, help="Downscale so the longest edge is at most this")
+    parser.add_argument("--atlas-size", type=int, default=DEFAULT_ATLAS_SIZE)
+    parser.add_argument("--padding", type=int, default=DEFAULT_PADDING)
+    parser.add_argument("--out", type=Path, default=DEFAULT_OUT)
+    args = parser.parse_args()
+
+    if args.preset:
+        preset = PRESETS[args.preset]
+        files = preset["files"] + list(args.files)
+        max_edge = args.max_edge or preset["max_edge"]
+        name = args.name or args.preset
+    elif args.files:
+        files, max_edge, name = args.files, args.max_edge, args.name or "atlas"
+    else:
+        parser.error("give image files or --preset")
+
+    for m in build_atlases(files, name, args.out, max_edge, args.atlas_size, args.padding):
+        print(f"Wrote {args.out / m['image']} ({m['size'][0]}x{m['size'][1]}, "
+              f"{len(m['frames'])} images, fill {m['fill']:.0%})")
+
+
+if __name__ == "__main__":
+    main()
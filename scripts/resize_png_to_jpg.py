@@ -2,31 +2,94 @@
 """
 Resize all PNG images in a folder to 512 × 374 and save as JPG.
 
+Files are converted in parallel across a process pool. A PNG is skipped when
+its JPG already exists and neither the PNG bytes nor the resize settings
+changed since it was built (tracked in the shared derivative cache, see
+derivative_cache.py).
+
 Usage:
-  python scripts/resize_png_to_jpg.py [input_folder] [output_folder]
+  python scripts/resize_png_to_jpg.py [input_folder] [output_folder] [--jobs N] [--force]
 
   input_folder  Directory containing .png files (default: assets/cat_types).
   output_folder Where to write .jpg files (default: same as input_folder).
+  --jobs N      Worker processes (default: CPU count).
+  --force       Re-encode every PNG even if its JPG is up to date.
+  --timing [PATH], --profile
+                Log per-stage timings and summarize them (see stage_timing.py).
 
 Example:
   python scripts/resize_png_to_jpg.py ./my_images
-  python scripts/resize_png_to_jpg.py ./source_pngs ./output_jpgs
+  python scripts/resize_png_to_jpg.py ./source_pngs ./output_jpgs --jobs 4
 """
 
+import argparse
+import io
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
 from PIL import Image
 
+import stage_timing
+from derivative_cache import DerivativeCache
+from stage_timing import stage
+
 # Project root (parent of scripts/)
 SCRIPT_DIR = Path(__file__).resolve().parent
 PROJECT_ROOT = SCRIPT_DIR.parent
 
 TARGET_SIZE = (512, 374)
 JPG_QUALITY = 90
+# Derivative cache parameters for every JPG this script writes
+CACHE_PARAMS = {"transform": "resize_png_to_jpg", "target_size": TARGET_SIZE, "quality": JPG_QUALITY}
+
+
+def normalize_mode(im: Image.Image) -> Image.Image:
+    """RGB or RGBA version of `im` (palette images keep their transparency)."""
+    if im.mode == "P":
+        return im.convert("RGBA")
+    if im.mode not in ("RGB", "RGBA"):
+        return im.convert("RGB")
+    return im
+
+
+def flatten_onto_white(im: Image.Image) -> Image.Image:
+    """Composite an RGBA image onto white; RGB images are returned unchanged."""
+    if im.mode != "RGBA":
+        return im
+    background = Image.new("RGB", im.size, (255, 255, 255))
+    background.paste(im, mask=im.split()[-1])
+    return background
+
+
+def load_png(png_path: Path) -> Image.Image:
+    """Decode a PNG fully into memory as RGB or RGBA."""
+    with stage("decode", png_path.name), Image.open(png_path) as im:
+        im = normalize_mode(im)
+        im.load()
+    return im
 
 
-def resize_png_to_jpg(input_dir: Path, output_dir: Path) -> None:
+def convert_image(im: Image.Image, jpg_path: Path, target_size=TARGET_SIZE, quality=JPG_QUALITY) -> None:
+    """Downscale a decoded RGB/RGBA image and save it as JPG."""
+    # Resize first (Pillow resamples RGBA with premultiplied alpha),
+    # then composite onto white at the small size
+    with stage("resize", jpg_path.name):
+        im = im.resize(target_size, Image.Resampling.LANCZOS)
+    with stage("encode", jpg_path.name) as ev:
+        buf = io.BytesIO()
+        flatten_onto_white(im).save(buf, "JPEG", quality=quality, optimize=True)
+        ev["bytes"] = buf.tell()
+    with stage("write", jpg_path.name) as ev:
+        ev["bytes"] = jpg_path.write_bytes(buf.getbuffer())
+
+
+def _convert_one(png_path: Path, jpg_path: Path, target_size, quality) -> None:
+    """Downscale one PNG and save it as JPG. Runs in a worker process."""
+    convert_image(load_png(png_path), jpg_path, target_size, quality)
+
+
+def resize_png_to_jpg(input_dir: Path, output_dir: Path, jobs=None, force: bool = False) -> None:
     input_dir = input_dir.resolve()
     output_dir = output_dir.resolve()
     if not input_dir.is_dir():
@@ -39,40 +102,56 @@ def resize_png_to_jpg(input_dir: Path, output_dir: Path) -> None:
         print(f"No .png files found in {input_dir}")
         return
 
-    print(f"Resizing {len(pngs)} PNG(s) to {TARGET_SIZE[0]}×{TARGET_SIZE[1]} JPG in {output_dir}")
+    cache = DerivativeCache()
+    pending = []
+    up_to_date = 0
     for png_path in pngs:
-        jpg_name = png_path.stem + ".jpg"
-        jpg_path = output_dir / jpg_name
-        try:
-            with Image.open(png_path) as im:
-                # Handle RGBA: paste onto white background before converting to RGB
-                if im.mode in ("RGBA", "P"):
-                    background = Image.new("RGB", im.size, (255, 255, 255))
-                    if im.mode == "P":
-                        im = im.convert("RGBA")
-                    background.paste(im, mask=im.split()[-1] if im.mode == "RGBA" else None)
-                    im = background
-                elif im.mode != "RGB":
-                    im = im.convert("RGB")
-                im = im.resize(TARGET_SIZE, Image.Resampling.LANCZOS)
-                im.save(jpg_path, "JPEG", quality=JPG_QUALITY, optimize=True)
-            print(f"  {png_path.name} -> {jpg_path.name}")
-        except Exception as e:
-            print(f"  Skip {png_path.name}: {e}")
+        jpg_path = output_dir / (png_path.stem + ".jpg")
+        key = cache.key([png_path], CACHE_PARAMS)
+        if not force and cache.is_fresh(jpg_path, key):
+            up_to_date += 1
+            continue
+        pending.append((png_path, jpg_path, key))
+
+    print(
+        f"Resizing {len(pending)} of {len(pngs)} PNG(s) to {TARGET_SIZE[0]}×{TARGET_SIZE[1]} JPG "
+        f"in {output_dir} ({up_to_date} up to date)"
+    )
+    if not pending:
+        cache.save()
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {
+            pool.submit(_convert_one, png_path, jpg_path, TARGET_SIZE, JPG_QUALITY): (png_path, jpg_path, key)
+            for png_path, jpg_path, key in pending
+        }
+        for future in as_completed(futures):
+            png_path, jpg_path, key = futures[future]
+            try:
+                future.result()
+                cache.record(jpg_path, key)
+                print(f"  {png_path.name} -> {jpg_path.name}")
+            except Exception as e:
+                cache.forget(jpg_path)
+                print(f"  Skip {png_path.name}: {e}")
+
+    cache.save()
 
 
 def main() -> None:
-    if len(sys.argv) > 2:
-        input_folder = Path(sys.argv[1])
-        output_folder = Path(sys.argv[2])
-    elif len(sys.argv) > 1:
-        input_folder = Path(sys.argv[1])
-        output_folder = input_folder
-    else:
-        input_folder = PROJECT_ROOT / "assets" / "cat_types"
-        output_folder = input_folder
-
-    resize_png_to_jpg(input_folder, output_folder)
+    parser = argparse.ArgumentParser(description="Resize PNGs to 512x374 JPGs.")
+    parser.add_argument("input_folder", nargs="?", type=Path, default=PROJECT_ROOT / "assets" / "cat_types")
+    parser.add_argument("output_folder", nargs="?", type=Path, default=None)
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Re-encode even if outputs are up to date")
+    stage_timing.add_arguments(parser)
+    args = parser.parse_args()
+    stage_timing.configure_from_args(args, "resize")
+
+    output_folder = args.output_folder or args.input_folder
+    resize_png_to_jpg(args.input_folder, output_folder, jobs=args.jobs, force=args.force)
+    stage_timing.report()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Per-stage timing for the asset scripts: API call, download, decode, resize, encode, write.
+
+Code wraps each stage of each item:
+
+  with stage("resize", item=png.name):
+      im = im.resize(...)
+  with stage("write", item=png.name) as ev:
+      path.write_bytes(data)
+      ev["bytes"] = len(data)
+
+Timing is off unless a script enables it (--timing [PATH]); stage() then
+costs one environment lookup. When on, every stage appends one JSON line
+
+  {"run": "splash-20260101T120000-4242", "stage": "resize", "item": "LaunchImage@2x.png",
+   "seconds": 0.0123, "ok": true, "pid": 4242, "bytes": 123456}
+
+to the log. The settings live in environment variables, so worker processes
+started afterwards (process pools) log to the same file, and a line is one
+O_APPEND write, so lines from different processes do not interleave. At the
+end, report() prints count, p50, p95, max and total per stage for this run,
+plus MB/s for stages that recorded bytes.
+
+--profile also runs the CPU stages (decode, key, resize, encode) under
+cProfile. Each call is dumped to its own file, and report() merges them per
+stage and prints the top functions.
+
+Usage (from another script):
+  stage_timing.add_arguments(parser)
+  args = parser.parse_args()
+  stage_timing.configure_from_args(args, "splash")
+  ...
+  stage_timing.report()
+
+  python scripts/stage_timing.py build/timing/splash.jsonl [--run RUN]   Summarize a log.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+TIMING_DIR = PROJECT_ROOT / "build" / "timing"
+
+ENV_LOG = "ASSET_TIMING_LOG"
+ENV_RUN = "ASSET_TIMING_RUN"
+ENV_PROFILE = "ASSET_TIMING_PROFILE"
+
+# Stages run under cProfile with --profile
+CPU_STAGES = frozenset({"decode", "key", "resize", "encode"})
+
+_profile_seq = itertools.count()
+
+
+def add_arguments(parser) -> None:
+    """Add --timing [PATH] and --profile to a script's argument parser."""
+    parser.add_argument("--timing", nargs="?", const="", default=None, metavar="PATH",
+                        help="Log per-stage timings as JSONL (default build/timing/<script>.jsonl) and summarize")
+    parser.add_argument("--profile", action="store_true", help="With --timing: cProfile the CPU stages")
+
+
+def configure(script: str, log_path=None, profile: bool = False) -> str:
+    """Turn timing on for this process and any started after it. Returns the run id."""
+    log_path = Path(log_path) if log_path else TIMING_DIR / f"{script}.jsonl"
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    run = f"{script}-{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+    os.environ[ENV_LOG] = str(log_path.resolve())
+    os.environ[ENV_RUN] = run
+    if profile:
+        profile_dir = TIMING_DIR / "profiles" / run
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        os.environ[ENV_PROFILE] = str(profile_dir)
+    else:
+        os.environ.pop(ENV_PROFILE, None)
+    return run
+
+
+def configure_from_args(args, script: str):
+    """configure() from add_arguments() options. Returns the run id, or None if timing is off."""
+    if args.timing is None and not args.profile:
+        return None
+    return configure(script, args.timing or None, args.profile)
+
+
+def record(name: str, seconds: float, item=None, ok: bool = True, **fields) -> None:
+    """Append one event for a stage timed by the caller."""
+    log = os.environ.get(ENV_LOG)
+    if not log:
+        return
+    event = {
+        "run": os.environ.get(ENV_RUN),
+        "stage": name,
+        "item": None if item is None else str(item),
+        "seconds": round(seconds, 6),
+        "ok": ok,
+        "pid": os.getpid(),
+        **fields,
+    }
+    line = (json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8")
+    fd = os.open(log, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def stage(name: str, item=None):
+    """
+    Time the with-block as one stage of one item. Yields a dict; keys set on it
+    (e.g. "bytes") are added to the event. A raised exception is logged with
+    ok=false and re-raised.
+    """
+    if ENV_LOG not in os.environ:
+        yield {}
+        return
+    fields = {}
+    profile_dir = os.environ.get(ENV_PROFILE) if name in CPU_STAGES else None
+    profiler = None
+    if profile_dir:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:  # 3.12+: another thread is already profiling
+            profiler = None
+    ok = True
+    start = time.perf_counter()
+    try:
+        yield fields
+    except BaseException:
+        ok = False
+        raise
+    finally:
+        if profiler:
+            profiler.disable()
+        elapsed = time.perf_counter() - start
+        if profiler:
+            profiler.dump_stats(os.path.join(profile_dir, f"{name}-{os.getpid()}-{next(_profile_seq)}.prof"))
+        record(name, elapsed, item, ok, **fields)
+
+
+def _percentile(sorted_values, q):
+    """Nearest-rank percentile of an ascending list."""
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def load_events(log_path, run=None):
+    """Events in a JSONL log, for one run (default: the last run in the file)."""
+    events = []
+    with open(log_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue
+    if run is None and events:
+        run = events[-1].get("run")
+    return [e for e in events if e.get("run") == run]
+
+
+def summarize(events):
+    """{stage: {count, failed, p50, p95, max, total, bytes}} in first-seen stage order."""
+    by_stage = {}
+    for e in events:
+        by_stage.setdefault(e["stage"], []).append(e)
+    summary = {}
+    for name, evs in by_stage.items():
+        secs = sorted(e["seconds"] for e in evs)
+        summary[name] = {
+            "count": len(evs),
+            "failed": sum(not e.get("ok", True) for e in evs),
+            "p50": _percentile(secs, 50),
+            "p95": _percentile(secs, 95),
+            "max": secs[-1],
+            "total": sum(secs),
+            "bytes": sum(e.get("bytes", 0) for e in evs),
+        }
+    return summary
+
+
+def print_summary(summary, title="Stage timings") -> None:
+    print(f"\n{title}")
+    print(f"{'stage':<12} {'count':>6} {'failed':>6} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'total s':>8} {'MB/s':>8}")
+    for name, s in summary.items():
+        rate = f"{s['bytes'] / 1e6 / s['total']:.1f}" if s["bytes"] and s["total"] else "-"
+        print(f"{name:<12} {s['count']:>6} {s['failed']:>6} {s['p50'] * 1000:>9.1f} {s['p95'] * 1000:>9.1f} "
+              f"{s['max'] * 1000:>9.1f} {s['total']:>8.2f} {rate:>8}")
+
+
+def _print_profiles(profile_dir: Path, top: int = 8) -> None:
+    import pstats
+
+    files = sorted(profile_dir.glob("*.prof"))
+    stages = sorted({f.name.split("-")[0] for f in files})
+    for name in stages:
+        stats = pstats.Stats(*(str(f) for f in files if f.name.split("-")[0] == name))
+        stats.dump_stats(str(profile_dir / f"{name}.merged.prof"))
+        print(f"\ncProfile: {name} (top {top} by cumulative time)")
+        stats.sort_stats("cumulative").print_stats(top)
+
+
+def report() -> None:
+    """Print the summary for the current run (and merged profiles with --profile)."""
+    log = os.environ.get(ENV_LOG)
+    if not log or not os.path.exists(log):
+        return
+    summary = summarize(load_events(log, os.environ.get(ENV_RUN)))
+    if summary:
+        print_summary(summary, f"Stage timings ({os.environ.get(ENV_RUN)}, log {log})")
+    profile_dir = os.environ.get(ENV_PROFILE)
+    if profile_dir:
+        _print_profiles(Path(profile_dir))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Summarize a stage timing JSONL log.")
+    parser.add_argument("log", type=Path)
+    parser.add_argument("--run", default=None, help="Run id (default: the last run in the log)")
+    args = parser.parse_args()
+    events = load_events(args.log, args.run)
+    if not events:
+        raise SystemExit(f"No events in {args.log}")
+    print_summary(summarize(events), f"Stage timings ({events[0]['run']})")
+
+
+if __name__ == "__main__":
+    main()
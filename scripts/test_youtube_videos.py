@@ -2,14 +2,35 @@
 """
 Test script to verify all YouTube videos in breed.dart exist and are playable.
 Checks both youTubeURL (video ID) and cats101URL (full URL).
+
+Videos are checked concurrently over one pooled connection (see youtube_async.py);
+an ID used by both fields is only checked once. Successful results are cached
+(see video_cache.py) and reused until they are older than --ttl-hours; failures
+are always re-checked.
+
+Usage:
+  python scripts/test_youtube_videos.py [--concurrency N] [--ttl-hours H] [--no-cache]
+                                        [--oembed-url URL] [--watch-url URL] [--timing [PATH]]
+
+--timing logs each oEmbed / watch-page request (time, bytes, status) as JSONL
+and prints p50/p95/max per stage at the end (see stage_timing.py).
 """
 
-import re
-import requests
+import argparse
 import sys
 from pathlib import Path
 from urllib.parse import urlparse, parse_qs
 
+import stage_timing
+from youtube_async import (
+    DEFAULT_CONCURRENCY,
+    OEMBED_URL,
+    WATCH_URL,
+    check_videos,
+)
+from breed_parser import load_breeds
+from video_cache import DEFAULT_DB, DEFAULT_TTL_HOURS, VideoCheckCache
+
 def extract_video_id(url):
     """Extract YouTube video ID from various URL formats"""
     if not url or url.strip() == '':
@@ -37,91 +58,25 @@ def check_video_exists(video_id):
     """Check if a YouTube video exists and is playable"""
     if not video_id:
         return False, "No video ID provided"
-    
-    # Method 1: Check oembed API (most reliable)
-    video_url = f"https://www.youtube.com/watch?v={video_id}"
-    oembed_url = f"https://www.youtube.com/oembed?url={video_url}&format=json"
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-        'Accept': 'application/json',
-    }
-    
-    try:
-        response = requests.get(oembed_url, headers=headers, timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            if 'title' in data:
-                return True, f"✓ Playable - {data.get('title', 'Unknown title')[:60]}"
-            return True, "✓ Playable"
-        elif response.status_code == 404:
-            return False, "✗ Video not found (404)"
-        elif response.status_code == 403:
-            # Try alternative method - check video page directly
-            return check_video_alternative(video_id)
-        else:
-            return False, f"✗ Error: HTTP {response.status_code}"
-    except requests.exceptions.RequestException as e:
-        # Try alternative method on network error
-        return check_video_alternative(video_id)
-
-def check_video_alternative(video_id):
-    """Alternative method: Check video page directly"""
-    video_url = f"https://www.youtube.com/watch?v={video_id}"
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-    }
-    
-    try:
-        response = requests.get(video_url, headers=headers, timeout=10, allow_redirects=True)
-        if response.status_code == 200:
-            # Check if page contains video unavailable message
-            if 'Video unavailable' in response.text or 'This video is not available' in response.text:
-                return False, "✗ Video unavailable"
-            elif 'og:title' in response.text or 'watch-title' in response.text:
-                return True, "✓ Playable (verified via page check)"
-            else:
-                return True, "✓ Likely playable (page accessible)"
-        elif response.status_code == 404:
-            return False, "✗ Video not found (404)"
-        else:
-            return False, f"✗ Error: HTTP {response.status_code}"
-    except requests.exceptions.RequestException as e:
-        return False, f"✗ Network error: {str(e)}"
+    return check_videos([video_id])[video_id]
 
 def parse_breed_dart_file(file_path):
-    """Parse breed.dart and extract YouTube video information"""
-    breeds = []
-    
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Pattern to match Breed constructor
-    # Breed(id, name, sortOrder, htmlUrl, pictureHeadShotName, crossRefBreedID, 
-    #       fullSizedPicture, youTubeURL, cats101URL, playListID, ...)
-    pattern = r"Breed\(\s*(\d+),\s*'([^']+)',\s*[^,]+,\s*[^,]+,\s*[^,]+,\s*\d+,\s*'([^']+)',\s*'([^']+)',\s*'([^']+)',\s*'([^']+)',"
-    
-    matches = re.finditer(pattern, content, re.MULTILINE)
-    
-    for match in matches:
-        breed_id = int(match.group(1))
-        name = match.group(2)
-        full_sized = match.group(3)
-        youtube_url = match.group(4)  # youTubeURL (video ID)
-        cats101_url = match.group(5)  # cats101URL (full URL)
-        playlist_id = match.group(6)  # playListID
-        
-        breeds.append({
-            'id': breed_id,
-            'name': name,
-            'youTubeURL': youtube_url,
-            'cats101URL': cats101_url,
-            'playListID': playlist_id,
-        })
-    
-    return breeds
+    """Parse breed.dart and extract YouTube video information (via the shared parser)"""
+    return load_breeds(file_path)
 
 def main():
+    parser = argparse.ArgumentParser(description="Verify the YouTube videos referenced in breed.dart.")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help="Videos checked at once")
+    parser.add_argument('--oembed-url', default=OEMBED_URL, help="oEmbed endpoint (for a local stand-in)")
+    parser.add_argument('--watch-url', default=WATCH_URL, help="Watch page endpoint (for a local stand-in)")
+    parser.add_argument('--ttl-hours', type=float, default=DEFAULT_TTL_HOURS,
+                        help="Re-check successful results older than this")
+    parser.add_argument('--cache-db', type=Path, default=DEFAULT_DB, help="Result store location")
+    parser.add_argument('--no-cache', action='store_true', help="Check every video over the network")
+    stage_timing.add_arguments(parser)
+    args = parser.parse_args()
+    stage_timing.configure_from_args(args, "validate_videos")
+
     breed_file = Path(__file__).parent.parent / 'lib' / 'models' / 'breed.dart'
     
     if not breed_file.exists():
@@ -132,6 +87,25 @@ def main():
     breeds = parse_breed_dart_file(breed_file)
     print(f"Found {len(breeds)} breeds\n")
     
+    video_ids = []
+    for breed in breeds:
+        video_ids.append(breed['youTubeURL'])
+        video_ids.append(extract_video_id(breed['cats101URL']))
+    unique_ids = {v for v in video_ids if v}
+
+    cache = None if args.no_cache else VideoCheckCache(args.cache_db)
+    checks = cache.fresh(unique_ids, args.ttl_hours) if cache else {}
+    stale_ids = [v for v in unique_ids if v not in checks]
+    print(f"Checking {len(stale_ids)} of {len(unique_ids)} unique videos "
+          f"({len(checks)} cached, {args.concurrency} at a time)...")
+    if stale_ids:
+        fresh_results = check_videos(stale_ids, args.concurrency, args.oembed_url, args.watch_url)
+        checks.update(fresh_results)
+        if cache:
+            cache.store(fresh_results)
+    if cache:
+        cache.close()
+
     print("=" * 80)
     print("Testing YouTube Videos")
     print("=" * 80)
@@ -152,7 +126,7 @@ def main():
         # Check youTubeURL (video ID)
         video_id_from_url = breed['youTubeURL']
         if video_id_from_url:
-            exists, message = check_video_exists(video_id_from_url)
+            exists, message = checks[video_id_from_url]
             print(f"  youTubeURL check: {message}")
             if exists:
                 results['valid'] += 1
@@ -171,7 +145,7 @@ def main():
         # Check cats101URL (full URL)
         video_id_from_cats101 = extract_video_id(breed['cats101URL'])
         if video_id_from_cats101:
-            exists, message = check_video_exists(video_id_from_cats101)
+            exists, message = checks[video_id_from_cats101]
             print(f"  cats101URL check: {message}")
             if not exists:
                 results['errors'].append({
@@ -208,6 +182,7 @@ def main():
             print(f"\n{error['breed']} ({error['field']})")
             print(f"  Value: {error['value']}")
             print(f"  Error: {error['error']}")
+    stage_timing.report()
     
     # Exit code
     if results['invalid'] > 0 or results['missing'] > 0:
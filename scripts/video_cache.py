@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Persistent store of YouTube check results for test_youtube_videos.py.
+
+Results (status, title, message, check time) are kept per video ID in a small
+SQLite database (.asset_cache/youtube_checks.sqlite by default). A cached
+result is reused while it is younger than the TTL; failed checks are never
+reused, so a broken video is re-checked on every run until it is fixed, and a
+video that gets pulled is caught once its last success expires.
+
+Usage:
+  python scripts/video_cache.py [--db PATH] [--clear]   Show (or clear) the store.
+"""
+
+import argparse
+import sqlite3
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+DEFAULT_DB = PROJECT_ROOT / ".asset_cache" / "youtube_checks.sqlite"
+DEFAULT_TTL_HOURS = 24 * 7
+
+_PLAYABLE_PREFIX = "✓ Playable - "
+
+
+def _title_from_message(message):
+    """oEmbed successes carry the (truncated) title in their message."""
+    if message.startswith(_PLAYABLE_PREFIX):
+        return message[len(_PLAYABLE_PREFIX):]
+    return None
+
+
+class VideoCheckCache:
+    """SQLite-backed map of video_id -> (exists, message) with check times."""
+
+    def __init__(self, db_path: Path = DEFAULT_DB):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS video_checks (
+                video_id   TEXT PRIMARY KEY,
+                ok         INTEGER NOT NULL,
+                title      TEXT,
+                message    TEXT NOT NULL,
+                checked_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def fresh(self, video_ids, ttl_hours=DEFAULT_TTL_HOURS, now=None):
+        """Return {video_id: (exists, message)} for successful results younger than the TTL."""
+        ids = list({v for v in video_ids if v})
+        if not ids:
+            return {}
+        cutoff = (now or time.time()) - ttl_hours * 3600
+        found = {}
+        # Stay under SQLite's bound-parameter limit
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            rows = self._conn.execute(
+                f"SELECT video_id, message FROM video_checks "
+                f"WHERE ok = 1 AND checked_at >= ? AND video_id IN ({','.join('?' * len(chunk))})",
+                [cutoff, *chunk],
+            )
+            for video_id, message in rows:
+                found[video_id] = (True, message)
+        return found
+
+    def store(self, results, now=None):
+        """Record {video_id: (exists, message)} results from a check run."""
+        checked_at = now or time.time()
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO video_checks (video_id, ok, title, message, checked_at) VALUES (?, ?, ?, ?, ?)",
+            [
+                (video_id, int(exists), _title_from_message(message), message, checked_at)
+                for video_id, (exists, message) in results.items()
+            ],
+        )
+        self._conn.commit()
+
+    def clear(self):
+        self._conn.execute("DELETE FROM video_checks")
+        self._conn.commit()
+
+    def rows(self):
+        return self._conn.execute(
+            "SELECT video_id, ok, title, message, checked_at FROM video_checks ORDER BY checked_at"
+        ).fetchall()
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inspect the YouTube check result store.")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB)
+    parser.add_argument("--clear", action="store_true", help="Delete all stored results")
+    args = parser.parse_args()
+
+    with VideoCheckCache(args.db) as cache:
+        if args.clear:
+            cache.clear()
+            print(f"Cleared {args.db}")
+            return
+        rows = cache.rows()
+        now = time.time()
+        for video_id, ok, title, message, checked_at in rows:
+            age_h = (now - checked_at) / 3600
+            print(f"{video_id}  {'ok  ' if ok else 'FAIL'}  {age_h:6.1f}h  {title or message}")
+        print(f"\n{len(rows)} result(s) in {args.db}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Watch the asset source folders and rebuild derivatives as files change.
+
+One long-running process replaces re-running the scripts by hand:
+  - a PNG added or changed in assets/cat_types -> its 512x374 JPG, through
+    resize_png_to_jpg.load_png / convert_image;
+  - assets/splash/splash_screen.png changed     -> every launch image, through
+    generate_splash_sizes.load_source / render_targets.
+Only stale outputs are rebuilt (same derivative cache as the scripts), and
+the interpreter, PIL and NumPy stay loaded between rebuilds.
+
+Changes come from inotify (via ctypes, Linux) or, where that is not
+available or --poll is given, from polling mtimes/sizes every --interval
+seconds. Events are debounced: a rebuild starts once no event arrived for
+--debounce seconds, so an editor's save burst or a folder copy is one rebuild.
+
+Decoded sources are kept in a bounded LRU keyed by content hash. An edit that
+brings back bytes already seen (undo, switching git branches, re-saving the
+same file) rebuilds without decoding (or chroma keying) the source again.
+
+On start every rule is brought up to date once, then the loop waits for changes.
+
+Usage:
+  python scripts/watch_assets.py [--poll] [--interval 1.0] [--debounce 0.3] [--lru 16] [--once]
+                                 [--timing [PATH]] [--profile]
+  python scripts/asset_cli.py watch [...]
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import generate_splash_sizes as splash
+import resize_png_to_jpg as resize
+import stage_timing
+from derivative_cache import DerivativeCache
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+CAT_TYPES_DIR = PROJECT_ROOT / "assets" / "cat_types"
+
+DEFAULT_DEBOUNCE = 0.3  # seconds without events before rebuilding
+DEFAULT_INTERVAL = 1.0  # polling period
+DEFAULT_LRU_SIZE = 16  # decoded sources kept in memory
+
+# inotify(7)
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_CREATE | IN_DELETE | IN_MODIFY
+_EVENT = struct.Struct("iIII")
+
+
+class InotifyWatcher:
+    """Directory watcher on Linux inotify. Raises OSError where unavailable."""
+
+    def __init__(self, dirs):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is Linux-only")
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs = {}
+        for d in dirs:
+            wd = libc.inotify_add_watch(self._fd, os.fsencode(d), _WATCH_MASK)
+            if wd < 0:
+                os.close(self._fd)
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {d}")
+            self._dirs[wd] = Path(d)
+
+    def poll(self, timeout=None):
+        """Changed paths, waiting up to `timeout` seconds (None: until something changes)."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed = set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        pos = 0
+        while pos + _EVENT.size <= len(data):
+            wd, _mask, _cookie, length = _EVENT.unpack_from(data, pos)
+            name = data[pos + _EVENT.size: pos + _EVENT.size + length].rstrip(b"\0")
+            pos += _EVENT.size + length
+            if wd in self._dirs and name:
+                changed.add(self._dirs[wd] / os.fsdecode(name))
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """Portable fallback: compares (size, mtime) snapshots of the directories."""
+
+    def __init__(self, dirs, interval=DEFAULT_INTERVAL):
+        self._dirs = [Path(d) for d in dirs]
+        self._interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self):
+        snap = {}
+        for d in self._dirs:
+            try:
+                entries = list(os.scandir(d))
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                snap[Path(entry.path)] = (st.st_size, st.st_mtime_ns)
+        return snap
+
+    def poll(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            current = self._scan()
+            changed = {p for p in current.keys() | self._snapshot.keys() if current.get(p) != self._snapshot.get(p)}
+            self._snapshot = current
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            wait = self._interval if deadline is None else min(self._interval, max(0.0, deadline - time.monotonic()))
+            time.sleep(wait)
+
+    def close(self):
+        pass
+
+
+def debounced(watcher, quiet=DEFAULT_DEBOUNCE):
+    """Yield sets of changed paths, each gathered until `quiet` seconds pass without events."""
+    while True:
+        changed = watcher.poll(None)
+        while True:
+            more = watcher.poll(quiet)
+            if not more:
+                break
+            changed |= more
+        yield changed
+
+
+class DecodedLRU:
+    """Bounded map of content digest -> decoded image, least recently used evicted first."""
+
+    def __init__(self, maxsize=DEFAULT_LRU_SIZE):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, digest, load):
+        if digest in self._items:
+            self._items.move_to_end(digest)
+            self.hits += 1
+            return self._items[digest]
+        self.misses += 1
+        value = load()
+        self._items[digest] = value
+        if len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+        return value
+
+
+class AssetWatcher:
+    """Rebuild rules for the watched folders, sharing one cache and one LRU."""
+
+    def __init__(self, lru_size=DEFAULT_LRU_SIZE, splash_source=splash.SOURCE):
+        self.cache = DerivativeCache()
+        self.lru = DecodedLRU(lru_size)
+        self.splash_source = Path(splash_source).resolve()
+
+    @property
+    def dirs(self):
+        return [d for d in (CAT_TYPES_DIR, self.splash_source.parent) if d.is_dir()]
+
+    def rebuild_cat_type(self, png: Path) -> bool:
+        """Rebuild one cat-type JPG if stale. Returns True if written."""
+        jpg = png.with_suffix(".jpg")
+        key = self.cache.key([png], resize.CACHE_PARAMS)
+        if self.cache.is_fresh(jpg, key):
+            return False
+        digest = self.cache.source_digest(png)
+        image = self.lru.get(("png", digest), lambda: resize.load_png(png))
+        resize.convert_image(image, jpg)
+        self.cache.record(jpg, key)
+        print(f"  {png.name} -> {jpg.name}")
+        return True
+
+    def rebuild_splash(self) -> int:
+        """Rebuild stale launch images. Returns how many were written."""
+        if not self.splash_source.exists():
+            return 0
+        todo = splash.stale_targets(self.cache, self.splash_source, verbose=False)
+        if not todo:
+            return 0
+        digest = self.cache.source_digest(self.splash_source)
+        source = self.lru.get(("splash", digest), lambda: splash.load_source(self.splash_source))
+        splash.render_targets(source, [(rel, w, h) for rel, w, h, _ in todo])
+        for rel, w, h, key in todo:
+            self.cache.record(PROJECT_ROOT / rel, key)
+            print(f"  {self.splash_source.name} -> {rel} ({w}x{h})")
+        return len(todo)
+
+    def handle(self, changed) -> int:
+        """Rebuild whatever the changed paths affect. Returns the number of outputs written."""
+        written = 0
+        for path in sorted(changed):
+            try:
+                if path.parent == CAT_TYPES_DIR and path.suffix.lower() == ".png" and path.exists():
+                    written += self.rebuild_cat_type(path)
+            except Exception as e:  # keep watching after a bad file
+                print(f"  Skip {path.name}: {e}")
+        if any(p == self.splash_source for p in changed):
+            try:
+                written += self.rebuild_splash()
+            except Exception as e:
+                print(f"  Skip {self.splash_source.name}: {e}")
+        self.cache.save()
+        return written
+
+    def catch_up(self) -> int:
+        """Bring every rule up to date, as on startup."""
+        pngs = set(CAT_TYPES_DIR.glob("*.png")) if CAT_TYPES_DIR.is_dir() else set()
+        return self.handle(pngs | {self.splash_source})
+
+
+def make_watcher(dirs, poll=False, interval=DEFAULT_INTERVAL):
+    if not poll:
+        try:
+            return InotifyWatcher(dirs)
+        except (OSError, AttributeError) as e:
+            print(f"inotify unavailable ({e}); polling every {interval:g}s")
+    return PollingWatcher(dirs, interval)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild cat-type JPGs and launch images when sources change.")
+    parser.add_argument("--poll", action="store_true", help="Poll instead of using inotify")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="Polling period (s)")
+    parser.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE, help="Quiet time before rebuilding (s)")
+    parser.add_argument("--lru", type=int, default=DEFAULT_LRU_SIZE, help="Decoded sources kept in memory")
+    parser.add_argument("--splash-source", type=Path, default=splash.SOURCE, help="Splash source image")
+    parser.add_argument("--once", action="store_true", help="Catch up once and exit")
+    stage_timing.add_arguments(parser)
+    args = parser.parse_args()
+    stage_timing.configure_from_args(args, "watch")
+
+    assets = AssetWatcher(args.lru, args.splash_source)
+    start = time.perf_counter()
+    written = assets.catch_up()
+    print(f"Up to date ({written} output(s) rebuilt in {time.perf_counter() - start:.2f}s)")
+    if args.once:
+        stage_timing.report()
+        return
+
+    watcher = make_watcher(assets.dirs, args.poll, args.interval)
+    print(f"Watching {', '.join(str(d.relative_to(PROJECT_ROOT)) for d in assets.dirs)} (Ctrl-C to stop)")
+    try:
+        for changed in debounced(watcher, args.debounce):
+            start = time.perf_counter()
+            written = assets.handle(changed)
+            if written:
+                print(f"Rebuilt {written} output(s) in {time.perf_counter() - start:.2f}s "
+                      f"(decoded sources: {assets.lru.hits} reused, {assets.lru.misses} decoded)")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        assets.cache.save()
+        stage_timing.report()
+
+
+if __name__ == "__main__":
+    main()
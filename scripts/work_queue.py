@@ -0,0 +1,479 @@
+#!/usr/bin/env python3
+"""
+Crash-safe work queue in a directory, shared by any number of processes or hosts.
+
+A long generation run is split into items; every worker that points at the same
+queue directory (local, or a shared mount) drains it, and a run that dies can
+be restarted and picks up exactly what is not done:
+
+  <queue>/items/<id>.json        item data, written once (temp file + rename)
+  <queue>/leases/<id>.<gen>      who is working on it, and until when
+  <queue>/done/<id>.json         completion marker
+  <queue>/journal.jsonl          append-only log: add, requeue, claim, takeover, done, duplicate,
+                                 stale, release, lost
+
+Claiming: a lease is a file named with a generation number, created with
+O_EXCL, so of two workers racing for the same item exactly one gets it. A
+lease is held for --lease-seconds and renewed by a heartbeat thread while the
+work runs. If the holder dies (killed, laptop asleep, network gone), its lease
+expires and the next worker takes the item over by creating generation + 1,
+again with O_EXCL. Lease times are wall-clock, so hosts need roughly synced clocks.
+
+Completing: the done marker is published with os.link from a temp file, which
+fails if the marker already exists. A late finisher whose lease was taken over
+therefore cannot complete the item a second time: every item is marked done
+exactly once. Its work may run more than once after a crash, so outputs
+must be written atomically (temp file + rename, as image_pipeline does) and
+be the same whoever writes them. Before paying for an item's work, a worker
+checks ensure_held(), which raises LeaseLost if its lease was taken over
+meanwhile. The output is often written later by another process (the resize
+pool), so token() hands out a picklable LeaseToken whose check() that process
+calls just before renaming the output into place.
+
+Re-adding an item with different data (a changed prompt, say) requeues it:
+the data is replaced, the item's revision goes up and its done marker is
+removed, so a reused queue directory regenerates it. A worker that claimed the
+old revision can no longer complete it.
+
+Usage (from another script):
+  with WorkQueue("build/queue/breeds") as queue:
+      queue.add_many({name: {"path": path} for name, path in pending.items()})
+      for item_id in queue.claims():          # lazily claims the next free item
+          queue.ensure_held(item_id)          # raises LeaseLost if taken over
+          ...work on queue.data(item_id)...
+          queue.token(item_id).check()        # again just before os.replace(tmp, output)
+          queue.complete(item_id)             # or queue.release(item_id, error)
+
+  python scripts/work_queue.py build/queue/breeds              Show progress.
+  python scripts/work_queue.py build/queue/breeds --journal    Also print the journal tail.
+
+The no-loss / no-double-completion guarantee is exercised by bench_work_queue.py,
+which SIGKILLs workers mid-run.
+"""
+
+import argparse
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from pathlib import Path
+from urllib.parse import quote, unquote
+
+DEFAULT_LEASE_SECONDS = 120.0
+DEFAULT_POLL_SECONDS = 1.0
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _read_json(path: Path):
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _file_name(item_id) -> str:
+    return quote(str(item_id), safe="")
+
+
+def _lease_generations(leases_dir: Path, item_id):
+    """Lease generations on disk for one item."""
+    return [int(gen) for p in leases_dir.glob(f"{_file_name(item_id)}.*")
+            for stem, _, gen in [p.name.rpartition(".")] if stem and gen.isdigit()]
+
+
+def _revision(items_dir: Path, item_id) -> int:
+    item = _read_json(items_dir / f"{_file_name(item_id)}.json")
+    return item.get("rev", 0) if item else 0
+
+
+class LeaseLost(RuntimeError):
+    """This worker's lease on an item was taken over (it stalled past its lease)."""
+
+
+class LeaseToken:
+    """
+    One held lease (generation and item revision), picklable so a worker
+    process can check it without the WorkQueue handle.
+    """
+
+    def __init__(self, root: Path, item_id, gen: int, rev: int):
+        self.root = Path(root)
+        self.item_id = item_id
+        self.gen = gen
+        self.rev = rev
+
+    def check(self) -> None:
+        """Raise LeaseLost if the lease was taken over or the item requeued since."""
+        newest = max(_lease_generations(self.root / "leases", self.item_id), default=self.gen)
+        if newest > self.gen or _revision(self.root / "items", self.item_id) != self.rev:
+            raise LeaseLost(f"{self.item_id}: lease taken over or item requeued; leaving it to its new holder")
+
+
+class WorkQueue:
+    """One worker's handle on a queue directory."""
+
+    def __init__(self, root, owner=None, lease_seconds=DEFAULT_LEASE_SECONDS, log=print):
+        self.root = Path(root)
+        self.items_dir = self.root / "items"
+        self.leases_dir = self.root / "leases"
+        self.done_dir = self.root / "done"
+        for d in (self.items_dir, self.leases_dir, self.done_dir):
+            d.mkdir(parents=True, exist_ok=True)
+        self.journal_path = self.root / "journal.jsonl"
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.lease_seconds = lease_seconds
+        self.log = log
+        self._held = {}  # item id -> lease generation
+        self._revs = {}  # item id -> item revision when claimed
+        self._failed = set()  # items this worker gave up on; left for other workers / runs
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._heartbeat = None
+
+    # --- paths and journal ----------------------------------------------------
+
+    @staticmethod
+    def _name(item_id: str) -> str:
+        return _file_name(item_id)
+
+    def _lease_path(self, item_id, gen) -> Path:
+        return self.leases_dir / f"{self._name(item_id)}.{gen}"
+
+    def _done_path(self, item_id) -> Path:
+        return self.done_dir / f"{self._name(item_id)}.json"
+
+    def _item_path(self, item_id) -> Path:
+        return self.items_dir / f"{self._name(item_id)}.json"
+
+    def journal(self, event: str, item_id=None, **fields) -> None:
+        """Append one line; a single O_APPEND write, so concurrent writers do not interleave."""
+        line = {"t": round(time.time(), 3), "owner": self.owner, "event": event, "item": item_id, **fields}
+        fd = os.open(self.journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, (json.dumps(line, ensure_ascii=False) + "\n").encode("utf-8"))
+        finally:
+            os.close(fd)
+
+    # --- items ----------------------------------------------------------------
+
+    def add(self, item_id, data=None) -> bool:
+        """
+        Enqueue an item. If it is already queued with the same data, nothing
+        changes; with different data it is requeued (see _requeue). Returns
+        True if the item was added or requeued.
+        """
+        path = self._item_path(item_id)
+        if path.exists():
+            return self._requeue(item_id, data)
+        tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        tmp.write_text(json.dumps({"id": item_id, "data": data, "rev": 0}, ensure_ascii=False), encoding="utf-8")
+        try:
+            os.link(tmp, path)  # fails if another worker added it first
+        except FileExistsError:
+            return False
+        finally:
+            tmp.unlink()
+        self.journal("add", item_id)
+        return True
+
+    def _requeue(self, item_id, data) -> bool:
+        """Replace a queued item's data if it changed, and make it pending again even if done."""
+        item = _read_json(self._item_path(item_id))
+        # Compare as stored: JSON turns tuples into lists
+        if item is not None and item.get("data") == json.loads(json.dumps(data)):
+            return False
+        rev = (item or {}).get("rev", 0) + 1
+        record = {"id": item_id, "data": data, "rev": rev}
+        _write_atomic(self._item_path(item_id), json.dumps(record, ensure_ascii=False).encode("utf-8"))
+        self._done_path(item_id).unlink(missing_ok=True)
+        self._failed.discard(item_id)
+        self.journal("requeue", item_id, rev=rev)
+        return True
+
+    def add_many(self, items) -> int:
+        """add() every {item id: data}. Returns how many were added or requeued."""
+        return sum(self.add(item_id, data) for item_id, data in items.items())
+
+    def item_ids(self):
+        return sorted(unquote(p.name[:-5]) for p in self.items_dir.glob("*.json"))
+
+    def data(self, item_id):
+        item = _read_json(self._item_path(item_id))
+        return item["data"] if item else None
+
+    def revision(self, item_id) -> int:
+        """How often the item was requeued with new data."""
+        return _revision(self.items_dir, item_id)
+
+    def is_done(self, item_id) -> bool:
+        return self._done_path(item_id).exists()
+
+    # --- leases ---------------------------------------------------------------
+
+    def _generations(self, item_id=None):
+        """{item id: [lease generations]} currently on disk (for one item if given)."""
+        paths = self.leases_dir.glob(f"{self._name(item_id)}.*") if item_id is not None else self.leases_dir.iterdir()
+        gens = {}
+        for p in paths:
+            stem, _, gen = p.name.rpartition(".")
+            if stem and gen.isdigit():
+                gens.setdefault(unquote(stem), []).append(int(gen))
+        return gens if item_id is None else gens.get(item_id, [])
+
+    def _lease_state(self, item_id, gen):
+        """(owner, expires) of a lease file; a lease still being written counts from its mtime."""
+        path = self._lease_path(item_id, gen)
+        lease = _read_json(path)
+        if lease:
+            return lease.get("owner"), lease.get("expires", 0.0)
+        try:
+            return None, path.stat().st_mtime + self.lease_seconds
+        except OSError:
+            return None, 0.0  # gone: released or cleaned up
+
+    def _write_lease(self, item_id, gen, create: bool, expires=None) -> bool:
+        if expires is None:
+            expires = time.time() + self.lease_seconds
+        lease = {"owner": self.owner, "expires": expires, "gen": gen}
+        data = json.dumps(lease).encode("utf-8")
+        path = self._lease_path(item_id, gen)
+        if not create:
+            _write_atomic(path, data)
+            return True
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            return False
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+        return True
+
+    def claim(self, item_id, gens=None) -> bool:
+        """Try to lease one item. Returns True if this worker now holds it."""
+        if self.is_done(item_id) or item_id in self._failed:
+            return False
+        gens = sorted(gens if gens is not None else self._generations(item_id))
+        takeover = None
+        if gens:
+            top = gens[-1]
+            owner, expires = self._lease_state(item_id, top)
+            if expires > time.time():
+                return False
+            takeover = owner
+            gen = top + 1
+        else:
+            gen = 1
+        if not self._write_lease(item_id, gen, create=True):
+            return False
+        if self.is_done(item_id):  # completed while we were claiming
+            self._lease_path(item_id, gen).unlink(missing_ok=True)
+            return False
+        for old in gens:
+            self._lease_path(item_id, old).unlink(missing_ok=True)
+        with self._lock:
+            self._held[item_id] = gen
+            self._revs[item_id] = self.revision(item_id)
+        if gens:
+            self.journal("takeover", item_id, gen=gen, previous=takeover)
+        else:
+            self.journal("claim", item_id, gen=gen)
+        return True
+
+    def holds_generation(self, item_id, gen) -> bool:
+        """True while lease generation `gen` is the newest one for the item."""
+        return max(_lease_generations(self.leases_dir, item_id), default=gen) <= gen
+
+    def holds(self, item_id) -> bool:
+        """True while this worker's lease is the newest one for the item."""
+        with self._lock:
+            gen = self._held.get(item_id)
+        return gen is not None and self.holds_generation(item_id, gen)
+
+    def ensure_held(self, item_id) -> None:
+        """Raise LeaseLost unless this worker still holds the item's newest lease and revision."""
+        with self._lock:
+            rev = self._revs.get(item_id)
+        if not self.holds(item_id) or rev != self.revision(item_id):
+            raise LeaseLost(f"{item_id}: lease taken over or item requeued; leaving it to its new holder")
+
+    def token(self, item_id) -> LeaseToken:
+        """A LeaseToken for an item this worker holds (raises LeaseLost if it does not)."""
+        with self._lock:
+            gen, rev = self._held.get(item_id), self._revs.get(item_id)
+        if gen is None:
+            raise LeaseLost(f"{item_id}: lease taken over or item requeued; leaving it to its new holder")
+        token = LeaseToken(self.root, item_id, gen, rev)
+        token.check()
+        return token
+
+    def _renew_all(self):
+        with self._lock:
+            held = dict(self._held)
+        for item_id, gen in held.items():
+            if not self.holds(item_id):
+                with self._lock:
+                    self._held.pop(item_id, None)
+                    self._revs.pop(item_id, None)
+                self.journal("lost", item_id, gen=gen)
+                continue
+            self._write_lease(item_id, gen, create=False)
+
+    def _heartbeat_loop(self):
+        interval = max(0.05, self.lease_seconds / 3)
+        while not self._stop.wait(interval):
+            try:
+                self._renew_all()
+            except OSError as e:
+                self.log(f"  work queue: lease renewal failed: {e}")
+
+    def start(self):
+        """Start renewing held leases in the background."""
+        if self._heartbeat is None:
+            self._stop.clear()
+            self._heartbeat = threading.Thread(target=self._heartbeat_loop, name="lease-heartbeat", daemon=True)
+            self._heartbeat.start()
+        return self
+
+    # --- finishing ------------------------------------------------------------
+
+    def complete(self, item_id, result=None) -> bool:
+        """
+        Mark an item done. Returns False if another worker already did (this
+        run was a duplicate), or if the item was requeued with new data since
+        this worker claimed it (this run used stale data).
+        """
+        with self._lock:
+            gen = self._held.pop(item_id, None)
+            rev = self._revs.pop(item_id, None)
+        if rev is not None and rev != self.revision(item_id):
+            if gen is not None:
+                self._lease_path(item_id, gen).unlink(missing_ok=True)
+            self.journal("stale", item_id, gen=gen, rev=rev)
+            return False
+        marker = {"id": item_id, "owner": self.owner, "gen": gen, "t": time.time(), "result": result}
+        done = self._done_path(item_id)
+        tmp = done.with_name(f".{done.name}.{uuid.uuid4().hex}.tmp")
+        tmp.write_text(json.dumps(marker, ensure_ascii=False), encoding="utf-8")
+        try:
+            os.link(tmp, done)
+            won = True
+        except FileExistsError:
+            won = False
+        finally:
+            tmp.unlink()
+        if gen is not None:
+            self._lease_path(item_id, gen).unlink(missing_ok=True)
+        self.journal("done" if won else "duplicate", item_id, gen=gen)
+        return won
+
+    def release(self, item_id, error=None) -> None:
+        """Give an item back (e.g. after a failure). This worker will not claim it again."""
+        with self._lock:
+            gen = self._held.pop(item_id, None)
+            self._revs.pop(item_id, None)
+        self._failed.add(item_id)
+        if gen is not None and self.holds_generation(item_id, gen):
+            # Expire rather than delete, so generation numbers never repeat
+            self._write_lease(item_id, gen, create=False, expires=0.0)
+        self.journal("release", item_id, gen=gen, error=None if error is None else str(error)[:500])
+
+    def claims(self, wait=True, poll=DEFAULT_POLL_SECONDS):
+        """
+        Yield item ids as this worker claims them, until every item is done.
+        With wait=True, items leased by other live workers are waited on, and
+        taken over if their lease expires; with wait=False the iterator stops
+        when nothing is claimable right now.
+        """
+        self.start()
+        while True:
+            gens = self._generations()
+            pending = [i for i in self.item_ids() if i not in self._failed and not self.is_done(i)]
+            claimed = False
+            for item_id in pending:
+                # gens may be stale by now; a stale view only makes the O_EXCL create fail
+                if self.claim(item_id, gens.get(item_id, [])):
+                    claimed = True
+                    yield item_id
+            if claimed:
+                continue
+            if not pending or not wait:
+                return
+            time.sleep(poll)
+
+    def status(self) -> dict:
+        """Counts of items by state: done, leased (live lease), expired lease, waiting."""
+        now = time.time()
+        gens = self._generations()
+        counts = {"items": 0, "done": 0, "leased": 0, "expired": 0, "waiting": 0}
+        for item_id in self.item_ids():
+            counts["items"] += 1
+            if self.is_done(item_id):
+                counts["done"] += 1
+            elif item_id in gens:
+                _, expires = self._lease_state(item_id, max(gens[item_id]))
+                counts["leased" if expires > now else "expired"] += 1
+            else:
+                counts["waiting"] += 1
+        return counts
+
+    def close(self) -> None:
+        """Stop the heartbeat and hand back any leases still held."""
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+            self._heartbeat = None
+        with self._lock:
+            held = dict(self._held)
+            self._held.clear()
+            self._revs.clear()
+        for item_id, gen in held.items():
+            if self.holds_generation(item_id, gen):
+                self._write_lease(item_id, gen, create=False, expires=0.0)
+            self.journal("release", item_id, gen=gen, error="worker exiting")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def add_arguments(parser) -> None:
+    """Add --queue DIR and --lease-seconds to a generator's argument parser."""
+    parser.add_argument("--queue", type=Path, default=None, metavar="DIR",
+                        help="Share the run through a work queue directory (resumable; several workers/hosts)")
+    parser.add_argument("--lease-seconds", type=float, default=DEFAULT_LEASE_SECONDS,
+                        help="With --queue: how long an item stays claimed without a heartbeat")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Show a work queue's progress.")
+    parser.add_argument("queue", type=Path)
+    parser.add_argument("--journal", type=int, nargs="?", const=20, default=0, metavar="N",
+                        help="Also print the last N journal lines")
+    args = parser.parse_args()
+
+    if not (args.queue / "items").is_dir():
+        raise SystemExit(f"Not a work queue: {args.queue}")
+    queue = WorkQueue(args.queue)
+    status = queue.status()
+    print(" ".join(f"{k}={v}" for k, v in status.items()))
+    if args.journal and queue.journal_path.exists():
+        lines = queue.journal_path.read_text(encoding="utf-8").splitlines()[-args.journal:]
+        print("\n".join(lines))
+
+
+if __name__ == "__main__":
+    main()
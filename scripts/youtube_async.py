@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Async YouTube video checker used by test_youtube_videos.py.
+
+All checks share one pooled aiohttp session, and a semaphore bounds how many
+videos are in flight at once. Each video is checked through the oEmbed API.
+On a 403 or network error the watch page is fetched instead, the same way the
+original serial checker did. Duplicate IDs are checked once. Each request
+is timed as an "oembed" or "watch" stage (see stage_timing.py).
+
+The oEmbed and watch-page base URLs can be overridden, so the checker can run
+against a local stand-in server.
+
+Requires: pip install aiohttp
+"""
+
+import asyncio
+import json
+
+import aiohttp
+
+from stage_timing import stage
+
+OEMBED_URL = "https://www.youtube.com/oembed"
+WATCH_URL = "https://www.youtube.com/watch"
+DEFAULT_CONCURRENCY = 8
+REQUEST_TIMEOUT = 10  # seconds
+
+_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+}
+
+
+async def check_video_alternative_async(session, video_id, watch_url=WATCH_URL):
+    """Alternative method: Check video page directly"""
+    try:
+        with stage("watch", video_id) as ev:
+            async with session.get(watch_url, params={'v': video_id}, headers=_HEADERS, allow_redirects=True) as response:
+                ev["status"] = response.status
+                if response.status == 200:
+                    text = await response.text()
+                    ev["bytes"] = len(text)
+                    # Check if page contains video unavailable message
+                    if 'Video unavailable' in text or 'This video is not available' in text:
+                        return False, "✗ Video unavailable"
+                    elif 'og:title' in text or 'watch-title' in text:
+                        return True, "✓ Playable (verified via page check)"
+                    else:
+                        return True, "✓ Likely playable (page accessible)"
+                elif response.status == 404:
+                    return False, "✗ Video not found (404)"
+                else:
+                    return False, f"✗ Error: HTTP {response.status}"
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        return False, f"✗ Network error: {str(e) or type(e).__name__}"
+
+
+async def check_video_async(session, video_id, oembed_url=OEMBED_URL, watch_url=WATCH_URL):
+    """Check if a YouTube video exists and is playable. Returns (exists, message)."""
+    if not video_id:
+        return False, "No video ID provided"
+
+    params = {'url': f"https://www.youtube.com/watch?v={video_id}", 'format': 'json'}
+    headers = {**_HEADERS, 'Accept': 'application/json'}
+    try:
+        with stage("oembed", video_id) as ev:
+            async with session.get(oembed_url, params=params, headers=headers) as response:
+                ev["status"] = response.status
+                if response.status == 200:
+                    body = await response.read()
+                    ev["bytes"] = len(body)
+                    data = json.loads(body)
+                    if 'title' in data:
+                        return True, f"✓ Playable - {data.get('title', 'Unknown title')[:60]}"
+                    return True, "✓ Playable"
+                elif response.status == 404:
+                    return False, "✗ Video not found (404)"
+                elif response.status != 403:
+                    return False, f"✗ Error: HTTP {response.status}"
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+        pass
+    # 403 or network error: try alternative method - check video page directly
+    return await check_video_alternative_async(session, video_id, watch_url)
+
+
+def _session(concurrency):
+    connector = aiohttp.TCPConnector(limit=concurrency, ttl_dns_cache=300)
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+    return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+
+async def check_videos_async(video_ids, concurrency=DEFAULT_CONCURRENCY, oembed_url=OEMBED_URL, watch_url=WATCH_URL):
+    """Check many videos concurrently. Returns {video_id: (exists, message)}; duplicates are checked once."""
+    unique_ids = list(dict.fromkeys(v for v in video_ids if v))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with _session(concurrency) as session:
+        async def bounded(video_id):
+            async with semaphore:
+                return video_id, await check_video_async(session, video_id, oembed_url, watch_url)
+
+        results = await asyncio.gather(*(bounded(v) for v in unique_ids))
+    return dict(results)
+
+
+def check_videos(video_ids, concurrency=DEFAULT_CONCURRENCY, oembed_url=OEMBED_URL, watch_url=WATCH_URL):
+    """Synchronous entry point for check_videos_async."""
+    return asyncio.run(check_videos_async(video_ids, concurrency, oembed_url, watch_url))
+
+
+def check_video_alternative(video_id, watch_url=WATCH_URL):
+    """Synchronous entry point for check_video_alternative_async."""
+    async def run():
+        async with _session(1) as session:
+            return await check_video_alternative_async(session, video_id, watch_url)
+
+    return asyncio.run(run())